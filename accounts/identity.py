@@ -0,0 +1,56 @@
+"""Request-scoped identity map for the current user.
+
+The user's profile, business profile and active plan are loaded together
+and memoized on the ``User`` instance. ``request.user`` lives for exactly
+one request, so each of them is fetched at most once per request.
+"""
+
+from django.contrib.auth.models import User
+
+from onboarding.models import BusinessProfile
+
+from .models import UserProfile
+
+
+def load_identity(user):
+    """Populate ``user.profile`` (with ``active_plan``) and ``user.business_profile`` in one query."""
+    if not user.is_authenticated or User.profile.is_cached(user):
+        return user
+
+    profile = UserProfile.objects.select_related(
+        'active_plan', 'user__business_profile',
+    ).filter(user_id=user.pk).first()
+    if profile is None:
+        return user
+
+    business_profile = User.business_profile.related.get_cached_value(
+        profile.user, default=None,
+    )
+    User.profile.related.set_cached_value(user, profile)
+    UserProfile.user.field.set_cached_value(profile, user)
+    User.business_profile.related.set_cached_value(user, business_profile)
+    if business_profile is not None:
+        BusinessProfile.user.field.set_cached_value(business_profile, user)
+    return user
+
+
+def get_active_plan(user):
+    """Return the user's ACTIVE plan through the ``UserProfile.active_plan`` pointer.
+
+    The plan is loaded at most once per user instance. Returns None if the
+    user has no profile or no active plan.
+    """
+    if not user.is_authenticated:
+        return None
+    load_identity(user)
+    try:
+        profile = user.profile
+    except UserProfile.DoesNotExist:
+        return None
+
+    plan = profile.active_plan
+    if plan is None or plan.status != 'ACTIVE':
+        return None
+    if not plan.__class__.user.is_cached(plan):
+        plan.__class__.user.field.set_cached_value(plan, user)
+    return plan
@@ -0,0 +1,18 @@
+from django.contrib.auth.middleware import get_user
+from django.utils.functional import SimpleLazyObject
+
+from .identity import load_identity
+
+
+class UserIdentityMiddleware:
+    """Load the current user's profile, business profile and active plan once per request.
+
+    Must come after ``AuthenticationMiddleware``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.user = SimpleLazyObject(lambda: load_identity(get_user(request)))
+        return self.get_response(request)
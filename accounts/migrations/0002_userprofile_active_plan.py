@@ -0,0 +1,30 @@
+# Generated by Django 6.0.2 on 2026-10-19 10:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_active_plan(apps, schema_editor):
+    UserProfile = apps.get_model('accounts', 'UserProfile')
+    TaskPlan = apps.get_model('tasks', 'TaskPlan')
+    latest_active = TaskPlan.objects.filter(
+        user_id=models.OuterRef('user_id'), status='ACTIVE',
+    ).order_by('-created_at').values('pk')[:1]
+    UserProfile.objects.update(active_plan=models.Subquery(latest_active))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('tasks', '0006_taskplan_progress_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='active_plan',
+            field=models.ForeignKey(blank=True, help_text='Maintained by TaskPlan.save(); see accounts.identity.get_active_plan', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='tasks.taskplan'),
+        ),
+        migrations.RunPython(backfill_active_plan, migrations.RunPython.noop),
+    ]
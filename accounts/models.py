@@ -25,6 +25,11 @@ class UserProfile(models.Model):
         help_text='Hour (0-23) in user timezone to send daily tasks',
     )
     is_onboarded = models.BooleanField(default=False)
+    active_plan = models.ForeignKey(
+        'tasks.TaskPlan', null=True, blank=True,
+        on_delete=models.SET_NULL, related_name='+',
+        help_text='Maintained by TaskPlan.save(); see accounts.identity.get_active_plan',
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
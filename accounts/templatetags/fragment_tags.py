@@ -0,0 +1,49 @@
+from django import template
+from django.middleware.csrf import get_token
+
+from tasks import fragment_cache
+
+register = template.Library()
+
+
+class FragmentNode(template.Node):
+
+    def __init__(self, nodelist, name, vary_on):
+        self.nodelist = nodelist
+        self.name = name
+        self.vary_on = vary_on
+
+    def render(self, context):
+        name = self.name.resolve(context)
+        if name not in fragment_cache.FRAGMENTS:
+            raise template.TemplateSyntaxError(f'Unknown fragment {name!r}')
+        request = context.get('request')
+        user = getattr(request, 'user', None)
+        if user is None or not user.is_authenticated:
+            return self.nodelist.render(context)
+
+        # Forms inside carry a CSRF token, which is only valid for the session's secret
+        get_token(request)
+        vary_on = [request.META.get('CSRF_COOKIE', '')]
+        vary_on.extend(value.resolve(context) for value in self.vary_on)
+        return fragment_cache.get_or_render(
+            user.pk, name, lambda: self.nodelist.render(context), vary_on,
+        )
+
+
+@register.tag('fragment')
+def do_fragment(parser, token):
+    """Cache the enclosed HTML per user, keyed on the fragment's section versions.
+
+    Usage: ``{% fragment 'name' [vary_on ...] %} ... {% endfragment %}``,
+    where ``name`` is a key of ``tasks.fragment_cache.FRAGMENTS``.
+    """
+    bits = token.split_contents()
+    if len(bits) < 2:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' tag requires a fragment name")
+    nodelist = parser.parse(('endfragment',))
+    parser.delete_first_token()
+    return FragmentNode(
+        nodelist, parser.compile_filter(bits[1]),
+        [parser.compile_filter(bit) for bit in bits[2:]],
+    )
@@ -0,0 +1,66 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+
+from accounts.identity import get_active_plan, load_identity
+from onboarding.models import BusinessProfile
+from tasks.models import TaskPlan
+
+
+class ActivePlanPointerTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('testuser', 'test@example.com', 'pass123')
+        self.profile = BusinessProfile.objects.create(
+            user=self.user, business_name='Test', business_type='Test', stage='IDEA',
+        )
+
+    def _create_plan(self, **kwargs):
+        today = timezone.now().date()
+        return TaskPlan.objects.create(
+            user=self.user, business_profile=self.profile,
+            starts_on=today, ends_on=today + timedelta(days=30), **kwargs,
+        )
+
+    def _fresh_user(self):
+        return User.objects.get(pk=self.user.pk)
+
+    def test_pointer_set_on_create(self):
+        plan = self._create_plan()
+        self.assertEqual(get_active_plan(self._fresh_user()), plan)
+
+    def test_pointer_moves_when_plan_replaced(self):
+        old = self._create_plan()
+        old.status = 'REPLACED'
+        old.save(update_fields=['status'])
+        self.assertIsNone(get_active_plan(self._fresh_user()))
+
+        new = self._create_plan()
+        self.assertEqual(get_active_plan(self._fresh_user()), new)
+
+    def test_pointer_cleared_when_plan_completed(self):
+        plan = self._create_plan()
+        plan.status = 'COMPLETED'
+        plan.save()
+        self.user.profile.refresh_from_db()
+        self.assertIsNone(self.user.profile.active_plan)
+
+    def test_memoized_profile_kept_in_step(self):
+        user = load_identity(self._fresh_user())
+        plan = TaskPlan.objects.create(
+            user=user, business_profile=self.profile,
+            starts_on=timezone.now().date(), ends_on=timezone.now().date(),
+        )
+        with self.assertNumQueries(0):
+            self.assertEqual(get_active_plan(user), plan)
+
+    def test_identity_loads_once(self):
+        self._create_plan()
+        user = self._fresh_user()
+        with self.assertNumQueries(1):
+            get_active_plan(user)
+            get_active_plan(user)
+            user.profile.is_onboarded
+            user.business_profile.business_name
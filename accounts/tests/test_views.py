@@ -1,12 +1,18 @@
 from datetime import timedelta
+from io import StringIO
 from unittest.mock import patch
 
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
 from django.test import TestCase
 from django.utils import timezone
 
 from onboarding.models import BusinessProfile
+from tasks import fragment_cache
+from tasks.job_service import PlanJobService
 from tasks.models import Task, TaskPlan
+from tasks.services import TaskProgressService
 
 
 class LandingViewTest(TestCase):
@@ -71,6 +77,136 @@ class DashboardViewTest(TestCase):
         response = self.client.get('/dashboard/')
         self.assertEqual(response.status_code, 200)
 
+    def _add_tasks(self, plan, count, today):
+        with self.captureOnCommitCallbacks(execute=True):
+            for n in range(count):
+                status = ('DONE', 'PENDING', 'SKIPPED', 'SENT')[n % 4]
+                Task.objects.create(
+                    plan=plan, title=f'Task {n}', description='', category='PLANNING',
+                    day_number=n + 1, due_date=today + timedelta(days=n % 7 - 3), status=status,
+                    completed_at=timezone.now() - timedelta(hours=n) if status == 'DONE' else None,
+                )
+
+    def _onboard_with_plan(self):
+        self.user.profile.is_onboarded = True
+        self.user.profile.save()
+        profile = BusinessProfile.objects.create(
+            user=self.user, business_name='Test', business_type='Test', stage='IDEA',
+        )
+        today = timezone.now().date()
+        plan = TaskPlan.objects.create(
+            user=self.user, business_profile=profile,
+            starts_on=today - timedelta(days=3), ends_on=today + timedelta(days=30),
+        )
+        return plan, today
+
+    def test_dashboard_query_count_is_constant(self):
+        cache.clear()
+        plan, today = self._onboard_with_plan()
+        self._add_tasks(plan, 8, today)
+        self.client.force_login(self.user)
+
+        # Session, user, identity, tasks, stats, achievements, pulse check
+        with self.assertNumQueries(7):
+            response = self.client.get('/dashboard/')
+        dashboard = response.context['dashboard']
+        self.assertEqual(dashboard.stats['overdue'], 2)
+        self.assertEqual(len(dashboard.recent_completed), 2)
+        self.assertEqual(dashboard.recent_completed[0].title, 'Task 0')
+
+        self._add_tasks(plan, 40, today)
+        with self.assertNumQueries(7):
+            response = self.client.get('/dashboard/')
+        self.assertEqual(len(response.context['dashboard'].recent_completed), 5)
+        self.assertContains(response, f"{response.context['dashboard'].completion_pct}% complete")
+
+
+class FragmentCacheTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        fragment_cache.reset_stats()
+        self.user = User.objects.create_user('testuser', 'test@example.com', 'pass123')
+        self.user.profile.is_onboarded = True
+        self.user.profile.save()
+        profile = BusinessProfile.objects.create(
+            user=self.user, business_name='Test', business_type='Test', stage='IDEA',
+        )
+        today = timezone.now().date()
+        plan = TaskPlan.objects.create(
+            user=self.user, business_profile=profile,
+            starts_on=today, ends_on=today + timedelta(days=30),
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task = Task.objects.create(
+                plan=plan, title='Write landing copy', description='', category='PLANNING',
+                day_number=1, due_date=today,
+            )
+        self.client.force_login(self.user)
+
+    def test_warm_dashboard_skips_snapshot_queries(self):
+        self.client.get('/dashboard/')
+        # Session, user and identity only
+        with self.assertNumQueries(3):
+            response = self.client.get('/dashboard/')
+        self.assertContains(response, 'Write landing copy')
+        stats = fragment_cache.stats()['dashboard_tasks']
+        self.assertEqual((stats['hits'], stats['misses'], stats['hit_rate']), (1, 1, 50.0))
+
+    def test_task_transition_invalidates_task_fragments(self):
+        self.client.get('/dashboard/')
+        self.assertContains(self.client.get('/tasks/'), 'Write landing copy')
+        with self.captureOnCommitCallbacks(execute=True):
+            TaskProgressService.mark_done(self.task)
+
+        response = self.client.get('/dashboard/')
+        self.assertContains(response, 'No pending tasks for today')
+        self.assertContains(self.client.get('/tasks/'), 'table-success')
+        self.assertEqual(fragment_cache.stats()['dashboard_tasks']['misses'], 2)
+
+    def test_pulse_save_bumps_only_pulse_fragments(self):
+        self.assertContains(self.client.get('/dashboard/'), 'Weekly Check-in:')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/pulse/', {
+                'revenue_this_week': '120', 'new_customers': 1,
+                'energy_level': 3, 'hours_worked': 5,
+            })
+
+        response = self.client.get('/dashboard/')
+        self.assertNotContains(response, 'Weekly Check-in:')
+        stats = fragment_cache.stats()
+        self.assertEqual(stats['dashboard_prompts']['misses'], 2)
+        self.assertEqual(stats['dashboard_tasks']['hits'], 1)
+
+    def test_new_active_plan_misses_cached_fragments(self):
+        self.assertContains(self.client.get('/dashboard/'), 'Write landing copy')
+        old = self.task.plan
+        TaskPlan.objects.filter(pk=old.pk).update(status='REPLACED')
+        plan = TaskPlan.objects.create(
+            user=self.user, business_profile=old.business_profile,
+            starts_on=old.starts_on, ends_on=old.ends_on,
+        )
+        # No section bump runs: only the plan in the key keeps the old HTML out
+        Task.objects.create(
+            plan=plan, title='Call three suppliers', description='', category='PLANNING',
+            day_number=1, due_date=old.starts_on,
+        )
+
+        response = self.client.get('/dashboard/')
+        self.assertContains(response, 'Call three suppliers')
+        self.assertNotContains(response, 'Write landing copy')
+
+    def test_filters_vary_the_task_list(self):
+        self.assertContains(self.client.get('/tasks/'), 'Write landing copy')
+        self.assertContains(self.client.get('/tasks/?status=DONE'), 'No tasks found.')
+
+    def test_stats_command(self):
+        self.client.get('/dashboard/')
+        out = StringIO()
+        call_command('fragment_cache_stats', '--reset', stdout=out)
+        self.assertIn('dashboard_tasks', out.getvalue())
+        self.assertEqual(fragment_cache.stats()['dashboard_tasks']['misses'], 0)
+
 
 class RescheduleViewTest(TestCase):
 
@@ -136,6 +272,13 @@ class RegeneratePlanViewTest(TestCase):
         self.client.force_login(self.user)
         response = self.client.post('/tasks/regenerate/')
         self.assertEqual(response.status_code, 302)
+        self.assertIn('/tasks/generating/', response.url)
+
+        # The current plan stays active until the worker finishes
+        self.plan.refresh_from_db()
+        self.assertEqual(self.plan.status, 'ACTIVE')
+
+        PlanJobService.run_due_generations()
         self.plan.refresh_from_db()
         self.assertEqual(self.plan.status, 'REPLACED')
         self.assertTrue(
@@ -143,6 +286,60 @@ class RegeneratePlanViewTest(TestCase):
         )
 
 
+class AnalyticsChartViewTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('testuser', 'test@example.com', 'pass123')
+        self.user.profile.is_onboarded = True
+        self.user.profile.save()
+        profile = BusinessProfile.objects.create(
+            user=self.user, business_name='Test Bakery', business_type='Bakery', stage='IDEA',
+        )
+        today = timezone.now().date()
+        plan = TaskPlan.objects.create(
+            user=self.user, business_profile=profile,
+            starts_on=today, ends_on=today + timedelta(days=29),
+        )
+        Task.objects.create(
+            plan=plan, title='Task', description='', category='PLANNING',
+            day_number=1, due_date=today,
+        )
+        self.client.force_login(self.user)
+
+    def test_page_lazy_loads_charts(self):
+        response = self.client.get('/analytics/')
+        self.assertContains(response, 'data-chart-url="/analytics/charts/trend/"')
+
+    def test_chart_json_with_etag(self):
+        response = self.client.get('/analytics/charts/categories/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(response.json()[0]['category'], 'PLANNING')
+        self.assertIn('ETag', response)
+        self.assertIn('no-cache', response['Cache-Control'])
+
+    def test_revisit_is_not_modified_until_data_changes(self):
+        etag = self.client.get('/analytics/charts/trend/')['ETag']
+
+        response = self.client.get('/analytics/charts/trend/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        task = Task.objects.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f'/tasks/{task.pk}/done/')
+        response = self.client.get('/analytics/charts/trend/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_gzipped_when_accepted(self):
+        response = self.client.get('/analytics/charts/streak/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+    def test_unknown_chart_404(self):
+        response = self.client.get('/analytics/charts/nope/')
+        self.assertEqual(response.status_code, 404)
+
+
 class PasswordChangeViewTest(TestCase):
 
     def test_password_change_requires_login(self):
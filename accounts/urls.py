@@ -10,9 +10,11 @@ urlpatterns = [
     path('dashboard/', views.dashboard_view, name='dashboard'),
     path('dashboard/assessment/', views.assessment_view, name='assessment'),
     path('profile/', views.profile_view, name='profile'),
+    path('profile/export/<slug:dataset>.<slug:fmt>', views.data_export_view, name='data_export'),
     path('pulse/', views.weekly_pulse_view, name='pulse'),
     path('pulse/history/', views.pulse_history_view, name='pulse_history'),
     path('analytics/', views.analytics_view, name='analytics'),
+    path('analytics/charts/<slug:chart>/', views.analytics_chart_view, name='analytics_chart'),
     path('chat/', views.chat_view, name='chat'),
     path('chat/send/', views.chat_send_view, name='chat_send'),
     path('chat/new/', views.chat_new_session_view, name='chat_new_session'),
@@ -5,18 +5,20 @@ from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
 
 from onboarding.models import GeneratedDocument, WeeklyPulse
-import json
 
-from django.http import JsonResponse
-from django.views.decorators.http import require_POST
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.decorators.cache import cache_control
+from django.views.decorators.gzip import gzip_page
+from django.views.decorators.http import condition, require_POST
 
 from onboarding.chat_service import ChatService
 from onboarding.document_service import DocumentService
 from onboarding.forms import DocumentGenerationForm, WeeklyPulseForm
-from tasks.achievement_service import AchievementService
-from tasks.analytics_service import AnalyticsService
-from tasks.models import Task, TaskPlan
-from tasks.services import TaskGenerationService
+from tasks import analytics_cache, fragment_cache
+from tasks.analytics_service import CHARTS, AnalyticsService
+from tasks.dashboard_service import DashboardSnapshot
+from tasks.export_service import DATASETS, EXPORT_FORMATS, ExportService
+from tasks.pulse_trend_service import PulseTrendService
 
 from .forms import ProfileForm, SignupForm
 
@@ -51,69 +53,20 @@ def signup_view(request):
 @login_required
 def dashboard_view(request):
     if not request.user.profile.is_onboarded:
+        # Onboarding submitted but the plan is still being generated
+        job = request.user.plan_generation_jobs.filter(
+            kind='ONBOARDING', status__in=['PENDING', 'RUNNING', 'FAILED'],
+        ).order_by('-created_at').first()
+        if job:
+            return redirect('tasks:generation_progress', pk=job.pk)
         return redirect('onboarding:step_1')
 
-    today = timezone.now().date()
-    active_plan = TaskPlan.objects.filter(
-        user=request.user, status='ACTIVE',
-    ).first()
-
-    today_tasks = []
-    recent_completed = []
-    upcoming_tasks = []
-    stats = {}
-
-    if active_plan:
-        today_tasks = active_plan.tasks.filter(due_date=today).exclude(
-            status__in=['DONE', 'SKIPPED'],
-        )
-        recent_completed = active_plan.tasks.filter(
-            status='DONE',
-        ).order_by('-completed_at')[:5]
-        upcoming_tasks = active_plan.tasks.filter(
-            due_date__gt=today, status='PENDING',
-        )[:10]
-
-        total = active_plan.tasks.count()
-        done = active_plan.tasks.filter(status='DONE').count()
-        skipped = active_plan.tasks.filter(status='SKIPPED').count()
-        overdue = active_plan.tasks.filter(
-            due_date__lt=today, status__in=['PENDING', 'SENT'],
-        ).count()
-        stats = {
-            'total': total,
-            'done': done,
-            'skipped': skipped,
-            'remaining': total - done - skipped,
-            'overdue': overdue,
-        }
-
-    # Achievements & streak
-    current_streak = AchievementService.get_current_streak(request.user)
-    recent_achievements = AchievementService.get_user_achievements(
-        request.user,
-    )[:5]
-
-    # Weekly pulse check-in prompt
-    this_monday = _get_monday(today)
-    pulse_done_this_week = WeeklyPulse.objects.filter(
-        user=request.user, week_of=this_monday,
-    ).exists()
-
-    # Plan continuation detection
-    continuation = TaskGenerationService.detect_plan_ready_for_continuation(request.user)
-
+    # Parts of the snapshot load only when a fragment misses the cache
+    snapshot = DashboardSnapshot(request.user)
     return render(request, 'dashboard/home.html', {
-        'plan': active_plan,
-        'today_tasks': today_tasks,
-        'recent_completed': recent_completed,
-        'upcoming_tasks': upcoming_tasks,
-        'today': today,
-        'stats': stats,
-        'current_streak': current_streak,
-        'recent_achievements': recent_achievements,
-        'pulse_done_this_week': pulse_done_this_week,
-        'continuation': continuation,
+        'plan': snapshot.plan,
+        'today': snapshot.today,
+        'dashboard': snapshot,
     })
 
 
@@ -142,7 +95,24 @@ def profile_view(request):
     else:
         form = ProfileForm(instance=request.user.profile)
 
-    return render(request, 'registration/profile.html', {'form': form})
+    return render(request, 'registration/profile.html', {
+        'form': form,
+        'export_datasets': [(name, name.replace('_', ' ').capitalize()) for name in DATASETS],
+    })
+
+
+@login_required
+def data_export_view(request, dataset, fmt):
+    """Stream one of the user's own datasets as CSV or NDJSON."""
+    if dataset not in DATASETS or fmt not in EXPORT_FORMATS:
+        raise Http404
+
+    content_type = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    response = StreamingHttpResponse(
+        ExportService.lines(dataset, fmt, user=request.user), content_type=content_type,
+    )
+    response['Content-Disposition'] = f'attachment; filename="{dataset}.{fmt}"'
+    return response
 
 
 @login_required
@@ -167,6 +137,8 @@ def weekly_pulse_view(request):
             pulse.business_profile = profile
             pulse.week_of = this_monday
             pulse.save()
+            PulseTrendService.refresh([request.user.pk])
+            fragment_cache.bump('pulse', request.user.pk)
             messages.success(request, 'Weekly check-in saved!')
             return redirect('accounts:dashboard')
     else:
@@ -196,28 +168,30 @@ def analytics_view(request):
     if not request.user.profile.is_onboarded:
         return redirect('onboarding:step_1')
 
-    user = request.user
-    summary = AnalyticsService.get_summary_stats(user)
-    weekly_trend = AnalyticsService.get_weekly_completion_trend(user)
-    category_breakdown = AnalyticsService.get_category_breakdown(user)
-    time_invested = AnalyticsService.get_time_invested(user)
-    plan_comparison = AnalyticsService.get_plan_comparison(user)
-    streak_history = AnalyticsService.get_streak_history(user)
-    pulse_trends = AnalyticsService.get_pulse_trends(user)
-
-    chart_data = {
-        'weekly_trend': weekly_trend,
-        'category_breakdown': category_breakdown,
-        'time_invested': time_invested,
-        'streak_history': streak_history,
-        'pulse_trends': pulse_trends,
-    }
-
-    return render(request, 'dashboard/analytics.html', {
-        'summary': summary,
-        'plan_comparison': plan_comparison,
-        'chart_data_json': json.dumps(chart_data),
-    })
+    return render(request, 'dashboard/analytics.html', AnalyticsService.get_page_data(request.user))
+
+
+def _analytics_chart_etag(request, chart):
+    if chart not in CHARTS or not request.user.profile.is_onboarded:
+        return None
+    return analytics_cache.etag(request.user.pk, chart)
+
+
+@login_required
+@cache_control(private=True, no_cache=True)
+@gzip_page
+@condition(etag_func=_analytics_chart_etag)
+def analytics_chart_view(request, chart):
+    """JSON data for one analytics chart; revalidated with If-None-Match."""
+    if chart not in CHARTS:
+        raise Http404
+    if not request.user.profile.is_onboarded:
+        return JsonResponse({'error': 'Not onboarded'}, status=403)
+
+    return HttpResponse(
+        AnalyticsService.get_chart_json(request.user, chart),
+        content_type='application/json',
+    )
 
 
 @login_required
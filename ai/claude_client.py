@@ -7,6 +7,8 @@ from django.conf import settings
 
 import anthropic
 
+from . import fake_client
+
 logger = logging.getLogger(__name__)
 
 
@@ -29,6 +31,9 @@ def call_claude(system_prompt: str, user_prompt: str, max_tokens: int = 4096) ->
     Raises:
         ClaudeClientError: If the API call fails.
     """
+    if settings.AI_PROVIDER == 'fake':
+        return fake_client.complete(system_prompt, user_prompt, max_tokens)
+
     if not settings.ANTHROPIC_API_KEY:
         raise ClaudeClientError('ANTHROPIC_API_KEY not configured')
 
@@ -64,7 +69,10 @@ def call_claude_json(system_prompt: str, user_prompt: str, max_tokens: int = 409
         ClaudeClientError: If the API call or JSON parsing fails.
     """
     text = call_claude(system_prompt, user_prompt, max_tokens)
+    return _parse_json(text)
+
 
+def _parse_json(text: str) -> dict:
     # Strip markdown fences if present
     cleaned = text.strip()
     if cleaned.startswith('```'):
@@ -80,6 +88,110 @@ def call_claude_json(system_prompt: str, user_prompt: str, max_tokens: int = 409
         raise ClaudeClientError(f'Failed to parse Claude JSON response: {e}') from e
 
 
+def stream_claude(system_prompt: str, user_prompt: str, max_tokens: int = 4096):
+    """Stream a Claude response, yielding text chunks as they arrive.
+
+    Raises:
+        ClaudeClientError: If the API call fails (possibly mid-stream).
+    """
+    if settings.AI_PROVIDER == 'fake':
+        yield from fake_client.stream(system_prompt, user_prompt, max_tokens)
+        return
+
+    if not settings.ANTHROPIC_API_KEY:
+        raise ClaudeClientError('ANTHROPIC_API_KEY not configured')
+
+    client = anthropic.Anthropic(api_key=settings.ANTHROPIC_API_KEY)
+
+    try:
+        with client.messages.stream(
+            model=settings.ANTHROPIC_MODEL,
+            max_tokens=max_tokens,
+            system=system_prompt,
+            messages=[{'role': 'user', 'content': user_prompt}],
+        ) as stream:
+            yield from stream.text_stream
+            response = stream.get_final_message()
+        logger.info(
+            'Claude streaming call: model=%s, input_tokens=%d, output_tokens=%d',
+            settings.ANTHROPIC_MODEL,
+            response.usage.input_tokens,
+            response.usage.output_tokens,
+        )
+    except anthropic.APIError as e:
+        logger.error('Claude streaming API error: %s', e)
+        raise ClaudeClientError(f'Claude API error: {e}') from e
+
+
+def stream_claude_json(
+    system_prompt: str,
+    user_prompt: str,
+    max_tokens: int = 4096,
+    on_member=None,
+) -> dict:
+    """Stream a JSON object response and parse it.
+
+    ``on_member(key, value)`` is called for each top-level member as soon as
+    it has arrived in full, so callers can persist the leading parts of a
+    long response before the rest is generated.
+
+    Raises:
+        ClaudeClientError: If the API call or JSON parsing fails.
+    """
+    members = _TopLevelMembers(on_member) if on_member else None
+    chunks = []
+    for chunk in stream_claude(system_prompt, user_prompt, max_tokens):
+        chunks.append(chunk)
+        if members:
+            members.feed(chunk)
+    return _parse_json(''.join(chunks))
+
+
+class _TopLevelMembers:
+    """Incremental scanner reporting each completed top-level member of a JSON object."""
+
+    def __init__(self, callback):
+        self.callback = callback
+        self.buffer = []
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+
+    def feed(self, chunk: str):
+        for char in chunk:
+            if self.depth >= 1:
+                self.buffer.append(char)
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == '\\':
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char in '{[':
+                self.depth += 1
+            elif char in '}]':
+                self.depth -= 1
+                if self.depth == 0:
+                    self._emit(self.buffer[:-1])
+            elif char == ',' and self.depth == 1:
+                self._emit(self.buffer[:-1])
+
+    def _emit(self, member_chars):
+        self.buffer = []
+        text = ''.join(member_chars).strip()
+        if not text:
+            return
+        try:
+            (key, value), = json.loads('{' + text + '}').items()
+        except (json.JSONDecodeError, ValueError):
+            logger.warning('Could not parse streamed JSON member: %s', text[:200])
+            return
+        self.callback(key, value)
+
+
 def call_claude_chat(
     system_prompt: str,
     messages: list[dict],
@@ -98,6 +210,9 @@ def call_claude_chat(
     Raises:
         ClaudeClientError: If the API call fails.
     """
+    if settings.AI_PROVIDER == 'fake':
+        return fake_client.complete(system_prompt, messages[-1]['content'], max_tokens)
+
     if not settings.ANTHROPIC_API_KEY:
         raise ClaudeClientError('ANTHROPIC_API_KEY not configured')
 
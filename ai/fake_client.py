@@ -0,0 +1,135 @@
+"""Offline stand-in for the Claude API, selected with AI_PROVIDER='fake'.
+
+Returns canned, schema-valid responses for the prompts in ai.prompts and
+simulates latency with a simple model: a fixed time to first token, plus a
+per-token cost for input (prompt processing) and output (generation). Used
+for local development and the onboarding benchmark.
+"""
+
+import json
+import re
+import time
+
+from django.conf import settings
+
+FIRST_TOKEN_SECONDS = 0.6
+INPUT_SECONDS_PER_TOKEN = 0.0002
+OUTPUT_SECONDS_PER_TOKEN = 0.01
+CHARS_PER_TOKEN = 4
+STREAM_CHUNK_CHARS = 64
+
+# Running totals since the last reset_stats(); read by the benchmark
+stats = {'calls': 0, 'input_tokens': 0, 'output_tokens': 0}
+
+
+def reset_stats():
+    for key in stats:
+        stats[key] = 0
+
+
+def complete(system_prompt: str, user_prompt: str, max_tokens: int = 4096) -> str:
+    """Return the whole response after the simulated generation time."""
+    text = _response_for(system_prompt, max_tokens)
+    input_tokens = _record(system_prompt, user_prompt, text)
+    _sleep(
+        FIRST_TOKEN_SECONDS
+        + input_tokens * INPUT_SECONDS_PER_TOKEN
+        + _tokens(text) * OUTPUT_SECONDS_PER_TOKEN
+    )
+    return text
+
+
+def stream(system_prompt: str, user_prompt: str, max_tokens: int = 4096):
+    """Yield the response in chunks at the simulated generation rate."""
+    text = _response_for(system_prompt, max_tokens)
+    input_tokens = _record(system_prompt, user_prompt, text)
+    _sleep(FIRST_TOKEN_SECONDS + input_tokens * INPUT_SECONDS_PER_TOKEN)
+    for start in range(0, len(text), STREAM_CHUNK_CHARS):
+        chunk = text[start:start + STREAM_CHUNK_CHARS]
+        _sleep(_tokens(chunk) * OUTPUT_SECONDS_PER_TOKEN)
+        yield chunk
+
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def _record(system_prompt, user_prompt, text) -> int:
+    input_tokens = _tokens(system_prompt) + _tokens(user_prompt)
+    stats['calls'] += 1
+    stats['input_tokens'] += input_tokens
+    stats['output_tokens'] += _tokens(text)
+    return input_tokens
+
+
+def _sleep(seconds: float):
+    scale = getattr(settings, 'FAKE_AI_TIME_SCALE', 1.0)
+    if scale > 0:
+        time.sleep(seconds * scale)
+
+
+def _response_for(system_prompt: str, max_tokens: int) -> str:
+    """Pick a canned response by the JSON schema the system prompt asks for."""
+    match = re.search(r'(\d+)-day', system_prompt)
+    duration_days = int(match.group(1)) if match else 30
+
+    if '"assessment"' in system_prompt and '"tasks"' in system_prompt:
+        body = {'assessment': _assessment(), 'tasks': _tasks(duration_days)}
+    elif '"tasks"' in system_prompt:
+        body = {'tasks': _tasks(duration_days)}
+    elif '"viability_score"' in system_prompt:
+        body = _assessment()
+    elif '"remove_task_ids"' in system_prompt:
+        body = {
+            'remove_task_ids': [], 'reschedule': [], 'new_tasks': [],
+            'reasoning': 'No changes (fake AI provider)',
+        }
+    else:
+        return 'This is a placeholder reply from the fake AI provider.'
+    return json.dumps(body, indent=2)
+
+
+def _assessment() -> dict:
+    return {
+        'viability_score': 7,
+        'key_strengths': ['Clear offer', 'Motivated founder', 'Low startup cost'],
+        'key_risks': ['Unproven demand', 'Local competition', 'Limited time'],
+        'focus_areas': ['PLANNING', 'MARKETING', 'SALES'],
+        'first_steps': [
+            'Interview five potential customers',
+            'Set an introductory price',
+            'Create a one-page website',
+            'Open a business bank account',
+            'Announce the launch to your network',
+        ],
+        'time_to_revenue': '2-4 weeks',
+        'plan_type': 'standard_30_day',
+        'summary': 'A realistic idea with a clear first customer segment. '
+                   'Validate demand quickly, then focus on consistent outreach.',
+    }
+
+
+def _tasks(duration_days: int) -> list[dict]:
+    categories = ['PLANNING', 'MARKETING', 'SALES', 'DIGITAL', 'FINANCE', 'OPERATIONS']
+    tasks = []
+    for day in range(1, duration_days + 1):
+        for order in range(2):
+            category = categories[(day + order) % len(categories)]
+            tasks.append({
+                'day_number': day,
+                'sort_order': order,
+                'title': f'Complete {category.lower()} step {day}.{order + 1}',
+                'description': (
+                    f'Work through the {category.lower()} checklist for day {day}. '
+                    'Note anything that blocks you so tomorrow can adjust.'
+                ),
+                'category': category,
+                'difficulty': 'EASY' if day % 7 in (6, 0) else 'MEDIUM',
+                'estimated_minutes': 30 if order else 45,
+                'resources': [{
+                    'type': 'CHECKLIST',
+                    'title': f'Day {day} checklist',
+                    'content': '- [ ] Prepare\n- [ ] Do the work\n- [ ] Review the result',
+                }],
+            })
+    return tasks
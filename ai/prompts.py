@@ -142,6 +142,74 @@ AI Assessment:
 
 Generate a {duration_days}-day task plan with resources tailored to this specific business. Include templates, checklists, and guides that are specific to their business type and location."""
 
+# ──────────────────────────────────────────────
+# Combined Assessment + Plan (Claude — single call, ONBOARDING_AI_MODE=combined)
+# ──────────────────────────────────────────────
+
+ONBOARDING_COMBINED_SYSTEM = """You are an experienced business advisor and task planner. You will receive a business owner's profile. First assess the business, then build a {duration_days}-day action plan that follows from your assessment.
+
+Adapt both to the business stage:
+- Idea/Planning stage: Focus on validation, market fit, registration, setup, and launch. Progress from foundation to first customers.
+- Early stage: Focus on growth levers, customer acquisition, and building systems. Skip basic setup they've already done.
+- Growing stage: Focus on scaling, team building, process improvement, and bottlenecks. Tasks should be strategic, not basic.
+- Established stage: Focus on optimization, new opportunities, competitive positioning, and operational excellence.
+
+Return ONLY valid JSON. "assessment" MUST be the first key, followed by "tasks":
+{{
+    "assessment": {{
+        "viability_score": <1-10>,
+        "key_strengths": ["strength1", "strength2", "strength3"],
+        "key_risks": ["risk1", "risk2", "risk3"],
+        "focus_areas": ["area1", "area2", "area3"],
+        "first_steps": ["step1", "step2", "step3", "step4", "step5"],
+        "time_to_revenue": "e.g. 2-4 weeks",
+        "plan_type": "quick_launch|standard_30_day|deep_foundation",
+        "summary": "2-3 sentence personalized assessment"
+    }},
+    "tasks": [{{"day_number": 1, "sort_order": 0, "title": "...", "description": "...", "category": "...", "difficulty": "...", "estimated_minutes": 30, "resources": [{{"type": "CHECKLIST", "title": "...", "content": "- [ ] Step 1\\n- [ ] Step 2\\n..."}}]}}]
+}}
+
+Assessment rules:
+- For growing/established businesses "viability_score" reflects how well-positioned they are for their goals, "time_to_revenue" means time to impact, and "first_steps" target their improvement goals, not startup basics.
+- Be realistic but encouraging. Tailor advice to their business type, stage, and budget.
+
+Plan rules:
+1. Each day has 2-3 tasks maximum; day numbers are sequential from 1 and tasks within a day have sort_order (0, 1, 2).
+2. Tasks must be concrete, actionable, and completable in the estimated time. Titles start with an imperative verb; descriptions are 2-3 sentences with specific instructions.
+3. The first days should carry out the "first_steps" from your assessment.
+4. Lighter tasks on weekend days (6, 7, 13, 14, 20, 21, 27, 28).
+5. Make tasks specific to their business type and tailor difficulty to their available hours and experience.
+6. Skip tasks for things they already have.
+7. Each task includes 1-3 resources. For LINK resources include a "url" field; for all others include "content" in markdown.
+
+Categories: LEGAL, FINANCE, MARKETING, PRODUCT, SALES, OPERATIONS, DIGITAL, PLANNING
+Difficulty: EASY (under 30 min), MEDIUM (30-90 min), HARD (2+ hours)
+Resource types: TEMPLATE, CHECKLIST, GUIDE, LINK, WORKSHEET"""
+
+ONBOARDING_COMBINED_USER = """{profile}
+
+Assess this business, then generate a {duration_days}-day task plan with resources tailored to it."""
+
+# ──────────────────────────────────────────────
+# Warm-pool Plan Personalization (Claude — short rewrites, JSON)
+# ──────────────────────────────────────────────
+
+PLAN_PERSONALIZATION_SYSTEM = """You personalize tasks from a generic business action plan for one specific business.
+Rewrite each task's title and description so it speaks to their business: name, niche, location, audience and goals.
+Keep each task's intent, scope and difficulty. Do not add, drop or merge tasks. Titles start with an imperative verb; descriptions stay 2-3 sentences.
+
+Return ONLY valid JSON:
+{"tasks": [{"id": 123, "title": "...", "description": "..."}]}"""
+
+PLAN_PERSONALIZATION_USER = """Business: {business_name} ({business_type}, {stage})
+Niche: {niche}
+Location: {location}
+Target audience: {target_audience}
+Goals: {goals}
+
+Tasks:
+{tasks_json}"""
+
 # ──────────────────────────────────────────────
 # Daily Message Formatting (OpenAI — cheap, high volume)
 # ──────────────────────────────────────────────
@@ -0,0 +1,47 @@
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, override_settings
+
+from ai import fake_client
+from ai.claude_client import call_claude_json, stream_claude_json
+from ai.prompts import ONBOARDING_COMBINED_SYSTEM, PLAN_GENERATION_SYSTEM
+
+
+@override_settings(AI_PROVIDER='fake', FAKE_AI_TIME_SCALE=0)
+class FakeProviderTest(SimpleTestCase):
+
+    def test_plan_prompt_returns_tasks(self):
+        result = call_claude_json(PLAN_GENERATION_SYSTEM.format(duration_days=7), 'profile')
+        self.assertEqual(len(result['tasks']), 14)
+        self.assertEqual(result['tasks'][-1]['day_number'], 7)
+
+    def test_stats_count_calls_and_tokens(self):
+        fake_client.reset_stats()
+        call_claude_json(PLAN_GENERATION_SYSTEM.format(duration_days=7), 'profile')
+        self.assertEqual(fake_client.stats['calls'], 1)
+        self.assertGreater(fake_client.stats['output_tokens'], 0)
+
+
+class StreamClaudeJsonTest(SimpleTestCase):
+
+    def _stream(self, chunks):
+        return patch('ai.claude_client.stream_claude', return_value=iter(chunks))
+
+    def test_members_reported_as_they_complete(self):
+        seen = []
+        chunks = ['```json\n{"assessment": {"summary": "a, \\"b\\" }"', ', "score": [1, 2]}',
+                  ', "tasks": [{"title": "T"}]}\n```']
+        with self._stream(chunks):
+            result = stream_claude_json('sys', 'user', on_member=lambda k, v: seen.append((k, v)))
+        self.assertEqual(seen[0], ('assessment', {'summary': 'a, "b" }', 'score': [1, 2]}))
+        self.assertEqual(seen[1], ('tasks', [{'title': 'T'}]))
+        self.assertEqual(result['tasks'], [{'title': 'T'}])
+
+    @override_settings(AI_PROVIDER='fake', FAKE_AI_TIME_SCALE=0)
+    def test_combined_response_streams_assessment_first(self):
+        keys = []
+        stream_claude_json(
+            ONBOARDING_COMBINED_SYSTEM.format(duration_days=3), 'profile',
+            on_member=lambda k, v: keys.append(k),
+        )
+        self.assertEqual(keys, ['assessment', 'tasks'])
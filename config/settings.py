@@ -3,8 +3,10 @@ Django settings for the AI Business Building Assistant.
 """
 
 import os
+import tempfile
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -42,6 +44,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'accounts.middleware.UserIdentityMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'axes.middleware.AxesMiddleware',
@@ -80,6 +83,32 @@ DATABASES = {
     }
 }
 
+# Cache — analytics payloads and template fragments.
+# Their version bumps must reach every web worker, so outside DEBUG the
+# cache has to be shared ('file', through CACHE_LOCATION); 'locmem' is per
+# process and only allowed for local development.
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'locmem' if DEBUG else 'file')
+CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+}
+if CACHE_BACKEND == 'locmem' and not DEBUG:
+    raise ImproperlyConfigured(
+        "CACHE_BACKEND='locmem' is per process; cached analytics would go stale "
+        "across workers. Use 'file'."
+    )
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS[CACHE_BACKEND],
+        'LOCATION': os.environ.get(
+            'CACHE_LOCATION',
+            os.path.join(tempfile.gettempdir(), 'bizassistant-cache')
+            if CACHE_BACKEND == 'file' else 'bizassistant',
+        ),
+        'OPTIONS': {'MAX_ENTRIES': int(os.environ.get('CACHE_MAX_ENTRIES', '10000'))},
+    }
+}
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -113,10 +142,45 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 ANTHROPIC_API_KEY = os.environ.get('ANTHROPIC_API_KEY', '')
 ANTHROPIC_MODEL = os.environ.get('ANTHROPIC_MODEL', 'claude-opus-4-20250514')
 
+# 'anthropic', or 'fake' for the offline stand-in in ai/fake_client.py
+AI_PROVIDER = os.environ.get('AI_PROVIDER', 'anthropic')
+# Multiplier on the fake provider's simulated latency (0 disables sleeping)
+FAKE_AI_TIME_SCALE = float(os.environ.get('FAKE_AI_TIME_SCALE', '1.0'))
+# Onboarding AI flow: 'two_call' (assessment, then plan) or 'combined'
+# (one streamed call returning both)
+ONBOARDING_AI_MODE = os.environ.get('ONBOARDING_AI_MODE', 'two_call')
+
 OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY', '')
 OPENAI_MODEL_CHEAP = os.environ.get('OPENAI_MODEL_CHEAP', 'gpt-4.1-nano')
 OPENAI_MODEL_MID = os.environ.get('OPENAI_MODEL_MID', 'gpt-4.1-mini')
 
+# ──────────────────────────────────────────────
+# Background plan jobs (process_plan_jobs)
+# ──────────────────────────────────────────────
+# Quiet period after the latest skip before a plan adjustment runs
+PLAN_ADJUSTMENT_DEBOUNCE_SECONDS = int(os.environ.get('PLAN_ADJUSTMENT_DEBOUNCE_SECONDS', '600'))
+# How long onboarding waits for a speculative assessment already running
+# on the worker before calling Claude itself
+SPECULATION_WAIT_SECONDS = int(os.environ.get('SPECULATION_WAIT_SECONDS', '90'))
+# Warm pool of pre-generated plans (refresh_warm_pool)
+WARM_POOL_ENABLED = os.environ.get('WARM_POOL_ENABLED', 'True').lower() in ('true', '1', 'yes')
+# Number of type × stage combinations kept warm, by recent signups
+WARM_POOL_SIZE = int(os.environ.get('WARM_POOL_SIZE', '20'))
+WARM_POOL_MAX_AGE_DAYS = int(os.environ.get('WARM_POOL_MAX_AGE_DAYS', '14'))
+# Generated plans reused between profiles with the same fingerprint (plan_cache_service)
+PLAN_CACHE_ENABLED = os.environ.get('PLAN_CACHE_ENABLED', 'True').lower() in ('true', '1', 'yes')
+PLAN_CACHE_TTL_DAYS = int(os.environ.get('PLAN_CACHE_TTL_DAYS', '30'))
+PLAN_CACHE_MAX_REUSES = int(os.environ.get('PLAN_CACHE_MAX_REUSES', '20'))
+# Nearest-neighbor entries at least this similar (0-1) are offered to a new user
+# and used when Claude is down; 1 = exact only
+PLAN_CACHE_MIN_SIMILARITY = float(os.environ.get('PLAN_CACHE_MIN_SIMILARITY', '0.9'))
+# Empty cache entries generated from scrubbed profiles per refresh_warm_pool run
+PLAN_CACHE_FILL_PER_RUN = int(os.environ.get('PLAN_CACHE_FILL_PER_RUN', '20'))
+# A generation job is retried with backoff up to this many attempts
+PLAN_GENERATION_MAX_ATTEMPTS = int(os.environ.get('PLAN_GENERATION_MAX_ATTEMPTS', '3'))
+# RUNNING jobs with no progress for this long are assumed dead and re-run
+PLAN_GENERATION_TIMEOUT_SECONDS = int(os.environ.get('PLAN_GENERATION_TIMEOUT_SECONDS', '900'))
+
 # ──────────────────────────────────────────────
 # Twilio SMS
 # ──────────────────────────────────────────────
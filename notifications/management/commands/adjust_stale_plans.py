@@ -7,8 +7,8 @@ import logging
 
 from django.core.management.base import BaseCommand
 
+from accounts.identity import get_active_plan
 from accounts.models import UserProfile
-from tasks.models import TaskPlan
 from tasks.services import TaskGenerationService
 
 logger = logging.getLogger(__name__)
@@ -22,14 +22,12 @@ class Command(BaseCommand):
 
         profiles = UserProfile.objects.filter(
             is_onboarded=True,
-        ).select_related('user')
+        ).select_related('user', 'active_plan')
 
         for profile in profiles:
             try:
                 user = profile.user
-                plan = TaskPlan.objects.filter(
-                    user=user, status='ACTIVE',
-                ).first()
+                plan = get_active_plan(user)
 
                 if not plan:
                     continue
@@ -47,12 +45,17 @@ class Command(BaseCommand):
                         break
 
                 if consecutive_skips >= 3:
-                    TaskGenerationService.adjust_plan(
+                    summary = TaskGenerationService.adjust_plan(
                         plan,
                         reason=f'{consecutive_skips} consecutive skipped tasks',
                     )
+                    if summary is None:
+                        continue
                     adjusted_count += 1
-                    self.stdout.write(f'  Adjusted plan for {user.username}')
+                    self.stdout.write(
+                        f'  Adjusted plan for {user.username}: '
+                        f"-{summary['removed']} ~{summary['rescheduled']} +{summary['added']}"
+                    )
 
             except Exception:
                 logger.exception(
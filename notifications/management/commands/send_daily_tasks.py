@@ -32,7 +32,7 @@ class Command(BaseCommand):
         # Get all onboarded users
         profiles = UserProfile.objects.filter(
             is_onboarded=True,
-        ).select_related('user')
+        ).select_related('user', 'active_plan')
 
         for profile in profiles:
             try:
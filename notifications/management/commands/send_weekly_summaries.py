@@ -14,9 +14,9 @@ from django.utils import timezone
 
 from ai.openai_client import OpenAIClientError, call_openai
 from ai.prompts import WEEKLY_SUMMARY_SYSTEM, WEEKLY_SUMMARY_USER
+from accounts.identity import get_active_plan
 from accounts.models import UserProfile
 from notifications.services import NotificationService
-from tasks.models import TaskPlan
 
 logger = logging.getLogger(__name__)
 
@@ -31,14 +31,12 @@ class Command(BaseCommand):
 
         profiles = UserProfile.objects.filter(
             is_onboarded=True,
-        ).select_related('user')
+        ).select_related('user', 'active_plan')
 
         for profile in profiles:
             try:
                 user = profile.user
-                plan = TaskPlan.objects.filter(
-                    user=user, status='ACTIVE',
-                ).first()
+                plan = get_active_plan(user)
 
                 if not plan:
                     continue
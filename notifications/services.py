@@ -9,6 +9,8 @@ from django.conf import settings
 from django.template.loader import render_to_string
 from django.utils import timezone
 
+from tasks.services import TaskProgressService
+
 from .models import MessageLog
 
 logger = logging.getLogger(__name__)
@@ -148,12 +150,11 @@ class NotificationService:
                 logs.append(log)
 
         # Mark tasks as SENT
-        for task in tasks:
-            if task.status == 'PENDING':
-                task.status = 'SENT'
-                task.sent_at = timezone.now()
-                task.personalized_message = personalized_message
-                task.save()
+        TaskProgressService.transition_tasks(
+            [task for task in tasks if task.status == 'PENDING'], 'SENT',
+            sent_at=timezone.now(),
+            personalized_message=personalized_message,
+        )
 
         return logs
 
@@ -9,6 +9,7 @@ import logging
 
 from django.conf import settings
 from django.http import HttpResponse, HttpResponseForbidden, JsonResponse
+from django.utils import timezone
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
 
@@ -55,7 +56,9 @@ def twilio_inbound_sms(request):
 
     # Find user by phone number
     try:
-        profile = UserProfile.objects.get(phone=from_number)
+        profile = UserProfile.objects.select_related(
+            'user', 'active_plan',
+        ).get(phone=from_number)
         user = profile.user
     except UserProfile.DoesNotExist:
         logger.warning('Inbound SMS from unknown number: %s', from_number)
@@ -108,7 +111,7 @@ def twilio_status_callback(request):
     new_status = status_map.get(status)
     if new_status and message_sid:
         updated = MessageLog.objects.filter(twilio_sid=message_sid).update(
-            status=new_status,
+            status=new_status, updated_at=timezone.now(),
         )
         if updated:
             logger.info('Twilio status update: %s -> %s', message_sid, new_status)
@@ -146,7 +149,7 @@ def sendgrid_event_webhook(request):
         if new_status and sg_message_id:
             MessageLog.objects.filter(
                 sendgrid_message_id__startswith=sg_message_id,
-            ).update(status=new_status)
+            ).update(status=new_status, updated_at=timezone.now())
 
     return HttpResponse('OK')
 
@@ -1,6 +1,8 @@
 from django.contrib import admin
 
-from .models import BusinessProfile, Conversation, GeneratedDocument, WeeklyPulse
+from .models import (
+    BusinessProfile, Conversation, GeneratedDocument, SpeculativeAssessment, WeeklyPulse,
+)
 
 
 @admin.register(BusinessProfile)
@@ -44,3 +46,11 @@ class GeneratedDocumentAdmin(admin.ModelAdmin):
     list_filter = ['doc_type', 'is_favorite']
     search_fields = ['user__username', 'title', 'content']
     readonly_fields = ['ai_model_used', 'created_at']
+
+
+@admin.register(SpeculativeAssessment)
+class SpeculativeAssessmentAdmin(admin.ModelAdmin):
+    list_display = ['user', 'status', 'data_hash', 'created_at', 'finished_at']
+    list_filter = ['status']
+    search_fields = ['user__username', 'data_hash']
+    readonly_fields = ['wizard_data', 'assessment', 'created_at', 'finished_at']
@@ -5,9 +5,10 @@ import uuid
 
 from django.utils import timezone
 
+from accounts.identity import get_active_plan
 from ai.claude_client import ClaudeClientError, call_claude_chat
 from ai.prompts import CHAT_ADVISOR_SYSTEM
-from tasks.models import TaskPlan
+from tasks.models import PulseTrend
 
 from .models import Conversation, WeeklyPulse
 
@@ -107,12 +108,11 @@ class ChatService:
         assessment = profile.ai_assessment or {}
 
         # Plan progress
-        active_plan = TaskPlan.objects.filter(user=user, status='ACTIVE').first()
+        active_plan = get_active_plan(user)
         if active_plan:
-            total = active_plan.tasks.count()
-            done = active_plan.tasks.filter(status='DONE').count()
             plan_progress = (
-                f'{active_plan.title}: {done}/{total} tasks done '
+                f'{active_plan.title}: '
+                f'{active_plan.tasks_done}/{active_plan.tasks_total} tasks done '
                 f'({active_plan.completion_pct}% complete), '
                 f'Phase {active_plan.phase}'
             )
@@ -130,6 +130,9 @@ class ChatService:
                 f'Win: "{pulse.biggest_win}", '
                 f'Blocker: "{pulse.biggest_blocker}"'
             )
+            trend = PulseTrend.objects.filter(user=user).first()
+            if trend:
+                recent_pulse += f'. Trend: {ChatService._describe_trend(trend)}'
         else:
             recent_pulse = 'No pulse data yet'
 
@@ -144,6 +147,27 @@ class ChatService:
             recent_pulse=recent_pulse,
         )
 
+    @staticmethod
+    def _describe_trend(trend) -> str:
+        """One line of the user's precomputed revenue and customer trends."""
+        parts = []
+        for metric, growth, unit in (
+            ('revenue', trend.revenue_growth, '$'),
+            ('customers', trend.customers_growth, ''),
+        ):
+            average = next((v for v in reversed(trend.rolling.get(metric, [])) if v is not None), None)
+            forecast = trend.forecast.get(metric, {}).get('smoothed')
+            details = []
+            if growth is not None:
+                details.append(f'{growth:+.0f}% week over week')
+            if average is not None:
+                details.append(f'4-week avg {unit}{average:g}')
+            if forecast is not None:
+                details.append(f'next week ~{unit}{forecast:g}')
+            if details:
+                parts.append(f"{metric} {', '.join(details)}")
+        return '; '.join(parts) or 'not enough weeks yet'
+
     @staticmethod
     def _build_message_history(user, session_id) -> list[dict]:
         """Convert chat history to Claude API format (last 20 messages)."""
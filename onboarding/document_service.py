@@ -72,5 +72,5 @@ class DocumentService:
     def toggle_favorite(document) -> GeneratedDocument:
         """Toggle favorite status of a document."""
         document.is_favorite = not document.is_favorite
-        document.save(update_fields=['is_favorite'])
+        document.save(update_fields=['is_favorite', 'updated_at'])
         return document
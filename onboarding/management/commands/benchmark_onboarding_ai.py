@@ -0,0 +1,95 @@
+"""Management command: compare the two-call and combined onboarding AI flows.
+
+Runs the onboarding generation job against the fake AI provider (see
+ai/fake_client.py) in both ONBOARDING_AI_MODE settings and reports time to
+assessment, time to finished plan, and tokens sent/received. All database
+writes are rolled back.
+"""
+
+import statistics
+import time
+import uuid
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+
+from ai import fake_client
+from onboarding.models import BusinessProfile
+from tasks.job_service import PlanJobService
+from tasks.models import PlanGenerationJob
+
+MODES = ('two_call', 'combined')
+
+SAMPLE_PROFILE = {
+    'business_name': 'Benchmark Bakery',
+    'business_type': 'Bakery',
+    'stage': 'IDEA',
+    'description': 'Neighborhood bakery selling sourdough and pastries',
+    'goals': ['First 10 customers', 'Launch website'],
+    'location': 'Austin, TX',
+    'niche': 'Sourdough',
+    'owner_skills': ['design'],
+    'hours_per_day': 3,
+}
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the two-call vs combined onboarding AI flow with the fake provider'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=3, help='Runs per mode')
+        parser.add_argument(
+            '--time-scale', type=float, default=1.0,
+            help='Multiplier on the fake provider latency model',
+        )
+
+    def handle(self, *args, **options):
+        for mode in MODES:
+            with override_settings(
+                AI_PROVIDER='fake',
+                FAKE_AI_TIME_SCALE=options['time_scale'],
+                ONBOARDING_AI_MODE=mode,
+                # A cache or pool hit would skip both flows being compared
+                PLAN_CACHE_ENABLED=False,
+                WARM_POOL_ENABLED=False,
+            ):
+                runs = [self._run_once() for _ in range(options['runs'])]
+
+            self.stdout.write(
+                f'{mode:>9}: '
+                f"assessment {statistics.mean(r['assessment'] for r in runs):6.2f}s  "
+                f"plan {statistics.mean(r['total'] for r in runs):6.2f}s  "
+                f"calls {runs[0]['calls']}  "
+                f"input tokens {runs[0]['input_tokens']}  "
+                f"output tokens {runs[0]['output_tokens']}"
+            )
+
+        self.stdout.write(self.style.SUCCESS('Benchmark complete'))
+
+    def _run_once(self) -> dict:
+        with transaction.atomic():
+            user = User.objects.create_user(f'bench-{uuid.uuid4().hex[:12]}')
+            profile = BusinessProfile.objects.create(user=user, **SAMPLE_PROFILE)
+            job = PlanGenerationJob.objects.create(
+                user=user, kind='ONBOARDING', status='RUNNING', attempts=1,
+            )
+
+            fake_client.reset_stats()
+            started = time.perf_counter()
+            started_at = job.created_at
+            PlanJobService.run_generation(job)
+            total = time.perf_counter() - started
+
+            profile.refresh_from_db()
+            job.refresh_from_db()
+            if job.status != 'DONE':
+                self.stderr.write(f'  Job failed: {job.error_message}')
+            result = {
+                'assessment': (profile.assessment_generated_at - started_at).total_seconds(),
+                'total': total,
+                **fake_client.stats,
+            }
+            transaction.set_rollback(True)
+        return result
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-19 15:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('onboarding', '0007_speculative_assessment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='weeklypulse',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 6.0.2 on 2026-10-19 16:35
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_updated_at(apps, schema_editor):
+    apps.get_model('onboarding', 'GeneratedDocument').objects.update(updated_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('onboarding', '0008_weeklypulse_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='generateddocument',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+    ]
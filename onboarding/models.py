@@ -170,6 +170,7 @@ class WeeklyPulse(models.Model):
     biggest_blocker = models.TextField(blank=True)
     notes = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         unique_together = [('user', 'week_of')]
@@ -248,9 +249,45 @@ class GeneratedDocument(models.Model):
     is_favorite = models.BooleanField(default=False)
     ai_model_used = models.CharField(max_length=50, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         ordering = ['-created_at']
 
     def __str__(self):
         return f'{self.get_doc_type_display()}: {self.title}'
+
+
+class SpeculativeAssessment(models.Model):
+    """Assessment started when wizard step 5 is submitted, before launch.
+
+    Keyed by a hash of the wizard session data; step 6 reuses it only if the
+    data is unchanged. Run by the ``process_plan_jobs`` worker.
+    """
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('RUNNING', 'Running'),
+        ('DONE', 'Done'),
+        ('FAILED', 'Failed'),
+        ('CANCELLED', 'Cancelled'),
+        ('USED', 'Used by a profile'),
+    ]
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='speculative_assessments',
+    )
+    data_hash = models.CharField(max_length=64)
+    wizard_data = models.JSONField(default=dict)
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default='PENDING',
+    )
+    assessment = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        unique_together = [('user', 'data_hash')]
+
+    def __str__(self):
+        return f'Speculative assessment for {self.user.username} [{self.status}]'
@@ -3,29 +3,47 @@
 All onboarding mutations go through this service.
 """
 
+import hashlib
+import json
 import logging
+import time
 from datetime import timedelta
 
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.utils import timezone
 
-from ai.claude_client import ClaudeClientError, call_claude_json
+from ai.claude_client import ClaudeClientError, call_claude_json, stream_claude_json
 from ai.prompts import (
     ONBOARDING_ASSESSMENT_SYSTEM,
     ONBOARDING_ASSESSMENT_USER,
+    ONBOARDING_COMBINED_SYSTEM,
+    ONBOARDING_COMBINED_USER,
 )
+from tasks import fragment_cache
+from tasks.plan_cache_service import PlanCacheService
 from tasks.services import TaskGenerationService
 
-from .models import BusinessProfile, Conversation
+from .models import BusinessProfile, Conversation, SpeculativeAssessment
 
 logger = logging.getLogger(__name__)
 
+SPECULATION_POLL_SECONDS = 1
+
 
 class OnboardingService:
 
     @staticmethod
     def create_business_profile(user: User, form_data: dict) -> BusinessProfile:
         """Create BusinessProfile from combined wizard form data."""
+        profile, _created = BusinessProfile.objects.update_or_create(
+            user=user, defaults=OnboardingService._profile_fields(form_data),
+        )
+        return profile
+
+    @staticmethod
+    def _profile_fields(form_data: dict) -> dict:
+        """Map combined wizard form data to BusinessProfile field values."""
         # Parse goals from newline-separated text to list
         goals_text = form_data.get('goals', '')
         goals = [g.strip() for g in goals_text.split('\n') if g.strip()]
@@ -34,7 +52,7 @@ class OnboardingService:
         competitors_text = form_data.get('known_competitors', '')
         competitors = [c.strip() for c in competitors_text.split('\n') if c.strip()]
 
-        defaults = {
+        return {
             'business_name': form_data['business_name'],
             'business_type': form_data['business_type'],
             'stage': form_data['stage'],
@@ -65,20 +83,35 @@ class OnboardingService:
             'has_domain': form_data.get('has_domain', False),
             'has_branding': form_data.get('has_branding', False),
         }
-        profile, _created = BusinessProfile.objects.update_or_create(
-            user=user, defaults=defaults,
-        )
-        return profile
 
     @staticmethod
     def run_ai_assessment(profile: BusinessProfile) -> dict:
         """Send profile to Claude for assessment. Updates profile fields."""
+        try:
+            assessment = OnboardingService._request_assessment(profile)
+        except ClaudeClientError:
+            logger.exception('AI assessment failed for profile %d', profile.pk)
+            assessment = OnboardingService._fallback_assessment(profile)
+
+        OnboardingService._store_assessment(profile, assessment)
+        return assessment
+
+    @staticmethod
+    def _request_assessment(profile: BusinessProfile) -> dict:
+        """Ask Claude to assess a (possibly unsaved) profile."""
+        return call_claude_json(
+            ONBOARDING_ASSESSMENT_SYSTEM,
+            OnboardingService._profile_prompt(profile),
+        )
+
+    @staticmethod
+    def _profile_prompt(profile: BusinessProfile) -> str:
         skill_map = dict(BusinessProfile.SKILL_CHOICES)
         skills_display = [skill_map.get(s, s) for s in (profile.owner_skills or [])]
         platform_map = dict(BusinessProfile.PLATFORM_CHOICES)
         platforms_display = [platform_map.get(p, p) for p in (profile.social_platforms or [])]
 
-        user_prompt = ONBOARDING_ASSESSMENT_USER.format(
+        return ONBOARDING_ASSESSMENT_USER.format(
             business_name=profile.business_name,
             business_type=profile.business_type,
             stage=profile.get_stage_display(),
@@ -104,19 +137,13 @@ class OnboardingService:
             has_email_list='Yes' if profile.has_email_list else 'No',
         )
 
-        try:
-            assessment = call_claude_json(
-                ONBOARDING_ASSESSMENT_SYSTEM,
-                user_prompt,
-            )
-        except ClaudeClientError:
-            logger.exception('AI assessment failed for profile %d', profile.pk)
-            assessment = OnboardingService._fallback_assessment(profile)
-
+    @staticmethod
+    def _store_assessment(profile: BusinessProfile, assessment: dict):
         profile.ai_assessment = assessment
         profile.ai_model_used = 'claude-sonnet'
         profile.assessment_generated_at = timezone.now()
         profile.save()
+        fragment_cache.bump('assessment', profile.user_id)
 
         # Store conversation for context
         Conversation.objects.create(
@@ -126,18 +153,162 @@ class OnboardingService:
             metadata={'assessment': assessment},
         )
 
-        return assessment
+    @staticmethod
+    def wizard_data_hash(wizard_data: dict) -> str:
+        """Stable hash of the wizard session data."""
+        payload = json.dumps(wizard_data, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    @staticmethod
+    def speculate_assessment(user: User, wizard_data: dict) -> SpeculativeAssessment:
+        """Queue an assessment for wizard data the user has not launched yet.
+
+        Speculations for other (stale) data are cancelled.
+        """
+        data_hash = OnboardingService.wizard_data_hash(wizard_data)
+        OnboardingService.cancel_speculations(user, keep_hash=data_hash)
+        spec, created = SpeculativeAssessment.objects.get_or_create(
+            user=user, data_hash=data_hash,
+            defaults={'wizard_data': wizard_data},
+        )
+        if not created and spec.status in ('FAILED', 'CANCELLED', 'USED'):
+            spec.status = 'PENDING'
+            spec.assessment = {}
+            spec.finished_at = None
+            spec.save(update_fields=['status', 'assessment', 'finished_at'])
+        return spec
 
     @staticmethod
-    def generate_initial_plan(profile: BusinessProfile):
+    def cancel_speculations(user: User, keep_hash: str = ''):
+        """Cancel the user's unused speculations, except the one for ``keep_hash``."""
+        SpeculativeAssessment.objects.filter(
+            user=user, status__in=['PENDING', 'RUNNING', 'DONE'],
+        ).exclude(data_hash=keep_hash).update(status='CANCELLED')
+
+    @staticmethod
+    def run_due_speculations(limit: int = 20) -> int:
+        """Run pending speculative assessments. Returns count run."""
+        ran = 0
+        for spec in SpeculativeAssessment.objects.filter(status='PENDING')[:limit]:
+            if OnboardingService.run_speculation(spec):
+                ran += 1
+        return ran
+
+    @staticmethod
+    def run_speculation(spec: SpeculativeAssessment) -> bool:
+        """Claim and run one speculation. Returns False if it was already taken."""
+        claimed = SpeculativeAssessment.objects.filter(
+            pk=spec.pk, status='PENDING',
+        ).update(status='RUNNING')
+        if not claimed:
+            return False
+
+        draft = BusinessProfile(
+            user_id=spec.user_id, **OnboardingService._profile_fields(spec.wizard_data),
+        )
+        try:
+            assessment = OnboardingService._request_assessment(draft)
+        except ClaudeClientError:
+            logger.exception('Speculative assessment %d failed', spec.pk)
+            status, assessment = 'FAILED', {}
+        else:
+            status = 'DONE'
+
+        # A cancel while Claude was running wins; the result is discarded
+        SpeculativeAssessment.objects.filter(pk=spec.pk, status='RUNNING').update(
+            status=status, assessment=assessment, finished_at=timezone.now(),
+        )
+        return True
+
+    @staticmethod
+    def ensure_assessment(profile: BusinessProfile, since=None) -> dict:
+        """Assess ``profile`` unless it was assessed after ``since``.
+
+        Reuses the user's speculative assessment when one is still valid
+        (step 6 cancels speculations whose data no longer matches).
+        """
+        if since and profile.assessment_generated_at and profile.assessment_generated_at >= since:
+            return profile.ai_assessment
+
+        spec = SpeculativeAssessment.objects.filter(
+            user_id=profile.user_id, status__in=['PENDING', 'RUNNING', 'DONE'],
+        ).first()
+        if spec and spec.status == 'PENDING':
+            # Not picked up yet — run it here rather than calling Claude twice
+            OnboardingService.run_speculation(spec)
+            spec.refresh_from_db()
+        if spec and spec.status == 'RUNNING':
+            # Already with Claude on the worker — its answer is on the way
+            OnboardingService._wait_for_speculation(spec)
+        if spec and spec.status == 'DONE':
+            OnboardingService._store_assessment(profile, spec.assessment)
+            spec.status = 'USED'
+            spec.save(update_fields=['status'])
+            return spec.assessment
+
+        OnboardingService.cancel_speculations(profile.user)
+        return OnboardingService.run_ai_assessment(profile)
+
+    @staticmethod
+    def _wait_for_speculation(spec: SpeculativeAssessment):
+        """Poll a RUNNING speculation until it finishes or SPECULATION_WAIT_SECONDS pass."""
+        deadline = time.monotonic() + settings.SPECULATION_WAIT_SECONDS
+        while spec.status == 'RUNNING' and time.monotonic() < deadline:
+            time.sleep(SPECULATION_POLL_SECONDS)
+            spec.refresh_from_db(fields=['status', 'assessment'])
+
+    @staticmethod
+    def generate_initial_plan(profile: BusinessProfile, job=None):
         """Generate the initial 30-day task plan."""
-        return TaskGenerationService.generate_plan(profile)
+        return TaskGenerationService.generate_plan(profile, job=job)
+
+    @staticmethod
+    def generate_assessment_and_plan(profile: BusinessProfile, job=None, duration_days: int = 30):
+        """Assess the profile and generate its first plan in one streamed Claude call.
+
+        The assessment is stored as soon as it has streamed in, before the
+        tasks. If the call fails, falls back to the two-call flow for
+        whatever is still missing.
+        """
+        assessed = []
+
+        def store_member(key, value):
+            if key == 'assessment' and isinstance(value, dict) and not assessed:
+                OnboardingService._store_assessment(profile, value)
+                assessed.append(value)
+
+        user_prompt = ONBOARDING_COMBINED_USER.format(
+            profile=OnboardingService._profile_prompt(profile),
+            duration_days=duration_days,
+        )
+        try:
+            result = stream_claude_json(
+                ONBOARDING_COMBINED_SYSTEM.format(duration_days=duration_days),
+                user_prompt,
+                max_tokens=16000,
+                on_member=store_member,
+            )
+        except ClaudeClientError:
+            logger.exception('Combined onboarding call failed for profile %d', profile.pk)
+            result = {}
+
+        if not assessed:
+            if isinstance(result.get('assessment'), dict):
+                store_member('assessment', result['assessment'])
+            else:
+                OnboardingService.run_ai_assessment(profile)
+
+        tasks_data = result.get('tasks')
+        if not tasks_data:
+            return TaskGenerationService.generate_plan(profile, duration_days, job=job)
+        PlanCacheService.store(profile, tasks_data, duration_days)
+        return TaskGenerationService.create_plan(profile, tasks_data, duration_days, job=job)
 
     @staticmethod
     def complete_onboarding(user: User):
         """Mark user as onboarded."""
         user.profile.is_onboarded = True
-        user.profile.save()
+        user.profile.save(update_fields=['is_onboarded', 'updated_at'])
 
     @staticmethod
     def _fallback_assessment(profile: BusinessProfile) -> dict:
@@ -1,9 +1,12 @@
+from io import StringIO
 from unittest.mock import patch
 
+from django.conf import settings
 from django.contrib.auth.models import User
-from django.test import TestCase
+from django.core.management import call_command
+from django.test import TestCase, override_settings
 
-from onboarding.models import BusinessProfile, Conversation
+from onboarding.models import BusinessProfile, Conversation, SpeculativeAssessment
 from onboarding.services import OnboardingService
 
 
@@ -103,3 +106,133 @@ class OnboardingServiceTest(TestCase):
         OnboardingService.complete_onboarding(self.user)
         self.user.profile.refresh_from_db()
         self.assertTrue(self.user.profile.is_onboarded)
+
+
+class SpeculativeAssessmentTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('testuser', 'test@example.com', 'pass123')
+        self.wizard_data = {
+            'business_name': 'Test Bakery',
+            'business_type': 'Bakery',
+            'stage': 'IDEA',
+            'goals': 'First 10 customers',
+        }
+
+    @patch('onboarding.services.call_claude_json')
+    def test_matching_speculation_is_reused(self, mock_claude):
+        mock_claude.return_value = {'summary': 'Speculated', 'viability_score': 8}
+        spec = OnboardingService.speculate_assessment(self.user, self.wizard_data)
+        self.assertEqual(OnboardingService.run_due_speculations(), 1)
+
+        profile = OnboardingService.create_business_profile(self.user, self.wizard_data)
+        OnboardingService.cancel_speculations(
+            self.user, keep_hash=OnboardingService.wizard_data_hash(self.wizard_data),
+        )
+        assessment = OnboardingService.ensure_assessment(profile)
+
+        self.assertEqual(assessment['summary'], 'Speculated')
+        self.assertEqual(mock_claude.call_count, 1)
+        profile.refresh_from_db()
+        self.assertEqual(profile.ai_assessment['summary'], 'Speculated')
+        spec.refresh_from_db()
+        self.assertEqual(spec.status, 'USED')
+
+    @patch('onboarding.services.call_claude_json')
+    def test_changed_data_cancels_and_recomputes(self, mock_claude):
+        mock_claude.return_value = {'summary': 'Fresh'}
+        spec = OnboardingService.speculate_assessment(self.user, self.wizard_data)
+
+        self.wizard_data['business_type'] = 'Cafe'
+        profile = OnboardingService.create_business_profile(self.user, self.wizard_data)
+        OnboardingService.cancel_speculations(
+            self.user, keep_hash=OnboardingService.wizard_data_hash(self.wizard_data),
+        )
+        spec.refresh_from_db()
+        self.assertEqual(spec.status, 'CANCELLED')
+
+        OnboardingService.ensure_assessment(profile)
+        prompt = mock_claude.call_args[0][1]
+        self.assertIn('Cafe', prompt)
+        self.assertEqual(OnboardingService.run_due_speculations(), 0)
+        self.assertFalse(
+            SpeculativeAssessment.objects.filter(status__in=['PENDING', 'DONE']).exists()
+        )
+
+    @patch('onboarding.services.time.sleep')
+    @patch('onboarding.services.call_claude_json')
+    def test_running_speculation_is_awaited(self, mock_claude, mock_sleep):
+        spec = OnboardingService.speculate_assessment(self.user, self.wizard_data)
+        SpeculativeAssessment.objects.filter(pk=spec.pk).update(status='RUNNING')
+        profile = OnboardingService.create_business_profile(self.user, self.wizard_data)
+
+        def worker_finishes(seconds):
+            SpeculativeAssessment.objects.filter(pk=spec.pk).update(
+                status='DONE', assessment={'summary': 'From worker'},
+            )
+        mock_sleep.side_effect = worker_finishes
+
+        assessment = OnboardingService.ensure_assessment(profile)
+        self.assertEqual(assessment['summary'], 'From worker')
+        mock_claude.assert_not_called()
+
+    @override_settings(SPECULATION_WAIT_SECONDS=0)
+    @patch('onboarding.services.call_claude_json')
+    def test_stuck_speculation_times_out(self, mock_claude):
+        mock_claude.return_value = {'summary': 'Fresh'}
+        spec = OnboardingService.speculate_assessment(self.user, self.wizard_data)
+        SpeculativeAssessment.objects.filter(pk=spec.pk).update(status='RUNNING')
+        profile = OnboardingService.create_business_profile(self.user, self.wizard_data)
+
+        self.assertEqual(OnboardingService.ensure_assessment(profile)['summary'], 'Fresh')
+        spec.refresh_from_db()
+        self.assertEqual(spec.status, 'CANCELLED')
+
+
+class CombinedOnboardingFlowTest(TestCase):
+
+    @override_settings(AI_PROVIDER='fake', FAKE_AI_TIME_SCALE=0, ONBOARDING_AI_MODE='combined')
+    def test_job_uses_single_streamed_call(self):
+        from ai import fake_client
+        from tasks.job_service import PlanJobService
+        from tasks.models import TaskPlan
+
+        user = User.objects.create_user('testuser', 'test@example.com', 'pass123')
+        BusinessProfile.objects.create(
+            user=user, business_name='Test Bakery', business_type='Bakery', stage='IDEA',
+        )
+        job = PlanJobService.enqueue_generation(user, 'ONBOARDING')
+
+        fake_client.reset_stats()
+        PlanJobService.run_due_generations()
+
+        self.assertEqual(fake_client.stats['calls'], 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'DONE')
+        profile = BusinessProfile.objects.get(user=user)
+        self.assertEqual(profile.ai_assessment['viability_score'], 7)
+        plan = TaskPlan.objects.get(user=user, status='ACTIVE')
+        self.assertEqual(plan.tasks_total, 60)
+        self.assertLessEqual(profile.assessment_generated_at, plan.created_at)
+
+
+class BenchmarkOnboardingAICommandTest(TestCase):
+
+    @override_settings(PLAN_CACHE_ENABLED=True, WARM_POOL_ENABLED=True)
+    def test_compares_flows_without_cache_or_pool(self):
+        seen = []
+
+        def record(*args, **kwargs):
+            seen.append((settings.PLAN_CACHE_ENABLED, settings.WARM_POOL_ENABLED))
+            return None
+
+        out = StringIO()
+        with patch('tasks.plan_cache_service.PlanCacheService.checkout', side_effect=record), \
+                patch('tasks.warm_pool_service.WarmPoolService.checkout', side_effect=record):
+            call_command('benchmark_onboarding_ai', '--runs', '1', '--time-scale', '0', stdout=out)
+
+        self.assertTrue(seen)
+        self.assertEqual(set(seen), {(False, False)})
+        lines = out.getvalue().splitlines()
+        self.assertIn('calls 2', lines[0])
+        self.assertIn('calls 1', lines[1])
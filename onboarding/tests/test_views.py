@@ -1,3 +1,5 @@
+from unittest.mock import patch
+
 from django.contrib.auth.models import User
 from django.test import TestCase
 
@@ -82,6 +84,33 @@ class OnboardingWizardTest(TestCase):
         response = self.client.get('/onboarding/step/6/')
         self.assertEqual(response.status_code, 200)
 
+    @patch('tasks.services.call_claude_json')
+    @patch('onboarding.services.call_claude_json')
+    def test_step_6_queues_generation_job(self, mock_assess, mock_plan):
+        from ai.claude_client import ClaudeClientError
+        from tasks.job_service import PlanJobService
+
+        mock_assess.side_effect = ClaudeClientError('skip AI')
+        mock_plan.side_effect = ClaudeClientError('skip AI')
+        self._complete_step_1()
+        response = self.client.post('/onboarding/step/6/')
+        job = self.user.plan_generation_jobs.get()
+        self.assertRedirects(response, f'/tasks/generating/{job.pk}/')
+        mock_assess.assert_not_called()
+
+        status = self.client.get(f'/tasks/generating/{job.pk}/status/').json()
+        self.assertEqual(status['status'], 'PENDING')
+
+        PlanJobService.run_due_generations()
+        status = self.client.get(f'/tasks/generating/{job.pk}/status/').json()
+        self.assertEqual(status['status'], 'DONE')
+        self.assertEqual(status['tasks_created'], status['tasks_expected'])
+        self.assertEqual(status['redirect_url'], '/onboarding/complete/')
+
+        self.user.profile.refresh_from_db()
+        self.assertTrue(self.user.profile.is_onboarded)
+        self.assertIsNotNone(self.user.profile.active_plan)
+
     def test_requires_login(self):
         self.client.logout()
         response = self.client.get('/onboarding/step/1/')
@@ -1,6 +1,9 @@
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import redirect, render
 
+from tasks.job_service import PlanJobService
+
 from .forms import (
     BusinessBasicsForm,
     BusinessGoalsForm,
@@ -122,6 +125,10 @@ def wizard_step_5(request):
         form = DigitalPresenceForm(request.POST, stage=stage)
         if form.is_valid():
             _save_wizard_data(request, form.cleaned_data)
+            # Start the assessment while the user reviews step 6 (the
+            # combined flow assesses and plans in one call at launch instead)
+            if settings.ONBOARDING_AI_MODE != 'combined':
+                OnboardingService.speculate_assessment(request.user, _get_wizard_data(request))
             return redirect('onboarding:step_6')
     else:
         form = DigitalPresenceForm(initial=data, stage=stage)
@@ -134,18 +141,21 @@ def wizard_step_5(request):
 
 @login_required
 def wizard_step_6(request):
-    """Review step — show summary, run AI assessment, generate plan."""
+    """Review step — show summary, then queue assessment and plan generation."""
     data = _get_wizard_data(request)
     if not data.get('business_name'):
         return redirect('onboarding:step_1')
 
     if request.method == 'POST':
-        profile = OnboardingService.create_business_profile(request.user, data)
-        OnboardingService.run_ai_assessment(profile)
-        OnboardingService.generate_initial_plan(profile)
-        OnboardingService.complete_onboarding(request.user)
+        OnboardingService.create_business_profile(request.user, data)
+        # Keep the step 5 speculation only if nothing changed since
+        OnboardingService.cancel_speculations(
+            request.user, keep_hash=OnboardingService.wizard_data_hash(data),
+        )
+        # Assessment and plan are generated by the plan job worker
+        job = PlanJobService.enqueue_generation(request.user, 'ONBOARDING')
         request.session.pop('onboarding_data', None)
-        return redirect('onboarding:complete')
+        return redirect('tasks:generation_progress', pk=job.pk)
 
     # Parse goals for display
     goals_text = data.get('goals', '')
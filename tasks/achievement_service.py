@@ -1,204 +1,321 @@
-"""Achievement & streak tracking service."""
+"""Achievement & streak tracking service.
+
+Badge rules are evaluated in memory against an ``AchievementSnapshot``
+loaded with a fixed handful of queries, and new badges are written with a
+single ``bulk_create``. ``evaluate_history`` applies the same rules to a
+user's whole history for the ``recompute_achievements`` backfill.
+"""
 
 from datetime import timedelta
 
-from django.db.models import Count
+from django.db import transaction
+from django.db.models import Count, F, Q
 from django.utils import timezone
 
-from .models import Achievement, StreakRecord, Task, TaskPlan
+from accounts.identity import get_active_plan
+
+from . import analytics_cache, fragment_cache
+from .models import PER_PLAN_BADGES, Achievement, StreakRecord, Task, TaskPlan
+from .stats_service import UserStatsService
+
+STREAK_BADGES = [
+    (3, 'STREAK_3'),
+    (7, 'STREAK_7'),
+    (14, 'STREAK_14'),
+    (30, 'STREAK_30'),
+]
+
+BADGE_COPY = {
+    'FIRST_TASK': ('First Task Completed', 'You completed your very first task!'),
+    'STREAK_3': ('3-Day Streak', '3 days in a row!'),
+    'STREAK_7': ('7-Day Streak', 'A full week of consistency!'),
+    'STREAK_14': ('14-Day Streak', 'Two weeks strong!'),
+    'STREAK_30': ('30-Day Streak', 'An entire month — unstoppable!'),
+    'FIRST_WEEK': ('First Week Complete', 'You showed up 5+ days in your first week!'),
+    'SPEED_DEMON': ('Speed Demon', 'Completed a hard task faster than estimated!'),
+    'MULTI_PLAN': ('Multi-Plan Veteran', 'You\'ve completed tasks across multiple plans!'),
+}
+
+CATEGORY_MASTER_MIN_TASKS = 3
+FIRST_WEEK_MIN_DAYS = 5
+COMEBACK_MIN_GAP_DAYS = 3
+
+
+def badge_copy(badge: str, plan_title: str = '', category: str = '', gap: int = 0) -> tuple[str, str]:
+    """Title and description for an award."""
+    if badge == 'HALF_PLAN':
+        return 'Halfway There', f'You\'re halfway through "{plan_title}"!'
+    if badge == 'PLAN_COMPLETE':
+        return 'Plan Completed', f'You completed every task in "{plan_title}"!'
+    if badge == 'CATEGORY_MASTER':
+        cat_label = dict(Task.CATEGORY_CHOICES).get(category, category)
+        return f'{cat_label} Master', f'You completed all {cat_label} tasks!'
+    if badge == 'COMEBACK':
+        return 'Comeback Kid', f'Welcome back after {gap} days!'
+    return BADGE_COPY[badge]
+
+
+def badge_key(badge: str, plan_id: int | None = None, category: str = '') -> tuple:
+    """Identity of an earned badge, matching Achievement's unique constraints."""
+    if badge in PER_PLAN_BADGES:
+        return (badge, plan_id, category)
+    return (badge,)
+
+
+def streak_from_dates(dates, today) -> int:
+    """Consecutive days ending today, from active dates sorted newest first."""
+    streak = 0
+    expected = today
+    for day in dates:
+        if day > expected:
+            continue
+        if day != expected:
+            break
+        streak += 1
+        expected -= timedelta(days=1)
+    return streak
+
+
+def is_speedy(difficulty, estimated_minutes, sent_at, completed_at) -> bool:
+    """A HARD task finished in less than its estimated time after being sent."""
+    return bool(
+        difficulty == 'HARD' and sent_at and completed_at
+        and (completed_at - sent_at).total_seconds() < estimated_minutes * 60
+    )
+
+
+def evaluate_history(history: dict) -> list[tuple]:
+    """Every badge a user has earned over their whole history.
+
+    ``history`` holds plain data so it can be evaluated in another process:
+    ``plans`` maps plan id to (title, starts_on), ``tasks`` is a list of
+    (plan_id, status, category, difficulty, estimated_minutes, sent_at,
+    completed_at) and ``dates`` the sorted active dates. Returns
+    (badge, plan_id, category, title, description) tuples.
+    """
+    plans = history['plans']
+    dates = history['dates']
+    awards = []
+
+    def award(badge, plan_id=None, category='', gap=0):
+        plan_title = plans[plan_id][0] if plan_id in plans else ''
+        awards.append((badge, plan_id, category, *badge_copy(badge, plan_title, category, gap)))
+
+    plan_counts = {}
+    category_counts = {}
+    speedy = False
+    for plan_id, status, category, difficulty, minutes, sent_at, completed_at in history['tasks']:
+        done = status == 'DONE'
+        counts = plan_counts.setdefault(plan_id, [0, 0])
+        counts[0] += 1
+        counts[1] += done
+        counts = category_counts.setdefault((plan_id, category), [0, 0])
+        counts[0] += 1
+        counts[1] += done
+        speedy = speedy or (done and is_speedy(difficulty, minutes, sent_at, completed_at))
+
+    plans_with_done = [plan_id for plan_id, (_total, done) in plan_counts.items() if done]
+    if plans_with_done:
+        award('FIRST_TASK')
+    for plan_id, (total, done) in plan_counts.items():
+        if done and done >= (total + 1) // 2:
+            award('HALF_PLAN', plan_id)
+        if done == total:
+            award('PLAN_COMPLETE', plan_id)
+    for (plan_id, category), (total, done) in category_counts.items():
+        if total >= CATEGORY_MASTER_MIN_TASKS and done == total:
+            award('CATEGORY_MASTER', plan_id, category)
+
+    longest = run = 0
+    max_gap = 0
+    for i, day in enumerate(dates):
+        gap = (day - dates[i - 1]).days if i else 0
+        run = run + 1 if gap == 1 else 1
+        longest = max(longest, run)
+        max_gap = max(max_gap, gap)
+    for threshold, badge in STREAK_BADGES:
+        if longest >= threshold:
+            award(badge)
+
+    for _title, starts_on in plans.values():
+        first_week_end = starts_on + timedelta(days=6)
+        in_first_week = sum(1 for day in dates if starts_on <= day <= first_week_end)
+        # Awarded on a completion at least a week after the plan started
+        if in_first_week >= FIRST_WEEK_MIN_DAYS and dates[-1] >= starts_on + timedelta(days=7):
+            award('FIRST_WEEK')
+            break
+
+    if speedy:
+        award('SPEED_DEMON')
+    if max_gap >= COMEBACK_MIN_GAP_DAYS:
+        award('COMEBACK', gap=max_gap)
+    if len(plans_with_done) >= 2:
+        award('MULTI_PLAN')
+    return awards
+
+
+class AchievementSnapshot:
+    """Everything the badge rules need for one completion, loaded up front."""
+
+    def __init__(self, user, task, today):
+        plan = task.plan
+        self.user = user
+        self.task = task
+        self.plan = plan
+        self.today = today
+
+        # Active dates, newest first
+        self.dates = list(
+            StreakRecord.objects.filter(user=user)
+            .order_by('-date').values_list('date', flat=True)
+        )
+        self.earned = {
+            badge_key(*row)
+            for row in Achievement.objects.filter(user=user)
+            .values_list('badge', 'plan_id', 'category')
+        }
+
+        # Plan progress comes from the counters, read under the plan's row lock
+        # so racing completions agree on who finished the plan
+        self.plan_total, self.plan_done = (
+            TaskPlan.objects.select_for_update().filter(pk=plan.pk)
+            .values_list('tasks_total', 'tasks_done').get()
+        )
+        category_counts = plan.tasks.filter(category=task.category).aggregate(
+            total=Count('id'), done=Count('id', filter=Q(status='DONE')),
+        )
+        self.category_total = category_counts['total']
+        self.category_done = category_counts['done']
+
+        user_counts = Task.objects.filter(user=user, status='DONE').aggregate(
+            done=Count('id'), plans=Count('plan', distinct=True),
+        )
+        self.total_done = user_counts['done']
+        self.plans_with_done = user_counts['plans']
+
+        self.active_plan = get_active_plan(user)
+
+    @property
+    def streak(self) -> int:
+        return streak_from_dates(self.dates, self.today)
+
+    @property
+    def last_active_before_today(self):
+        return next((day for day in self.dates if day < self.today), None)
 
 
 class AchievementService:
 
     @staticmethod
+    @transaction.atomic
     def record_task_completion(task: Task) -> list[Achievement]:
         """Called after a task is marked DONE. Records streak and checks badges."""
         user = task.plan.user
         today = timezone.now().date()
 
         # Update or create today's streak record
-        record, _ = StreakRecord.objects.get_or_create(
-            user=user, date=today,
-            defaults={'tasks_completed': 0},
-        )
-        record.tasks_completed += 1
-        record.save(update_fields=['tasks_completed'])
+        if not StreakRecord.objects.filter(user=user, date=today).update(
+            tasks_completed=F('tasks_completed') + 1,
+        ):
+            StreakRecord.objects.create(user=user, date=today, tasks_completed=1)
+        analytics_cache.bump_version(user.pk)
 
-        # Check all badge types
+        snapshot = AchievementSnapshot(user, task, today)
         new_badges = []
-        new_badges.extend(AchievementService._check_milestone_badges(user, task))
-        new_badges.extend(AchievementService._check_streak_badges(user))
-        new_badges.extend(AchievementService._check_special_badges(user, task))
+        new_badges.extend(AchievementService._check_milestone_badges(snapshot))
+        new_badges.extend(AchievementService._check_streak_badges(snapshot))
+        new_badges.extend(AchievementService._check_special_badges(snapshot))
+        if new_badges:
+            # Unique constraints drop awards raced in by a concurrent completion
+            Achievement.objects.bulk_create(new_badges, ignore_conflicts=True)
+            fragment_cache.bump('achievements', user.pk)
         return new_badges
 
     @staticmethod
-    def _check_milestone_badges(user, task) -> list[Achievement]:
+    def _check_milestone_badges(snapshot: AchievementSnapshot) -> list[Achievement]:
         """Check for completion-count milestones."""
         badges = []
-        plan = task.plan
-        done_count = plan.tasks.filter(status='DONE').count()
-        total_count = plan.tasks.count()
+        plan = snapshot.plan
+        done_count = snapshot.plan_done
+        total_count = snapshot.plan_total
 
         # First task ever
-        total_done_all_plans = Task.objects.filter(
-            plan__user=user, status='DONE',
-        ).count()
-        if total_done_all_plans == 1:
-            badges.append(AchievementService._award(
-                user, 'FIRST_TASK', 'First Task Completed',
-                'You completed your very first task!',
-            ))
+        if snapshot.total_done == 1:
+            badges.append(AchievementService._award(snapshot, 'FIRST_TASK'))
 
         # Halfway through plan
         halfway = (total_count + 1) // 2
         if total_count > 0 and done_count >= halfway and done_count > 0:
-            if not Achievement.objects.filter(
-                user=user, badge='HALF_PLAN',
-                metadata__plan_id=plan.pk,
-            ).exists():
-                badges.append(AchievementService._award(
-                    user, 'HALF_PLAN', 'Halfway There',
-                    f'You\'re halfway through "{plan.title}"!',
-                    metadata={'plan_id': plan.pk},
-                ))
+            badges.append(AchievementService._award(snapshot, 'HALF_PLAN', plan=plan))
 
         # Plan complete
         if total_count > 0 and done_count == total_count:
-            if not Achievement.objects.filter(
-                user=user, badge='PLAN_COMPLETE',
-                metadata__plan_id=plan.pk,
-            ).exists():
-                badges.append(AchievementService._award(
-                    user, 'PLAN_COMPLETE', 'Plan Completed',
-                    f'You completed every task in "{plan.title}"!',
-                    metadata={'plan_id': plan.pk},
-                ))
+            badges.append(AchievementService._award(snapshot, 'PLAN_COMPLETE', plan=plan))
 
         # Category master — all tasks in a category done
-        category = task.category
-        cat_tasks = plan.tasks.filter(category=category)
-        if cat_tasks.count() >= 3 and cat_tasks.filter(status='DONE').count() == cat_tasks.count():
-            if not Achievement.objects.filter(
-                user=user, badge='CATEGORY_MASTER',
-                metadata__category=category,
-                metadata__plan_id=plan.pk,
-            ).exists():
-                cat_label = dict(Task.CATEGORY_CHOICES).get(category, category)
-                badges.append(AchievementService._award(
-                    user, 'CATEGORY_MASTER', f'{cat_label} Master',
-                    f'You completed all {cat_label} tasks!',
-                    metadata={'category': category, 'plan_id': plan.pk},
-                ))
-
-        return badges
+        category = snapshot.task.category
+        if (
+            snapshot.category_total >= CATEGORY_MASTER_MIN_TASKS
+            and snapshot.category_done == snapshot.category_total
+        ):
+            badges.append(AchievementService._award(
+                snapshot, 'CATEGORY_MASTER', plan=plan, category=category,
+            ))
+
+        return [b for b in badges if b]
 
     @staticmethod
-    def _check_streak_badges(user) -> list[Achievement]:
+    def _check_streak_badges(snapshot: AchievementSnapshot) -> list[Achievement]:
         """Check for streak-based badges."""
         badges = []
-        streak = AchievementService.get_current_streak(user)
+        streak = snapshot.streak
 
-        streak_thresholds = [
-            (3, 'STREAK_3', '3-Day Streak', '3 days in a row!'),
-            (7, 'STREAK_7', '7-Day Streak', 'A full week of consistency!'),
-            (14, 'STREAK_14', '14-Day Streak', 'Two weeks strong!'),
-            (30, 'STREAK_30', '30-Day Streak', 'An entire month — unstoppable!'),
-        ]
-
-        for threshold, badge, title, desc in streak_thresholds:
-            if streak >= threshold and not Achievement.objects.filter(
-                user=user, badge=badge,
-            ).exists():
-                badges.append(AchievementService._award(user, badge, title, desc))
+        for threshold, badge in STREAK_BADGES:
+            if streak >= threshold:
+                badges.append(AchievementService._award(snapshot, badge))
 
         # First week complete (7 days since plan start with >=5 streak records)
-        active_plan = TaskPlan.objects.filter(user=user, status='ACTIVE').first()
+        active_plan = snapshot.active_plan
         if active_plan:
-            days_since_start = (timezone.now().date() - active_plan.starts_on).days
+            days_since_start = (snapshot.today - active_plan.starts_on).days
             if days_since_start >= 7:
-                first_week_records = StreakRecord.objects.filter(
-                    user=user,
-                    date__gte=active_plan.starts_on,
-                    date__lte=active_plan.starts_on + timedelta(days=6),
-                ).count()
-                if first_week_records >= 5 and not Achievement.objects.filter(
-                    user=user, badge='FIRST_WEEK',
-                ).exists():
-                    badges.append(AchievementService._award(
-                        user, 'FIRST_WEEK', 'First Week Complete',
-                        'You showed up 5+ days in your first week!',
-                    ))
-
-        return badges
+                first_week_end = active_plan.starts_on + timedelta(days=6)
+                first_week_records = sum(
+                    1 for day in snapshot.dates
+                    if active_plan.starts_on <= day <= first_week_end
+                )
+                if first_week_records >= FIRST_WEEK_MIN_DAYS:
+                    badges.append(AchievementService._award(snapshot, 'FIRST_WEEK'))
+
+        return [b for b in badges if b]
 
     @staticmethod
-    def _check_special_badges(user, task) -> list[Achievement]:
+    def _check_special_badges(snapshot: AchievementSnapshot) -> list[Achievement]:
         """Check for special achievement badges."""
         badges = []
+        task = snapshot.task
 
         # Speed demon — completed a HARD task in under estimated time
-        if (
-            task.difficulty == 'HARD'
-            and task.completed_at
-            and task.sent_at
-            and (task.completed_at - task.sent_at).total_seconds() < task.estimated_minutes * 60
-        ):
-            if not Achievement.objects.filter(user=user, badge='SPEED_DEMON').exists():
-                badges.append(AchievementService._award(
-                    user, 'SPEED_DEMON', 'Speed Demon',
-                    'Completed a hard task faster than estimated!',
-                ))
+        if is_speedy(task.difficulty, task.estimated_minutes, task.sent_at, task.completed_at):
+            badges.append(AchievementService._award(snapshot, 'SPEED_DEMON'))
 
         # Comeback kid — completed a task after 3+ day gap
-        today = timezone.now().date()
-        recent_records = StreakRecord.objects.filter(
-            user=user,
-            date__lt=today,
-        ).order_by('-date')[:1]
-        if recent_records.exists():
-            last_active = recent_records[0].date
-            gap = (today - last_active).days
-            if gap >= 3 and not Achievement.objects.filter(
-                user=user, badge='COMEBACK',
-            ).exists():
-                badges.append(AchievementService._award(
-                    user, 'COMEBACK', 'Comeback Kid',
-                    f'Welcome back after {gap} days!',
-                ))
+        last_active = snapshot.last_active_before_today
+        if last_active is not None:
+            gap = (snapshot.today - last_active).days
+            if gap >= COMEBACK_MIN_GAP_DAYS:
+                badges.append(AchievementService._award(snapshot, 'COMEBACK', gap=gap))
 
         # Multi-plan veteran — completed tasks in 2+ plans
-        plans_with_done = TaskPlan.objects.filter(
-            user=user,
-            tasks__status='DONE',
-        ).distinct().count()
-        if plans_with_done >= 2 and not Achievement.objects.filter(
-            user=user, badge='MULTI_PLAN',
-        ).exists():
-            badges.append(AchievementService._award(
-                user, 'MULTI_PLAN', 'Multi-Plan Veteran',
-                'You\'ve completed tasks across multiple plans!',
-            ))
+        if snapshot.plans_with_done >= 2:
+            badges.append(AchievementService._award(snapshot, 'MULTI_PLAN'))
 
-        return badges
+        return [b for b in badges if b]
 
     @staticmethod
     def get_current_streak(user) -> int:
         """Count consecutive days (including today) with completed tasks."""
-        today = timezone.now().date()
-        streak = 0
-        check_date = today
-
-        while True:
-            exists = StreakRecord.objects.filter(
-                user=user, date=check_date,
-            ).exists()
-            if exists:
-                streak += 1
-                check_date -= timedelta(days=1)
-            else:
-                break
-
-        return streak
+        return UserStatsService.current_streak(user)
 
     @staticmethod
     def get_user_achievements(user):
@@ -206,12 +323,18 @@ class AchievementService:
         return Achievement.objects.filter(user=user)
 
     @staticmethod
-    def _award(user, badge, title, description, metadata=None) -> Achievement:
-        """Create an achievement, avoiding duplicates for non-parameterized badges."""
-        return Achievement.objects.create(
-            user=user,
+    def _award(snapshot, badge, plan=None, category='', gap=0) -> Achievement | None:
+        """Build an unsaved achievement, or None if the user already has it."""
+        key = badge_key(badge, plan.pk if plan else None, category)
+        if key in snapshot.earned:
+            return None
+        snapshot.earned.add(key)
+        title, description = badge_copy(badge, plan.title if plan else '', category, gap)
+        return Achievement(
+            user=snapshot.user,
             badge=badge,
             title=title,
             description=description,
-            metadata=metadata or {},
+            plan=plan,
+            category=category,
         )
@@ -1,6 +1,10 @@
 from django.contrib import admin
 
-from .models import Achievement, ResourceTemplate, StreakRecord, Task, TaskPlan, TaskResource
+from .models import (
+    Achievement, CohortReport, PlanAdjustmentJob, PlanCacheEntry, PlanGenerationJob,
+    PulseTrend, ResourceTemplate, StreakRecord, Task, TaskPlan, TaskResource, UserDailyRollup,
+    UserStats, WarmPlan,
+)
 
 
 class TaskInline(admin.TabularInline):
@@ -23,7 +27,7 @@ class TaskPlanAdmin(admin.ModelAdmin):
     inlines = [TaskInline]
 
     def task_count(self, obj):
-        return obj.tasks.count()
+        return obj.tasks_total
     task_count.short_description = 'Tasks'
 
 
@@ -41,12 +45,17 @@ class TaskAdmin(admin.ModelAdmin):
         'day_number', 'due_date', 'status', 'resource_count',
     ]
     list_filter = ['status', 'category', 'difficulty']
-    search_fields = ['title', 'description', 'plan__user__username']
+    search_fields = ['title', 'description', 'user__username']
     date_hierarchy = 'due_date'
     inlines = [TaskResourceInline]
+    # Counted in the plan counters, daily rollups and UserStats, so they only
+    # change through TaskProgressService
+    readonly_fields = [
+        'status', 'completed_at', 'skipped_at', 'due_date', 'category', 'estimated_minutes',
+    ]
 
     def plan_user(self, obj):
-        return obj.plan.user.username
+        return obj.user.username
     plan_user.short_description = 'User'
 
     def resource_count(self, obj):
@@ -54,6 +63,39 @@ class TaskAdmin(admin.ModelAdmin):
     resource_count.short_description = 'Resources'
 
 
+@admin.register(PlanAdjustmentJob)
+class PlanAdjustmentJobAdmin(admin.ModelAdmin):
+    list_display = ['plan', 'status', 'run_after', 'skip_count', 'updated_at']
+    list_filter = ['status']
+    search_fields = ['plan__user__username', 'reason']
+    readonly_fields = ['created_at', 'updated_at']
+
+
+@admin.register(PlanGenerationJob)
+class PlanGenerationJobAdmin(admin.ModelAdmin):
+    list_display = [
+        'user', 'kind', 'status', 'tasks_created', 'tasks_expected',
+        'attempts', 'created_at', 'finished_at',
+    ]
+    list_filter = ['status', 'kind']
+    search_fields = ['user__username']
+    readonly_fields = ['created_at', 'updated_at', 'finished_at']
+
+
+@admin.register(WarmPlan)
+class WarmPlanAdmin(admin.ModelAdmin):
+    list_display = [
+        'business_type', 'stage', 'generated_at', 'hits', 'misses',
+        'refresh_count', 'last_refresh_seconds',
+    ]
+    list_filter = ['stage']
+    search_fields = ['business_type']
+    readonly_fields = [
+        'generated_at', 'refresh_count', 'last_refresh_seconds',
+        'total_refresh_seconds', 'hits', 'misses', 'last_hit_at',
+    ]
+
+
 @admin.register(Achievement)
 class AchievementAdmin(admin.ModelAdmin):
     list_display = ['title', 'user', 'badge', 'earned_at']
@@ -97,3 +139,45 @@ class ResourceTemplateAdmin(admin.ModelAdmin):
             'fields': ('times_used', 'ai_model_used', 'created_at', 'updated_at'),
         }),
     )
+
+
+@admin.register(PlanCacheEntry)
+class PlanCacheEntryAdmin(admin.ModelAdmin):
+    list_display = [
+        'business_type', 'stage', 'duration_days', 'reuse_count', 'last_used_at', 'created_at',
+    ]
+    list_filter = ['stage', 'duration_days']
+    search_fields = ['business_type', 'fingerprint']
+    readonly_fields = ['fingerprint', 'features', 'reuse_count', 'last_used_at', 'created_at']
+
+
+@admin.register(UserStats)
+class UserStatsAdmin(admin.ModelAdmin):
+    list_display = [
+        'user', 'current_streak', 'longest_streak', 'last_active_date',
+        'tasks_done', 'minutes_done',
+    ]
+    search_fields = ['user__username', 'user__email']
+    readonly_fields = ['updated_at']
+
+
+@admin.register(PulseTrend)
+class PulseTrendAdmin(admin.ModelAdmin):
+    list_display = ['user', 'revenue_growth', 'customers_growth', 'computed_at']
+    search_fields = ['user__username', 'user__email']
+    readonly_fields = ['computed_at']
+
+
+@admin.register(CohortReport)
+class CohortReportAdmin(admin.ModelAdmin):
+    list_display = ['computed_at']
+    readonly_fields = ['report', 'computed_at']
+
+
+@admin.register(UserDailyRollup)
+class UserDailyRollupAdmin(admin.ModelAdmin):
+    list_display = ['user', 'date', 'category', 'scheduled', 'done', 'skipped', 'minutes_done']
+    list_filter = ['category']
+    search_fields = ['user__username']
+    date_hierarchy = 'date'
+    raw_id_fields = ['user', 'plan']
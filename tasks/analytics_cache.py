@@ -0,0 +1,78 @@
+"""Versioned per-user cache of the analytics page and its charts.
+
+Each user has a data version in the cache that is bumped, once the
+transaction commits, whenever their tasks, plans, streak records or weekly
+pulses change. Payloads are stored together with the version and date
+they were built for, so a bump invalidates them without a delete and a
+warm read is a single ``get_many``. The same version and date make up the
+ETags of the per-chart JSON endpoints.
+"""
+
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+ANALYTICS_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def version_key(user_id) -> str:
+    return f'analytics_version:{user_id}'
+
+
+def payload_key(user_id, name='page') -> str:
+    return f'analytics_payload:{user_id}:{name}'
+
+
+def new_version() -> int:
+    # Seeded from the clock so a version lost to eviction never repeats an old one
+    return time.time_ns() // 1000
+
+
+def bump_version(*user_ids):
+    """Invalidate the users' cached analytics after the current transaction commits."""
+    user_ids = set(user_ids)
+
+    def bump():
+        for user_id in user_ids:
+            try:
+                cache.incr(version_key(user_id))
+            except ValueError:
+                cache.set(version_key(user_id), new_version(), None)
+
+    transaction.on_commit(bump)
+
+
+def _seed_version(user_id) -> int:
+    version = new_version()
+    if not cache.add(version_key(user_id), version, None):
+        version = cache.get(version_key(user_id), version)
+    return version
+
+
+def current_version(user_id) -> int:
+    version = cache.get(version_key(user_id))
+    return _seed_version(user_id) if version is None else version
+
+
+def etag(user_id, name='page') -> str:
+    """ETag for one of the user's payloads: changes with the data version and the day."""
+    return f'{name}-{current_version(user_id)}-{timezone.now().date():%Y%m%d}'
+
+
+def get_or_build(user_id, build, name='page'):
+    """The user's cached ``name`` payload, or ``build()`` stored under the current version."""
+    today = timezone.now().date()
+    vkey, pkey = version_key(user_id), payload_key(user_id, name)
+    found = cache.get_many([vkey, pkey])
+    version = found.get(vkey)
+    cached = found.get(pkey)
+    if version is not None and cached is not None and cached[:2] == (version, today):
+        return cached[2]
+
+    if version is None:
+        version = _seed_version(user_id)
+    payload = build()
+    cache.set(pkey, (version, today, payload), ANALYTICS_CACHE_TIMEOUT)
+    return payload
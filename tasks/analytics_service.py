@@ -1,60 +1,125 @@
-"""Analytics service — computes dashboard data from existing models."""
+"""Analytics service — computes dashboard data from existing models.
 
+Task counts come from the UserDailyRollup table rather than from Task
+rows, so query cost stays flat as a user's task history grows. The
+analytics page payload is cached per user (see analytics_cache).
+"""
+
+import json
 from collections import defaultdict
-from datetime import timedelta
+from datetime import date, timedelta
 
-from django.db.models import Count, Q, Sum
+from django.db import connection
+from django.db.models import Avg, DurationField, ExpressionWrapper, F, Q, Sum
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import TruncDay, TruncWeek
 from django.utils import timezone
 
-from onboarding.models import WeeklyPulse
+from . import analytics_cache
+from .models import StreakRecord, Task, TaskPlan, UserDailyRollup
+from .pulse_trend_service import PulseTrendService
+from .stats_service import UserStatsService
+
+TREND_GRANULARITIES = {'week': timedelta(weeks=1), 'day': timedelta(days=1)}
 
-from .models import StreakRecord, Task, TaskPlan
+# Charts served one at a time as JSON by the analytics page
+CHARTS = ('trend', 'categories', 'time', 'streak', 'pulse')
 
 
 class AnalyticsService:
 
     @staticmethod
-    def get_weekly_completion_trend(user, weeks=8):
+    def get_page_data(user) -> dict:
+        """Summary numbers and plan comparison rendered into the analytics page.
+
+        Served from the per-user cache until the user's data version changes.
+        """
+        return analytics_cache.get_or_build(user.pk, lambda: {
+            'summary': AnalyticsService.get_summary_stats(user),
+            'plan_comparison': AnalyticsService.get_plan_comparison(user),
+        })
+
+    @staticmethod
+    def get_chart_json(user, chart: str) -> str:
+        """One of CHARTS serialized to JSON, cached like ``get_page_data``."""
+        builders = {
+            'trend': AnalyticsService.get_weekly_completion_trend,
+            'categories': AnalyticsService.get_category_breakdown,
+            'time': AnalyticsService.get_time_invested,
+            'streak': AnalyticsService.get_streak_history,
+            'pulse': AnalyticsService.get_pulse_trends,
+        }
+        build = builders[chart]
+        return analytics_cache.get_or_build(user.pk, lambda: json.dumps(build(user)), name=chart)
+
+    @staticmethod
+    def get_weekly_completion_trend(user, weeks=8, plan=None):
         """Weekly task completion rates over the last N weeks."""
         today = timezone.now().date()
         # Start from the most recent Monday
         current_monday = today - timedelta(days=today.weekday())
-        trend = []
+        return AnalyticsService.get_completion_trend(
+            user,
+            start=current_monday - timedelta(weeks=weeks - 1),
+            end=current_monday + timedelta(days=6),
+            plan=plan,
+        )
+
+    @staticmethod
+    def get_completion_trend(user, start, end, plan=None, granularity='week'):
+        """Completion rates of tasks due between ``start`` and ``end``, per week or day.
 
-        for i in range(weeks - 1, -1, -1):
-            week_start = current_monday - timedelta(weeks=i)
-            week_end = week_start + timedelta(days=6)
+        One grouped query regardless of the range; periods with no tasks are
+        filled in with zeros. Weeks start on Monday.
+        """
+        if granularity not in TREND_GRANULARITIES:
+            raise ValueError(f'Unknown granularity {granularity!r}')
+        step = TREND_GRANULARITIES[granularity]
+        if granularity == 'week':
+            start -= timedelta(days=start.weekday())
+            trunc = TruncWeek('date')
+        else:
+            trunc = TruncDay('date')
 
-            tasks = Task.objects.filter(
-                plan__user=user,
-                due_date__gte=week_start,
-                due_date__lte=week_end,
-            )
-            total = tasks.count()
-            completed = tasks.filter(status='DONE').count()
-            rate = round((completed / total) * 100) if total > 0 else 0
+        qs = UserDailyRollup.objects.filter(user=user, date__gte=start, date__lte=end)
+        if plan:
+            qs = qs.filter(plan=plan)
+        counts = {
+            row['period']: row
+            for row in qs.annotate(period=trunc).values('period').annotate(
+                total=Sum('scheduled'),
+                completed=Sum('done'),
+            ).order_by()
+        }
 
+        trend = []
+        period = start
+        while period <= end:
+            row = counts.get(period, {})
+            total = row.get('total', 0)
+            completed = row.get('completed', 0)
             trend.append({
-                'week_of': week_start.isoformat(),
-                'label': week_start.strftime('%b %d'),
+                'week_of' if granularity == 'week' else 'date': period.isoformat(),
+                'label': period.strftime('%b %d'),
                 'completed': completed,
                 'total': total,
-                'rate': rate,
+                'rate': round((completed / total) * 100) if total > 0 else 0,
             })
+            period += step
 
         return trend
 
     @staticmethod
     def get_category_breakdown(user, plan=None):
         """Task completion by category."""
-        qs = Task.objects.filter(plan__user=user)
+        qs = UserDailyRollup.objects.filter(user=user)
         if plan:
             qs = qs.filter(plan=plan)
 
         categories = qs.values('category').annotate(
-            total=Count('id'),
-            done=Count('id', filter=Q(status='DONE')),
-        ).order_by('category')
+            total=Sum('scheduled'),
+            done=Sum('done'),
+        ).filter(total__gt=0).order_by('category')
 
         result = []
         cat_labels = dict(Task.CATEGORY_CHOICES)
@@ -74,17 +139,17 @@ class AnalyticsService:
     @staticmethod
     def get_time_invested(user, plan=None):
         """Total estimated time invested (from completed tasks)."""
-        qs = Task.objects.filter(plan__user=user, status='DONE')
+        qs = UserDailyRollup.objects.filter(user=user, minutes_done__gt=0)
         if plan:
             qs = qs.filter(plan=plan)
 
-        total_minutes = qs.aggregate(total=Sum('estimated_minutes'))['total'] or 0
-
         by_category = {}
-        cat_data = qs.values('category').annotate(mins=Sum('estimated_minutes'))
+        total_minutes = 0
+        cat_data = qs.values('category').annotate(mins=Sum('minutes_done')).order_by('category')
         cat_labels = dict(Task.CATEGORY_CHOICES)
         for item in cat_data:
             by_category[cat_labels.get(item['category'], item['category'])] = item['mins']
+            total_minutes += item['mins']
 
         return {
             'total_minutes': total_minutes,
@@ -93,18 +158,56 @@ class AnalyticsService:
         }
 
     @staticmethod
-    def get_plan_comparison(user):
-        """Compare completion rates across plans."""
-        plans = TaskPlan.objects.filter(user=user).order_by('created_at')
+    def phase_chain(plan) -> RawSQL:
+        """Ids of ``plan`` and every plan before it along ``previous_plan``.
+
+        A recursive CTE usable as ``pk__in=`` so the walk stays inside the
+        caller's query. UNION (not UNION ALL) stops on a cycle.
+        """
+        table = connection.ops.quote_name(TaskPlan._meta.db_table)
+        return RawSQL(
+            'WITH RECURSIVE chain(id, previous_plan_id) AS ('
+            f' SELECT id, previous_plan_id FROM {table} WHERE id = %s'
+            ' UNION'
+            f' SELECT p.id, p.previous_plan_id FROM {table} p'
+            ' JOIN chain ON p.id = chain.previous_plan_id'
+            ') SELECT id FROM chain',
+            [plan.pk],
+        )
+
+    @staticmethod
+    def get_plan_comparison(user, plan=None):
+        """Compare completion, time and skip rates across plans, in one query.
+
+        With ``plan``, only that plan's phase chain is compared.
+        """
+        plans = TaskPlan.objects.filter(user=user).exclude(status='GENERATING')
+        if plan is not None:
+            plans = plans.filter(pk__in=AnalyticsService.phase_chain(plan))
+        completion_time = ExpressionWrapper(
+            F('tasks__completed_at') - F('tasks__sent_at'), output_field=DurationField(),
+        )
+        plans = plans.annotate(
+            avg_completion_time=Avg(completion_time, filter=Q(
+                tasks__status='DONE', tasks__sent_at__isnull=False, tasks__completed_at__isnull=False,
+            )),
+        ).order_by('created_at')
+
         result = []
-        for plan in plans:
+        for row in plans:
+            avg_time = row.avg_completion_time
             result.append({
-                'title': plan.title,
-                'phase': plan.phase,
-                'status': plan.status,
-                'completion_pct': plan.completion_pct,
-                'starts_on': plan.starts_on.isoformat(),
-                'ends_on': plan.ends_on.isoformat(),
+                'title': row.title,
+                'phase': row.phase,
+                'status': row.status,
+                'completion_pct': row.completion_pct,
+                'starts_on': row.starts_on.isoformat(),
+                'ends_on': row.ends_on.isoformat(),
+                'hours_invested': round(row.minutes_done / 60, 1),
+                'skip_rate': round(row.tasks_skipped / row.tasks_total * 100) if row.tasks_total else 0,
+                'avg_days_to_complete': (
+                    round(avg_time.total_seconds() / 86400, 1) if avg_time is not None else None
+                ),
             })
         return result
 
@@ -135,48 +238,66 @@ class AnalyticsService:
 
     @staticmethod
     def get_pulse_trends(user, weeks=12):
-        """Weekly pulse trends for charts."""
-        pulses = WeeklyPulse.objects.filter(
-            user=user,
-        ).order_by('week_of')[:weeks]
-
-        revenue = []
-        customers = []
-        energy = []
-        hours = []
-
-        for p in pulses:
-            label = p.week_of.strftime('%b %d')
-            revenue.append({
-                'week': label,
-                'value': float(p.revenue_this_week) if p.revenue_this_week else 0,
-            })
-            customers.append({'week': label, 'value': p.new_customers})
-            energy.append({'week': label, 'value': p.energy_level})
-            hours.append({'week': label, 'value': p.hours_worked})
+        """Weekly pulse trends for charts: the latest ``weeks`` weeks with
+        rolling averages, growth and forecasts from the stored PulseTrend.
+        """
+        trend = PulseTrendService.for_user(user)
+        mondays = [date.fromisoformat(monday) for monday in trend.weeks[-weeks:]]
+        labels = [monday.strftime('%b %d') for monday in mondays]
+        # Weeks without a pulse are left out of the plotted series
+        series = {
+            metric: [
+                {'week': label, 'value': value}
+                for label, value in zip(labels, values[-weeks:]) if value is not None
+            ]
+            for metric, values in trend.series.items()
+        }
+        last_monday = mondays[-1] if mondays else None
+        forecast = {
+            metric: {
+                'linear': [
+                    {'week': (last_monday + timedelta(weeks=n)).strftime('%b %d'), 'value': value}
+                    for n, value in enumerate(values['linear'], start=1)
+                ],
+                'smoothed': values['smoothed'],
+            }
+            for metric, values in trend.forecast.items()
+        }
 
         return {
-            'revenue': revenue,
-            'customers': customers,
-            'energy': energy,
-            'hours': hours,
+            'revenue': series.get('revenue', []),
+            'customers': series.get('customers', []),
+            'energy': series.get('energy', []),
+            'hours': series.get('hours', []),
+            'revenue_avg': [
+                {'week': label, 'value': average}
+                for label, value, average in zip(
+                    labels, trend.series.get('revenue', [])[-weeks:],
+                    trend.rolling.get('revenue', [])[-weeks:],
+                )
+                if value is not None
+            ],
+            'forecast': forecast,
+            'growth': {
+                'revenue': trend.revenue_growth,
+                'customers': trend.customers_growth,
+            },
         }
 
     @staticmethod
     def get_summary_stats(user):
         """Top-level summary numbers for the analytics page."""
-        from .achievement_service import AchievementService
-
-        done_count = Task.objects.filter(plan__user=user, status='DONE').count()
-        total_count = Task.objects.filter(plan__user=user).count()
-        time_data = AnalyticsService.get_time_invested(user)
-        current_streak = AchievementService.get_current_streak(user)
+        stats = UserStatsService.for_user(user)
+        done_count = stats.tasks_done
+        total_count = TaskPlan.objects.filter(user=user).aggregate(
+            total=Sum('tasks_total', default=0),
+        )['total']
         avg_rate = round((done_count / total_count) * 100) if total_count > 0 else 0
 
         return {
             'tasks_completed': done_count,
             'total_tasks': total_count,
-            'hours_invested': time_data['total_hours'],
-            'current_streak': current_streak,
+            'hours_invested': round(stats.minutes_done / 60, 1),
+            'current_streak': stats.streak_on(timezone.now().date()),
             'avg_completion_rate': avg_rate,
         }
@@ -0,0 +1,293 @@
+"""Platform-wide cohort analytics for staff.
+
+Task, StreakRecord and WeeklyPulse columns are streamed in primary-key
+chunks into NumPy arrays, and every report table is computed with
+vectorized grouping (``np.bincount`` / ``np.unique``) rather than per-row
+Python. The finished report is stored in a CohortReport row; the
+``refresh_cohort_report`` command rebuilds it on a schedule.
+"""
+
+import csv
+import importlib.util
+import io
+from datetime import date, timedelta
+
+import numpy as np
+from django.db.models import Case, IntegerField, Value, When
+from django.utils import timezone
+
+from onboarding.models import BusinessProfile, WeeklyPulse
+
+from .models import CohortReport, StreakRecord, Task
+
+CHUNK_SIZE = 100_000
+RETENTION_WEEKS = 12
+
+STATUS_CODES = {status: code for code, (status, _) in enumerate(Task.STATUS_CHOICES)}
+CATEGORY_CODES = {category: code for code, (category, _) in enumerate(Task.CATEGORY_CHOICES)}
+
+EPOCH = date(1970, 1, 1)
+
+
+def _code(field: str, codes: dict) -> Case:
+    """SQL expression mapping a choice field to its integer code (-1 if unknown)."""
+    return Case(
+        *[When(**{field: value}, then=Value(code)) for value, code in codes.items()],
+        default=Value(-1), output_field=IntegerField(),
+    )
+
+
+def _week(days: np.ndarray) -> np.ndarray:
+    """Monday-based week number of days since 1970-01-01 (a Thursday)."""
+    return (days + 3) // 7
+
+
+def _rate(part: np.ndarray, whole: np.ndarray, scale: int = 100) -> np.ndarray:
+    """``part / whole * scale`` to one decimal, 0 where ``whole`` is 0."""
+    return np.round(np.divide(
+        part * scale, whole, out=np.zeros(len(whole), dtype=float), where=whole > 0,
+    ), 1)
+
+
+def stream_columns(queryset, columns: dict, chunk_size: int = CHUNK_SIZE) -> dict:
+    """Read ``columns`` ({name: numpy dtype}) from ``queryset`` into arrays.
+
+    Rows are fetched in pk order, ``chunk_size`` at a time, so memory holds
+    one chunk of Python tuples at most.
+    """
+    names = list(columns)
+    parts = {name: [] for name in names}
+    last_pk = 0
+    while True:
+        rows = list(
+            queryset.filter(pk__gt=last_pk).order_by('pk')
+            .values_list('pk', *names)[:chunk_size]
+        )
+        if not rows:
+            break
+        pks, *values = zip(*rows)
+        for name, column in zip(names, values):
+            parts[name].append(np.array(column, dtype=columns[name]))
+        last_pk = pks[-1]
+        if len(rows) < chunk_size:
+            break
+    return {
+        name: np.concatenate(parts[name]) if parts[name] else np.empty(0, dtype=columns[name])
+        for name in names
+    }
+
+
+class CohortData:
+    """Column arrays for every user with a business profile, their tasks, active days and pulses."""
+
+    def __init__(self, chunk_size: int = CHUNK_SIZE):
+        profiles = sorted(
+            BusinessProfile.objects.values_list(
+                'user_id', 'business_type', 'stage', 'user__date_joined',
+            )
+        )
+        segment_index = {}
+        user_segments = []
+        for _user_id, business_type, stage, _joined in profiles:
+            key = (business_type.strip().lower(), stage)
+            user_segments.append(segment_index.setdefault(key, len(segment_index)))
+        self.segments = list(segment_index)
+        self.user_ids = np.array([row[0] for row in profiles], dtype=np.int64)
+        self.user_segment = np.array(user_segments, dtype=np.int64)
+        self.signup_week = _week(np.array(
+            [(row[3].date() - EPOCH).days for row in profiles], dtype=np.int64,
+        ))
+
+        tasks = stream_columns(
+            Task.objects.annotate(
+                status_code=_code('status', STATUS_CODES),
+                category_code=_code('category', CATEGORY_CODES),
+            ),
+            {'user_id': np.int64, 'status_code': np.int8, 'category_code': np.int8},
+            chunk_size,
+        )
+        self.task_user = self._user_index(tasks['user_id'])
+        self.task_status = tasks['status_code']
+        self.task_category = tasks['category_code']
+
+        active = stream_columns(
+            StreakRecord.objects.filter(tasks_completed__gt=0),
+            {'user_id': np.int64, 'date': 'datetime64[D]'},
+            chunk_size,
+        )
+        self.active_user = self._user_index(active['user_id'])
+        self.active_week = _week(active['date'].astype(np.int64))
+
+        pulses = stream_columns(
+            WeeklyPulse.objects.all(),
+            {'user_id': np.int64, 'energy_level': np.int16, 'hours_worked': np.int32},
+            chunk_size,
+        )
+        self.pulse_user = self._user_index(pulses['user_id'])
+        self.pulse_energy = pulses['energy_level']
+        self.pulse_hours = pulses['hours_worked']
+
+    def _user_index(self, user_ids: np.ndarray) -> np.ndarray:
+        """Position of each user id in ``self.user_ids``, -1 for users without a profile."""
+        if not len(self.user_ids):
+            return np.full(len(user_ids), -1, dtype=np.int64)
+        index = np.searchsorted(self.user_ids, user_ids)
+        index = np.minimum(index, len(self.user_ids) - 1)
+        return np.where(self.user_ids[index] == user_ids, index, -1)
+
+
+class CohortService:
+
+    @staticmethod
+    def segment_table(data: CohortData) -> dict:
+        """Completion, skip rate and pulse averages by business type and stage."""
+        count = len(data.segments)
+        users = np.bincount(data.user_segment, minlength=count)
+
+        known = data.task_user >= 0
+        task_segment = data.user_segment[data.task_user[known]]
+        status = data.task_status[known]
+        tasks = np.bincount(task_segment, minlength=count)
+        done = np.bincount(task_segment, weights=status == STATUS_CODES['DONE'], minlength=count)
+        skipped = np.bincount(
+            task_segment, weights=status == STATUS_CODES['SKIPPED'], minlength=count,
+        )
+
+        known = data.pulse_user >= 0
+        pulse_segment = data.user_segment[data.pulse_user[known]]
+        pulses = np.bincount(pulse_segment, minlength=count)
+        energy = np.bincount(pulse_segment, weights=data.pulse_energy[known], minlength=count)
+        hours = np.bincount(pulse_segment, weights=data.pulse_hours[known], minlength=count)
+        metrics = np.column_stack([
+            _rate(done, tasks), _rate(skipped, tasks),
+            _rate(energy, pulses, scale=1), _rate(hours, pulses, scale=1),
+        ])
+
+        rows = [
+            [
+                business_type, stage, int(users[i]), int(tasks[i]), int(done[i]), int(skipped[i]),
+                *map(float, metrics[i]),
+            ]
+            for i, (business_type, stage) in enumerate(data.segments)
+        ]
+        rows.sort(key=lambda row: (-row[2], row[0], row[1]))
+        return {
+            'columns': [
+                'business_type', 'stage', 'users', 'tasks', 'done', 'skipped',
+                'completion_rate', 'skip_rate', 'avg_energy', 'avg_hours',
+            ],
+            'rows': rows,
+        }
+
+    @staticmethod
+    def retention_table(data: CohortData, weeks: int = RETENTION_WEEKS, today=None) -> dict:
+        """Share of each signup-week cohort active N weeks after signing up.
+
+        Weeks a cohort has not reached yet are left blank.
+        """
+        today = today or timezone.now().date()
+        columns = ['cohort_week', 'users'] + [f'week_{n}' for n in range(weeks)]
+        if not len(data.user_ids):
+            return {'columns': columns, 'rows': []}
+
+        first_week = int(data.signup_week.min())
+        cohort = data.signup_week - first_week
+        cohort_count = int(cohort.max()) + 1
+        sizes = np.bincount(cohort, minlength=cohort_count)
+
+        known = data.active_user >= 0
+        users = data.active_user[known]
+        offset = data.active_week[known] - data.signup_week[users]
+        in_range = (offset >= 0) & (offset < weeks)
+        # One count per user and week, however many days they were active
+        pairs = np.unique(users[in_range] * weeks + offset[in_range])
+        active = np.bincount(
+            cohort[pairs // weeks] * weeks + pairs % weeks, minlength=cohort_count * weeks,
+        ).reshape(cohort_count, weeks)
+        retention = np.round(active * 100 / np.maximum(sizes, 1)[:, None], 1)
+
+        current_week = int(_week(np.int64((today - EPOCH).days)))
+        rows = []
+        for index in np.flatnonzero(sizes):
+            week = first_week + int(index)
+            reached = current_week - week
+            rows.append([
+                (EPOCH + timedelta(days=week * 7 - 3)).isoformat(), int(sizes[index]),
+                *[float(value) if n <= reached else None for n, value in enumerate(retention[index])],
+            ])
+        return {'columns': columns, 'rows': rows}
+
+    @staticmethod
+    def category_table(data: CohortData) -> dict:
+        """Task counts and skip rate per category, most skipped first."""
+        count = len(CATEGORY_CODES)
+        known = data.task_category >= 0
+        category = data.task_category[known]
+        status = data.task_status[known]
+        tasks = np.bincount(category, minlength=count)
+        done = np.bincount(category, weights=status == STATUS_CODES['DONE'], minlength=count)
+        skipped = np.bincount(category, weights=status == STATUS_CODES['SKIPPED'], minlength=count)
+        skip_rate = _rate(skipped, tasks)
+
+        rows = [
+            [value, int(tasks[code]), int(done[code]), int(skipped[code]), float(skip_rate[code])]
+            for value, code in CATEGORY_CODES.items() if tasks[code]
+        ]
+        rows.sort(key=lambda row: (-row[4], row[0]))
+        return {
+            'columns': ['category', 'tasks', 'done', 'skipped', 'skip_rate'],
+            'rows': rows,
+        }
+
+    @staticmethod
+    def build_report(chunk_size: int = CHUNK_SIZE) -> dict:
+        data = CohortData(chunk_size)
+        return {
+            'computed_at': timezone.now().isoformat(),
+            'users': len(data.user_ids),
+            'tasks': len(data.task_status),
+            'tables': {
+                'segments': CohortService.segment_table(data),
+                'retention': CohortService.retention_table(data),
+                'categories': CohortService.category_table(data),
+            },
+        }
+
+    @staticmethod
+    def refresh() -> dict:
+        """Rebuild the report and replace the stored copy."""
+        report = CohortService.build_report()
+        CohortReport.objects.update_or_create(
+            pk=1, defaults={'report': report, 'computed_at': timezone.now()},
+        )
+        return report
+
+    @staticmethod
+    def get_report() -> dict:
+        """The stored report, built if there is none yet."""
+        stored = CohortReport.objects.filter(pk=1).values_list('report', flat=True).first()
+        return stored or CohortService.refresh()
+
+    @staticmethod
+    def export_csv(table: dict) -> str:
+        out = io.StringIO()
+        writer = csv.writer(out)
+        writer.writerow(table['columns'])
+        writer.writerows(table['rows'])
+        return out.getvalue()
+
+    @staticmethod
+    def parquet_available() -> bool:
+        return importlib.util.find_spec('pyarrow') is not None
+
+    @staticmethod
+    def export_parquet(table: dict) -> bytes:
+        """Parquet bytes for a report table. Requires pyarrow."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        columns = list(zip(*table['rows'])) or [[] for _ in table['columns']]
+        arrow_table = pa.table(dict(zip(table['columns'], map(list, columns))))
+        out = io.BytesIO()
+        pq.write_table(arrow_table, out)
+        return out.getvalue()
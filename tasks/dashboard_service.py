@@ -0,0 +1,108 @@
+"""Everything the dashboard renders, loaded in a fixed handful of queries."""
+
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from accounts.identity import get_active_plan
+from onboarding.models import WeeklyPulse
+
+from .models import Achievement, Task
+from .services import TaskGenerationService
+from .stats_service import UserStatsService
+
+RECENT_COMPLETED_LIMIT = 5
+UPCOMING_LIMIT = 10
+RECENT_ACHIEVEMENTS_LIMIT = 5
+
+# Task columns the dashboard lists display
+DASHBOARD_TASK_FIELDS = (
+    'id', 'plan_id', 'title', 'category', 'difficulty', 'estimated_minutes',
+    'day_number', 'due_date', 'sort_order', 'status', 'completed_at',
+)
+
+
+class DashboardSnapshot:
+    """The active plan's task lists and counters, streak, achievements and check-ins.
+
+    The plan's tasks are read once and every list and count is derived from
+    those rows in memory; totals come from the plan's progress counters and
+    the streak from UserStats. Query count does not grow with plan size.
+    Each part loads on first access, so dashboard fragments served from
+    the fragment cache cost no queries.
+    """
+
+    def __init__(self, user, today=None):
+        self.user = user
+        self.today = today or timezone.now().date()
+        self.plan = get_active_plan(user)
+
+    @cached_property
+    def tasks(self) -> list[Task]:
+        if not self.plan:
+            return []
+        tasks = list(self.plan.tasks.only(*DASHBOARD_TASK_FIELDS))
+        for task in tasks:
+            Task.plan.field.set_cached_value(task, self.plan)
+        return tasks
+
+    @cached_property
+    def today_tasks(self) -> list[Task]:
+        return [
+            task for task in self.tasks
+            if task.due_date == self.today and task.status not in ('DONE', 'SKIPPED')
+        ]
+
+    @cached_property
+    def recent_completed(self) -> list[Task]:
+        oldest = datetime.min.replace(tzinfo=dt_timezone.utc)
+        return sorted(
+            (task for task in self.tasks if task.status == 'DONE'),
+            key=lambda task: task.completed_at or oldest, reverse=True,
+        )[:RECENT_COMPLETED_LIMIT]
+
+    @cached_property
+    def upcoming_tasks(self) -> list[Task]:
+        return [
+            task for task in self.tasks
+            if task.due_date > self.today and task.status == 'PENDING'
+        ][:UPCOMING_LIMIT]
+
+    @cached_property
+    def stats(self) -> dict:
+        plan = self.plan
+        if not plan:
+            return {}
+        return {
+            'total': plan.tasks_total,
+            'done': plan.tasks_done,
+            'skipped': plan.tasks_skipped,
+            'remaining': plan.tasks_total - plan.tasks_done - plan.tasks_skipped,
+            'overdue': sum(
+                1 for task in self.tasks
+                if task.due_date < self.today and task.status in ('PENDING', 'SENT')
+            ),
+        }
+
+    @cached_property
+    def completion_pct(self) -> int:
+        return self.plan.completion_pct if self.plan else 0
+
+    @cached_property
+    def current_streak(self) -> int:
+        return UserStatsService.for_user(self.user).streak_on(self.today)
+
+    @cached_property
+    def recent_achievements(self) -> list[Achievement]:
+        return list(Achievement.objects.filter(user=self.user)[:RECENT_ACHIEVEMENTS_LIMIT])
+
+    @cached_property
+    def pulse_done_this_week(self) -> bool:
+        this_monday = self.today - timedelta(days=self.today.weekday())
+        return WeeklyPulse.objects.filter(user=self.user, week_of=this_monday).exists()
+
+    @cached_property
+    def continuation(self):
+        # Reads only the plan's counters
+        return TaskGenerationService.detect_plan_ready_for_continuation(self.user)
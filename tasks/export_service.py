@@ -0,0 +1,135 @@
+"""Streaming export of user data as NDJSON or CSV.
+
+Rows are read with ``.values().iterator()`` (a server-side cursor where
+the database supports one) and encoded one at a time, so memory stays
+flat whether one user or the whole platform is exported. Each dataset is
+ordered by its watermark column, and ``since`` exports only rows changed
+after a previous run's watermark.
+
+Incremental exports are upsert-only: a row deleted after one run is not
+reported by the next, so consumers drop deleted rows by reloading a full
+export (no ``since``) from time to time.
+"""
+
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import TextField, Value
+from django.db.models.functions import Coalesce, Greatest, NullIf
+
+from notifications.models import MessageLog
+from onboarding.models import Conversation, GeneratedDocument, WeeklyPulse
+
+from .models import Task, TaskPlan, TaskResource
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_FORMATS = ('ndjson', 'csv')
+
+# Each dataset: model, exported fields, expressions computing some of
+# those fields, the lookup from a row to its owner's user id (default
+# 'user_id') and the watermark column or expression compared against
+# ``since`` (default 'updated_at').
+DATASETS = {
+    'plans': {'model': TaskPlan, 'fields': (
+        'id', 'user_id', 'business_profile_id', 'title', 'status', 'phase', 'previous_plan_id',
+        'duration_days', 'starts_on', 'ends_on', 'tasks_total', 'tasks_done', 'tasks_skipped',
+        'tasks_pending', 'tasks_rescheduled', 'minutes_done', 'last_adjusted_at',
+        'created_at', 'updated_at',
+    )},
+    'tasks': {'model': Task, 'fields': (
+        'id', 'plan_id', 'user_id', 'title', 'description', 'category', 'difficulty',
+        'estimated_minutes', 'day_number', 'due_date', 'sort_order', 'status', 'sent_at',
+        'completed_at', 'skipped_at', 'user_response', 'rescheduled_to', 'updated_at',
+    )},
+    # Template-backed resources export the template's text, and change
+    # when the template does
+    'resources': {
+        'model': TaskResource,
+        'fields': (
+            'id', 'task_id', 'template_id', 'title', 'resource_type', 'content', 'external_url',
+            'is_completed', 'sort_order', 'created_at', 'updated_at',
+        ),
+        'expressions': {'content': Coalesce(
+            NullIf('content', Value('')), 'template__content', Value(''),
+            output_field=TextField(),
+        )},
+        'user_field': 'task__user_id',
+        'watermark': Greatest('updated_at', Coalesce('template__updated_at', 'updated_at')),
+    },
+    'pulses': {'model': WeeklyPulse, 'fields': (
+        'id', 'user_id', 'business_profile_id', 'week_of', 'revenue_this_week',
+        'new_customers', 'hours_worked', 'energy_level', 'biggest_win', 'biggest_blocker',
+        'notes', 'created_at', 'updated_at',
+    )},
+    # Messages are never edited after they are written
+    'conversations': {'model': Conversation, 'fields': (
+        'id', 'user_id', 'role', 'content', 'conversation_type', 'session_id', 'metadata',
+        'created_at',
+    ), 'watermark': 'created_at'},
+    'documents': {'model': GeneratedDocument, 'fields': (
+        'id', 'user_id', 'business_profile_id', 'doc_type', 'platform', 'title', 'prompt_used',
+        'content', 'is_favorite', 'ai_model_used', 'created_at', 'updated_at',
+    )},
+    'message_logs': {'model': MessageLog, 'fields': (
+        'id', 'user_id', 'channel', 'direction', 'content', 'subject', 'status', 'twilio_sid',
+        'sendgrid_message_id', 'error_message', 'related_task_id', 'created_at', 'updated_at',
+    )},
+}
+
+
+class _Echo:
+    """File-like object whose write() returns the value, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+class ExportService:
+
+    @staticmethod
+    def rows(dataset: str, user=None, since=None, until=None):
+        """Iterate a dataset's rows as dicts, oldest change first.
+
+        ``since`` (exclusive) and ``until`` (inclusive) bound the watermark
+        column; pass the ``until`` of one run as the ``since`` of the next.
+        """
+        spec = DATASETS[dataset]
+        watermark = spec.get('watermark', 'updated_at')
+        queryset = spec['model'].objects.all()
+        if not isinstance(watermark, str):
+            queryset = queryset.annotate(watermark=watermark)
+            watermark = 'watermark'
+        if user is not None:
+            queryset = queryset.filter(**{spec.get('user_field', 'user_id'): user.pk})
+        if since is not None:
+            queryset = queryset.filter(**{f'{watermark}__gt': since})
+        if until is not None:
+            queryset = queryset.filter(**{f'{watermark}__lte': until})
+        expressions = spec.get('expressions', {})
+        rows = queryset.order_by(watermark, 'pk').values_list(
+            *[expressions.get(field, field) for field in spec['fields']],
+        ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        return (dict(zip(spec['fields'], row)) for row in rows)
+
+    @staticmethod
+    def ndjson_lines(dataset: str, **filters):
+        for row in ExportService.rows(dataset, **filters):
+            yield json.dumps(row, cls=DjangoJSONEncoder) + '\n'
+
+    @staticmethod
+    def csv_lines(dataset: str, **filters):
+        writer = csv.writer(_Echo())
+        yield writer.writerow(DATASETS[dataset]['fields'])
+        for row in ExportService.rows(dataset, **filters):
+            yield writer.writerow(
+                json.dumps(value, cls=DjangoJSONEncoder) if isinstance(value, (dict, list)) else value
+                for value in row.values()
+            )
+
+    @staticmethod
+    def lines(dataset: str, fmt: str, **filters):
+        """Encoded lines of ``dataset`` in ``fmt`` (one of EXPORT_FORMATS)."""
+        if fmt == 'csv':
+            return ExportService.csv_lines(dataset, **filters)
+        return ExportService.ndjson_lines(dataset, **filters)
@@ -0,0 +1,123 @@
+"""Per-user versioned cache of rendered template fragments.
+
+Each user has a version per data section (SECTIONS), bumped after the
+transaction commits whenever that data changes: task status changes and
+plan activation bump 'tasks', badge awards 'achievements', pulse saves
+'pulse' and new assessments 'assessment'. A fragment's key holds the
+versions of the sections it depends on (FRAGMENTS), the date and any
+extra vary-on values, so a bump orphans exactly the affected fragments.
+Hits and misses are counted per fragment (see ``fragment_cache_stats``).
+"""
+
+import hashlib
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .analytics_cache import new_version
+
+# Kept short so relative times ("3 hours ago") in cached HTML stay close
+FRAGMENT_CACHE_TIMEOUT = 60 * 60
+
+SECTIONS = ('tasks', 'achievements', 'pulse', 'assessment')
+
+# Fragment name -> sections its HTML depends on
+FRAGMENTS = {
+    'dashboard_progress': ('tasks',),
+    'dashboard_achievements': ('tasks', 'achievements'),
+    'dashboard_prompts': ('tasks', 'pulse'),
+    'dashboard_tasks': ('tasks',),
+    'task_list': ('tasks',),
+    'pulse_history': ('pulse',),
+    'assessment': ('assessment',),
+}
+
+
+def section_key(user_id, section) -> str:
+    return f'fragment_version:{user_id}:{section}'
+
+
+def stats_key(name, outcome) -> str:
+    return f'fragment_stats:{name}:{outcome}'
+
+
+def bump(section, *user_ids):
+    """Invalidate the users' fragments that depend on ``section`` after commit."""
+    user_ids = set(user_ids)
+
+    def bump_versions():
+        for user_id in user_ids:
+            try:
+                cache.incr(section_key(user_id, section))
+            except ValueError:
+                cache.set(section_key(user_id, section), new_version(), None)
+
+    transaction.on_commit(bump_versions)
+
+
+def _versions(user_id, sections) -> list:
+    keys = [section_key(user_id, section) for section in sections]
+    found = cache.get_many(keys)
+    versions = []
+    for key in keys:
+        version = found.get(key)
+        if version is None:
+            version = new_version()
+            if not cache.add(key, version, None):
+                version = cache.get(key, version)
+        versions.append(version)
+    return versions
+
+
+def fragment_key(user_id, name, vary_on=()) -> str:
+    versions = '.'.join(map(str, _versions(user_id, FRAGMENTS[name])))
+    vary = hashlib.md5(
+        ':'.join(str(value) for value in vary_on).encode(), usedforsecurity=False,
+    ).hexdigest()
+    return f'fragment:{name}:{user_id}:{versions}:{timezone.now().date():%Y%m%d}:{vary}'
+
+
+def _count(name, outcome):
+    try:
+        cache.incr(stats_key(name, outcome))
+    except ValueError:
+        cache.set(stats_key(name, outcome), 1, None)
+
+
+def get_or_render(user_id, name, render, vary_on=()) -> str:
+    """The user's cached ``name`` fragment, or ``render()`` stored under the current versions."""
+    key = fragment_key(user_id, name, vary_on)
+    html = cache.get(key)
+    if html is not None:
+        _count(name, 'hits')
+        return html
+
+    _count(name, 'misses')
+    html = render()
+    cache.set(key, html, FRAGMENT_CACHE_TIMEOUT)
+    return html
+
+
+def stats() -> dict:
+    """Hits, misses and hit rate (percent) for each fragment."""
+    counts = cache.get_many([
+        stats_key(name, outcome) for name in FRAGMENTS for outcome in ('hits', 'misses')
+    ])
+    report = {}
+    for name in FRAGMENTS:
+        hits = counts.get(stats_key(name, 'hits'), 0)
+        misses = counts.get(stats_key(name, 'misses'), 0)
+        total = hits + misses
+        report[name] = {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits * 100 / total, 1) if total else None,
+        }
+    return report
+
+
+def reset_stats():
+    cache.delete_many([
+        stats_key(name, outcome) for name in FRAGMENTS for outcome in ('hits', 'misses')
+    ])
@@ -0,0 +1,274 @@
+"""Background plan jobs — enqueued from request paths, run by process_plan_jobs."""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from accounts.identity import get_active_plan
+from onboarding.models import BusinessProfile
+
+from . import analytics_cache
+from .models import PlanAdjustmentJob, PlanGenerationJob
+from .plan_cache_service import PlanCacheService
+from .warm_pool_service import WarmPoolService
+
+logger = logging.getLogger(__name__)
+
+# Plan sources whose tasks were written for another profile and get a
+# PERSONALIZE pass once the plan is active
+REUSED_PLAN_SOURCES = ('warm_pool', 'plan_cache')
+
+
+class PlanJobService:
+
+    @staticmethod
+    def _adjustment_run_after():
+        return timezone.now() + timedelta(seconds=settings.PLAN_ADJUSTMENT_DEBOUNCE_SECONDS)
+
+    @staticmethod
+    def extend_adjustment(plan) -> bool:
+        """Push back the plan's pending adjustment, if any. Returns True if one exists."""
+        return bool(
+            PlanAdjustmentJob.objects.filter(plan=plan, status='PENDING').update(
+                run_after=PlanJobService._adjustment_run_after(),
+                skip_count=F('skip_count') + 1,
+            )
+        )
+
+    @staticmethod
+    def enqueue_adjustment(plan, reason: str) -> PlanAdjustmentJob:
+        """Queue a debounced adjustment; reuses the plan's pending job if one exists."""
+        if PlanJobService.extend_adjustment(plan):
+            return PlanAdjustmentJob.objects.get(plan=plan, status='PENDING')
+        try:
+            with transaction.atomic():
+                return PlanAdjustmentJob.objects.create(
+                    plan=plan,
+                    reason=reason,
+                    run_after=PlanJobService._adjustment_run_after(),
+                )
+        except IntegrityError:
+            # Another request queued one first
+            PlanJobService.extend_adjustment(plan)
+            return PlanAdjustmentJob.objects.get(plan=plan, status='PENDING')
+
+    @staticmethod
+    def run_due_adjustments(limit: int = 50) -> int:
+        """Run pending adjustments whose debounce window has passed. Returns count run."""
+        from .services import TaskGenerationService
+
+        due = PlanAdjustmentJob.objects.filter(
+            status='PENDING', run_after__lte=timezone.now(),
+        ).select_related('plan__business_profile')[:limit]
+
+        ran = 0
+        for job in due:
+            # Claim the job; another worker may have taken it
+            claimed = PlanAdjustmentJob.objects.filter(
+                pk=job.pk, status='PENDING',
+            ).update(status='RUNNING', updated_at=timezone.now())
+            if not claimed:
+                continue
+
+            try:
+                summary = TaskGenerationService.adjust_plan(job.plan, reason=job.reason)
+            except Exception as e:
+                logger.exception('Plan adjustment job %d failed', job.pk)
+                job.status = 'FAILED'
+                job.error_message = str(e)
+            else:
+                if summary is None:
+                    job.status = 'FAILED'
+                    job.error_message = 'AI service unavailable'
+                else:
+                    job.status = 'DONE'
+            job.save(update_fields=['status', 'error_message', 'updated_at'])
+            ran += 1
+
+        return ran
+
+    @staticmethod
+    def enqueue_generation(user, kind: str, previous_plan=None, plan=None) -> PlanGenerationJob:
+        """Queue a plan generation; returns the user's unfinished job if one exists.
+
+        ``plan`` is only given for PERSONALIZE jobs, which rewrite an existing plan.
+        They run alongside plan generations and are deduplicated per plan, so
+        a pending rewrite never stands in for a requested new plan.
+        """
+        unfinished = PlanGenerationJob.objects.filter(
+            user=user, status__in=PlanGenerationJob.UNFINISHED_STATUSES,
+        )
+        if kind == 'PERSONALIZE':
+            unfinished = unfinished.filter(kind='PERSONALIZE', plan=plan)
+        else:
+            unfinished = unfinished.exclude(kind='PERSONALIZE')
+        job = unfinished.first()
+        if job:
+            return job
+        try:
+            with transaction.atomic():
+                return PlanGenerationJob.objects.create(
+                    user=user, kind=kind, previous_plan=previous_plan, plan=plan,
+                )
+        except IntegrityError:
+            # Double submit — the other request's job wins
+            return unfinished.get()
+
+    @staticmethod
+    def accept_cached_plan(job: PlanGenerationJob, entry) -> bool:
+        """Queue a waiting ONBOARDING job to build its plan from an offered cache entry.
+
+        The worker builds the plan and assessment; the request only records
+        the choice. Returns False if the job is already running or finished.
+        """
+        try:
+            with transaction.atomic():
+                return bool(
+                    PlanGenerationJob.objects.filter(
+                        pk=job.pk, kind='ONBOARDING', status__in=['PENDING', 'FAILED'],
+                    ).update(
+                        cached_entry=entry, status='PENDING', attempts=0, error_message='',
+                        run_after=timezone.now(), finished_at=None, updated_at=timezone.now(),
+                    )
+                )
+        except IntegrityError:
+            return False
+
+    @staticmethod
+    def retry_generation(job: PlanGenerationJob) -> bool:
+        """Re-queue a FAILED job. Returns False if it cannot be retried now."""
+        try:
+            with transaction.atomic():
+                return bool(
+                    PlanGenerationJob.objects.filter(pk=job.pk, status='FAILED').update(
+                        status='PENDING', attempts=0, error_message='',
+                        run_after=timezone.now(), finished_at=None,
+                        updated_at=timezone.now(),
+                    )
+                )
+        except IntegrityError:
+            return False
+
+    @staticmethod
+    def run_due_generations(limit: int = 10) -> int:
+        """Run queued generations, and reclaim RUNNING ones whose worker died."""
+        now = timezone.now()
+        stale_before = now - timedelta(seconds=settings.PLAN_GENERATION_TIMEOUT_SECONDS)
+        due = PlanGenerationJob.objects.filter(
+            Q(status='PENDING', run_after__lte=now)
+            | Q(status='RUNNING', updated_at__lt=stale_before)
+        ).select_related('user', 'previous_plan', 'plan', 'cached_entry')[:limit]
+
+        ran = 0
+        for job in due:
+            # Claim the job; another worker may have taken it
+            claimed = PlanGenerationJob.objects.filter(
+                pk=job.pk, status=job.status, updated_at=job.updated_at,
+            ).update(status='RUNNING', attempts=F('attempts') + 1, updated_at=now)
+            if not claimed:
+                continue
+            job.status = 'RUNNING'
+            job.attempts += 1
+            PlanJobService.run_generation(job)
+            ran += 1
+        return ran
+
+    @staticmethod
+    def run_generation(job: PlanGenerationJob):
+        """Execute a claimed job. Safe to repeat: partial output is discarded first."""
+        from onboarding.services import OnboardingService
+
+        from .services import TaskGenerationService
+
+        try:
+            if job.kind == 'PERSONALIZE':
+                WarmPoolService.personalize_plan(job.plan)
+            elif not PlanJobService._reset_attempt(job):
+                profile = BusinessProfile.objects.select_related('user').get(user_id=job.user_id)
+                cached = pooled = None
+                if job.kind == 'ONBOARDING':
+                    if job.cached_entry is not None:
+                        # Near match the user accepted (see accept_cached_plan)
+                        cached = PlanCacheService.claim(job.cached_entry, profile)
+                    if cached is None:
+                        # Only exact matches are used unasked; near ones are offered
+                        cached = PlanCacheService.checkout(profile, min_similarity=1)
+                    pooled = WarmPoolService.checkout(profile) if cached is None else None
+                if cached is not None or pooled is not None:
+                    # Instant plan reused from the cache or warm pool; personalized afterwards
+                    TaskGenerationService.create_plan(
+                        profile, cached or pooled, job=job,
+                        source='plan_cache' if cached is not None else 'warm_pool',
+                    )
+                    OnboardingService.ensure_assessment(profile, since=job.created_at)
+                elif job.kind == 'ONBOARDING' and settings.ONBOARDING_AI_MODE == 'combined':
+                    OnboardingService.generate_assessment_and_plan(profile, job=job)
+                elif job.kind == 'ONBOARDING':
+                    OnboardingService.ensure_assessment(profile, since=job.created_at)
+                    OnboardingService.generate_initial_plan(profile, job=job)
+                elif job.kind == 'CONTINUATION':
+                    TaskGenerationService.generate_continuation_plan(
+                        profile, job.previous_plan, job=job,
+                    )
+                else:
+                    TaskGenerationService.generate_plan(
+                        profile, job=job, replaces=get_active_plan(job.user),
+                    )
+            if job.kind == 'ONBOARDING':
+                OnboardingService.complete_onboarding(job.user)
+        except Exception as e:
+            logger.exception('Plan generation job %d failed (attempt %d)', job.pk, job.attempts)
+            job.error_message = str(e)
+            if job.attempts < settings.PLAN_GENERATION_MAX_ATTEMPTS:
+                job.status = 'PENDING'
+                job.run_after = timezone.now() + timedelta(seconds=30 * 2 ** (job.attempts - 1))
+            else:
+                job.status = 'FAILED'
+                job.finished_at = timezone.now()
+                # Nothing will finish this plan; its tasks must not linger in the counts
+                PlanJobService._discard_partial_plan(job)
+        else:
+            job.status = 'DONE'
+            job.error_message = ''
+            job.finished_at = timezone.now()
+        job.save(update_fields=[
+            'status', 'error_message', 'run_after', 'finished_at', 'plan', 'tasks_created',
+            'updated_at',
+        ])
+
+        if job.status == 'DONE' and job.plan and job.plan.ai_generation_metadata.get('source') in REUSED_PLAN_SOURCES:
+            PlanJobService.enqueue_generation(job.user, 'PERSONALIZE', plan=job.plan)
+
+    @staticmethod
+    def _reset_attempt(job: PlanGenerationJob) -> bool:
+        """Undo a previous attempt's partial plan.
+
+        Returns True if a previous attempt already activated its plan, in
+        which case there is nothing left to generate.
+        """
+        if job.plan is None:
+            return False
+        if job.plan.status != 'GENERATING':
+            return True
+        PlanJobService._discard_partial_plan(job)
+        return False
+
+    @staticmethod
+    def _discard_partial_plan(job: PlanGenerationJob):
+        """Delete the job's plan if it never went ACTIVE.
+
+        Its rollup rows cascade with it and its counters live on the plan,
+        so analytics stop counting its tasks.
+        """
+        plan = job.plan
+        if plan is None or plan.status != 'GENERATING':
+            return
+        with transaction.atomic():
+            plan.delete()
+            analytics_cache.bump_version(job.user_id)
+        job.plan = None
+        job.tasks_created = 0
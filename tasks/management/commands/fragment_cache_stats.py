@@ -0,0 +1,25 @@
+"""Management command: show template fragment cache hit rates."""
+
+from django.core.management.base import BaseCommand
+
+from tasks import fragment_cache
+
+
+class Command(BaseCommand):
+    help = 'Print hits, misses and hit rate for each cached template fragment'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset', action='store_true', help='Zero the counters after printing',
+        )
+
+    def handle(self, *args, **options):
+        for name, counts in fragment_cache.stats().items():
+            rate = '-' if counts['hit_rate'] is None else f"{counts['hit_rate']}%"
+            self.stdout.write(
+                f"  {name:<24} hits {counts['hits']:>8}  misses {counts['misses']:>8}  "
+                f'hit rate {rate}'
+            )
+        if options['reset']:
+            fragment_cache.reset_stats()
+            self.stdout.write(self.style.SUCCESS('Counters reset'))
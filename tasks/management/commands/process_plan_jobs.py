@@ -0,0 +1,54 @@
+"""Management command: background worker for plan jobs.
+
+Runs every minute via PythonAnywhere scheduled task, or continuously
+with --loop as an always-on task.
+"""
+
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+
+from onboarding.services import OnboardingService
+from tasks.job_service import PlanJobService
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Run queued plan jobs (speculative assessments, plan generations, adjustments)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep polling for jobs instead of exiting after one pass',
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5.0,
+            help='Seconds to sleep between polls in --loop mode',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            # Onboarding work first — a user is waiting in the wizard or
+            # on the progress page
+            stages = [
+                ('Speculative assessments run', OnboardingService.run_due_speculations),
+                ('Plan generations run', PlanJobService.run_due_generations),
+                ('Plan adjustments run', PlanJobService.run_due_adjustments),
+            ]
+            for label, run in stages:
+                try:
+                    count = run()
+                except Exception:
+                    # One failing stage must not hold up the others
+                    logger.exception('Plan job stage failed: %s', label)
+                    continue
+                if count:
+                    self.stdout.write(f'  {label}: {count}')
+
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS('Plan jobs processed'))
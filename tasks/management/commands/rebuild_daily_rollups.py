@@ -0,0 +1,69 @@
+"""Management command: rebuild the UserDailyRollup analytics table from Task.
+
+Use after bulk data changes or to repair drift; safe to run at any time.
+Each user's rows are replaced in a single transaction, after which their
+cached analytics and task fragments are invalidated.
+"""
+
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+from tasks import analytics_cache, fragment_cache
+from tasks.models import Task, UserDailyRollup
+
+
+def computed_rollups(user_ids) -> list[UserDailyRollup]:
+    """Rollup rows for ``user_ids`` computed from their tasks."""
+    rows = Task.objects.filter(user_id__in=user_ids).values(
+        'user_id', 'plan_id', 'due_date', 'category',
+    ).annotate(
+        scheduled=Count('id'),
+        done=Count('id', filter=Q(status='DONE')),
+        skipped=Count('id', filter=Q(status='SKIPPED')),
+        minutes_done=Sum('estimated_minutes', filter=Q(status='DONE'), default=0),
+    ).order_by()
+    return [
+        UserDailyRollup(
+            user_id=row['user_id'], plan_id=row['plan_id'], date=row['due_date'],
+            category=row['category'], scheduled=row['scheduled'], done=row['done'],
+            skipped=row['skipped'], minutes_done=row['minutes_done'],
+        )
+        for row in rows
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Recompute per-day analytics rollups from tasks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Only rebuild this username')
+        parser.add_argument(
+            '--chunk-size', type=int, default=200, help='Users per transaction (default 200)',
+        )
+
+    def handle(self, *args, **options):
+        users = User.objects.order_by('pk')
+        if options['user']:
+            users = users.filter(username=options['user'])
+        user_ids = list(users.values_list('pk', flat=True))
+
+        started = time.monotonic()
+        written = 0
+        for start in range(0, len(user_ids), options['chunk_size']):
+            chunk = user_ids[start:start + options['chunk_size']]
+            rollups = computed_rollups(chunk)
+            with transaction.atomic():
+                UserDailyRollup.objects.filter(user_id__in=chunk).delete()
+                UserDailyRollup.objects.bulk_create(rollups, batch_size=1000)
+                analytics_cache.bump_version(*chunk)
+                fragment_cache.bump('tasks', *chunk)
+            written += len(rollups)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Users rebuilt: {len(user_ids)}, rollup rows: {written} '
+            f'({time.monotonic() - started:.1f}s)'
+        ))
@@ -0,0 +1,32 @@
+"""Management command: recompute UserStats from StreakRecord and Task.
+
+Use after bulk data changes or to repair drift; safe to run at any time.
+"""
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.stats_service import UserStatsService
+
+
+class Command(BaseCommand):
+    help = 'Rebuild per-user streak and completion stats from scratch'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Only rebuild this username')
+
+    def handle(self, *args, **options):
+        if options['user']:
+            try:
+                user = User.objects.get(username=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f"No user named {options['user']!r}")
+            stats = UserStatsService.rebuild(user)
+            self.stdout.write(
+                f'  {user.username}: streak {stats.current_streak} '
+                f'(longest {stats.longest_streak}), {stats.tasks_done} tasks done'
+            )
+            rebuilt = 1
+        else:
+            rebuilt = UserStatsService.rebuild_all()
+        self.stdout.write(self.style.SUCCESS(f'Users rebuilt: {rebuilt}'))
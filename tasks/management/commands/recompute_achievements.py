@@ -0,0 +1,159 @@
+"""Management command: evaluate every badge rule against all users' history.
+
+Run after adding or changing a badge rule. Users are processed in chunks:
+each chunk is read with four set-based queries, evaluated in memory
+(optionally across a process pool) and missing awards are written with
+bulk inserts. Use --dry-run to see the diff without writing.
+"""
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from tasks import fragment_cache
+from tasks.achievement_service import badge_key, evaluate_history
+from tasks.models import PER_PLAN_BADGES, Achievement, StreakRecord, Task, TaskPlan
+
+
+def load_histories(user_ids) -> dict:
+    """Plain-data histories for ``evaluate_history``, keyed by user id."""
+    histories = {
+        user_id: {'plans': {}, 'tasks': [], 'dates': []} for user_id in user_ids
+    }
+    plans = (
+        TaskPlan.objects.filter(user_id__in=user_ids).exclude(status='GENERATING')
+        .values_list('pk', 'user_id', 'title', 'starts_on')
+    )
+    for plan_id, user_id, title, starts_on in plans:
+        histories[user_id]['plans'][plan_id] = (title, starts_on)
+
+    tasks = (
+        Task.objects.filter(user_id__in=user_ids).exclude(plan__status='GENERATING')
+        .values_list(
+            'user_id', 'plan_id', 'status', 'category', 'difficulty',
+            'estimated_minutes', 'sent_at', 'completed_at',
+        )
+    )
+    for user_id, *row in tasks:
+        histories[user_id]['tasks'].append(tuple(row))
+
+    dates = (
+        StreakRecord.objects.filter(user_id__in=user_ids, tasks_completed__gt=0)
+        .order_by('user_id', 'date').values_list('user_id', 'date')
+    )
+    for user_id, day in dates:
+        histories[user_id]['dates'].append(day)
+    return histories
+
+
+class Command(BaseCommand):
+    help = 'Recompute achievements for all users and award any that are missing'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=500, help='Users per chunk (default 500)',
+        )
+        parser.add_argument(
+            '--workers', type=int, default=0,
+            help='Evaluate rules in this many worker processes (default: in-process)',
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Print awards that would be added or are no longer earned, without writing',
+        )
+        parser.add_argument(
+            '--revoke', action='store_true',
+            help='Also delete achievements the rules no longer award',
+        )
+        parser.add_argument('--user', help='Only recompute this username')
+
+    def handle(self, *args, **options):
+        users = User.objects.order_by('pk')
+        if options['user']:
+            users = users.filter(username=options['user'])
+        user_ids = list(users.values_list('pk', flat=True))
+        chunk_size = options['chunk_size']
+        executor = ProcessPoolExecutor(options['workers']) if options['workers'] > 0 else None
+
+        totals = {'users': 0, 'added': 0, 'stale': 0}
+        started = time.monotonic()
+        try:
+            for start in range(0, len(user_ids), chunk_size):
+                chunk_started = time.monotonic()
+                chunk = user_ids[start:start + chunk_size]
+                added, stale = self._process_chunk(chunk, executor, options)
+                totals['users'] += len(chunk)
+                totals['added'] += added
+                totals['stale'] += stale
+
+                elapsed = time.monotonic() - chunk_started
+                self.stdout.write(
+                    f'  Users {start + 1}-{start + len(chunk)}: +{added} / -{stale} '
+                    f'({len(chunk) / elapsed if elapsed else 0:.0f} users/s)'
+                )
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        elapsed = time.monotonic() - started
+        verb = 'would be' if options['dry_run'] else 'were'
+        revoke_note = '' if options['revoke'] else ' (kept; pass --revoke to delete)'
+        self.stdout.write(self.style.SUCCESS(
+            f"Users: {totals['users']} in {elapsed:.1f}s "
+            f"({totals['users'] / elapsed if elapsed else 0:.0f} users/s). "
+            f"Achievements that {verb} added: {totals['added']}, "
+            f"no longer earned: {totals['stale']}{revoke_note}"
+        ))
+
+    def _process_chunk(self, user_ids, executor, options) -> tuple[int, int]:
+        histories = load_histories(user_ids)
+        existing = {user_id: {} for user_id in user_ids}
+        # Per-plan badges whose plan has been deleted can't be re-evaluated; leave them be
+        earned = (
+            Achievement.objects.filter(user_id__in=user_ids)
+            .exclude(badge__in=PER_PLAN_BADGES, plan__isnull=True)
+            .values_list('pk', 'user_id', 'badge', 'plan_id', 'category')
+        )
+        for pk, user_id, badge, plan_id, category in earned:
+            existing[user_id][badge_key(badge, plan_id, category)] = pk
+
+        if executor is not None:
+            results = executor.map(evaluate_history, histories.values(), chunksize=50)
+        else:
+            results = map(evaluate_history, histories.values())
+
+        to_add = []
+        stale_ids = []
+        stale_users = set()
+        for user_id, awards in zip(histories, results):
+            have = existing[user_id]
+            deserved = set()
+            for badge, plan_id, category, title, description in awards:
+                key = badge_key(badge, plan_id, category)
+                deserved.add(key)
+                if key not in have:
+                    to_add.append(Achievement(
+                        user_id=user_id, badge=badge, plan_id=plan_id,
+                        category=category, title=title, description=description,
+                    ))
+            stale = [pk for key, pk in have.items() if key not in deserved]
+            if stale:
+                stale_ids.extend(stale)
+                stale_users.add(user_id)
+
+        if options['dry_run'] or options['verbosity'] > 1:
+            for achievement in to_add:
+                self.stdout.write(f'    + user {achievement.user_id}: {achievement.title}')
+            if stale_ids:
+                self.stdout.write(f'    - achievement ids: {sorted(stale_ids)}')
+
+        if not options['dry_run']:
+            Achievement.objects.bulk_create(to_add, batch_size=500, ignore_conflicts=True)
+            changed = {achievement.user_id for achievement in to_add}
+            if options['revoke'] and stale_ids:
+                Achievement.objects.filter(pk__in=stale_ids).delete()
+                changed |= stale_users
+            fragment_cache.bump('achievements', *changed)
+        return len(to_add), len(stale_ids)
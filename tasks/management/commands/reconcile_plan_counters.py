@@ -0,0 +1,67 @@
+"""Management command: repair drift in TaskPlan progress counters.
+
+Recomputes every plan's counters from its tasks and rewrites the ones
+that disagree. Safe to run at any time; intended as a nightly job.
+"""
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from tasks.models import TaskPlan
+
+
+def computed_counters(queryset):
+    """Annotate plans with their progress counters computed from tasks."""
+    return queryset.annotate(
+        actual_tasks_total=Count('tasks'),
+        actual_tasks_done=Count('tasks', filter=Q(tasks__status='DONE')),
+        actual_tasks_skipped=Count('tasks', filter=Q(tasks__status='SKIPPED')),
+        actual_tasks_pending=Count('tasks', filter=Q(tasks__status__in=['PENDING', 'SENT'])),
+        actual_tasks_rescheduled=Count('tasks', filter=Q(tasks__status='RESCHEDULED')),
+        actual_minutes_done=Sum(
+            'tasks__estimated_minutes', filter=Q(tasks__status='DONE'), default=0,
+        ),
+    )
+
+
+class Command(BaseCommand):
+    help = 'Recompute TaskPlan progress counters and fix any that have drifted'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Report drifted plans without writing',
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        checked = 0
+        repaired = 0
+
+        for plan in computed_counters(TaskPlan.objects.all()).iterator():
+            checked += 1
+            drifted = [
+                field for field in TaskPlan.PROGRESS_FIELDS
+                if getattr(plan, field) != getattr(plan, f'actual_{field}')
+            ]
+            if not drifted:
+                continue
+
+            repaired += 1
+            self.stdout.write(
+                f'  Plan {plan.pk}: ' + ', '.join(
+                    f'{field} {getattr(plan, field)} -> {getattr(plan, f"actual_{field}")}'
+                    for field in drifted
+                )
+            )
+            if not dry_run:
+                TaskPlan.objects.filter(pk=plan.pk).update(updated_at=timezone.now(), **{
+                    field: getattr(plan, f'actual_{field}')
+                    for field in TaskPlan.PROGRESS_FIELDS
+                })
+
+        verb = 'would be repaired' if dry_run else 'repaired'
+        self.stdout.write(self.style.SUCCESS(
+            f'Plans checked: {checked}, {verb}: {repaired}'
+        ))
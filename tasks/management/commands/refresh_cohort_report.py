@@ -0,0 +1,22 @@
+"""Management command: rebuild the stored staff cohort report.
+
+Runs nightly via PythonAnywhere scheduled task.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from tasks.cohort_service import CohortService
+
+
+class Command(BaseCommand):
+    help = 'Recompute platform-wide cohort analytics and store the report'
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        report = CohortService.refresh()
+        self.stdout.write(self.style.SUCCESS(
+            f"Cohort report: {report['users']} users, {report['tasks']} tasks "
+            f'in {time.monotonic() - started:.1f}s'
+        ))
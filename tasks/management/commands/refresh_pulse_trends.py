@@ -0,0 +1,21 @@
+"""Management command: recompute every user's stored pulse trends.
+
+Runs weekly via PythonAnywhere scheduled task.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from tasks.pulse_trend_service import PulseTrendService
+
+
+class Command(BaseCommand):
+    help = 'Recompute weekly pulse rolling averages, growth and forecasts for all users'
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        count = PulseTrendService.refresh()
+        self.stdout.write(self.style.SUCCESS(
+            f'Pulse trends: {count} users in {time.monotonic() - started:.1f}s'
+        ))
@@ -0,0 +1,60 @@
+"""Management command: refresh the warm pool of pre-generated plans.
+
+Regenerates base plans for the most common business type × stage
+combinations whose entry is missing or stale, generates plans for empty
+plan cache entries from their scrubbed profiles, drops expired plan cache
+entries, then prints pool stats.
+Runs nightly at 3am via PythonAnywhere scheduled task.
+"""
+
+import logging
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ai.claude_client import ClaudeClientError
+from tasks.plan_cache_service import PlanCacheService
+from tasks.warm_pool_service import WarmPoolService
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Refresh stale or missing warm-pool plans and report pool stats'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--size', type=int, default=None,
+            help='Number of combinations to keep warm (default: WARM_POOL_SIZE)',
+        )
+        parser.add_argument(
+            '--stats-only', action='store_true',
+            help='Print pool stats without refreshing',
+        )
+
+    def handle(self, *args, **options):
+        if not options['stats_only']:
+            size = options['size'] or settings.WARM_POOL_SIZE
+            refreshed = 0
+            for business_type, stage in WarmPoolService.combos_to_refresh(size):
+                try:
+                    entry = WarmPoolService.refresh(business_type, stage)
+                except ClaudeClientError:
+                    logger.exception('Warm pool refresh failed for %s / %s', business_type, stage)
+                    continue
+                refreshed += 1
+                self.stdout.write(
+                    f'  Refreshed {business_type} / {stage}: '
+                    f'{len(entry.tasks_data)} tasks in {entry.last_refresh_seconds:.1f}s'
+                )
+            self.stdout.write(f'Plans refreshed: {refreshed}')
+            self.stdout.write(f'Plan cache entries filled: {PlanCacheService.fill_pending()}')
+            self.stdout.write(f'Expired plan cache entries removed: {PlanCacheService.purge_expired()}')
+
+        stats = WarmPoolService.pool_stats()
+        self.stdout.write(
+            f"Pool: {stats['entries']} entries ({stats['stale']} stale), "
+            f"hit rate {stats['hit_rate']}% ({stats['hits']} hits / {stats['misses']} misses), "
+            f"{stats['refreshes']} refreshes averaging {stats['avg_refresh_seconds']}s"
+        )
+        self.stdout.write(self.style.SUCCESS('Warm pool done'))
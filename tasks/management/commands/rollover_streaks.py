@@ -0,0 +1,16 @@
+"""Management command: zero streaks that were broken yesterday.
+
+Runs nightly just after midnight via PythonAnywhere scheduled task.
+"""
+
+from django.core.management.base import BaseCommand
+
+from tasks.stats_service import UserStatsService
+
+
+class Command(BaseCommand):
+    help = 'Reset UserStats streaks for users who missed a day'
+
+    def handle(self, *args, **options):
+        reset = UserStatsService.rollover()
+        self.stdout.write(self.style.SUCCESS(f'Streaks reset: {reset}'))
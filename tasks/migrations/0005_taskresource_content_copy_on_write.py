@@ -0,0 +1,40 @@
+# Generated by Django 6.0.2 on 2026-10-19 09:12
+
+from django.db import migrations, models
+
+
+def dedupe_resource_content(apps, schema_editor):
+    """Blank out per-task copies that are identical to their template."""
+    TaskResource = apps.get_model('tasks', 'TaskResource')
+    TaskResource.objects.filter(
+        template__isnull=False,
+        content=models.F('template__content'),
+    ).exclude(content='').update(content='')
+
+
+def restore_resource_content(apps, schema_editor):
+    TaskResource = apps.get_model('tasks', 'TaskResource')
+    ResourceTemplate = apps.get_model('tasks', 'ResourceTemplate')
+    TaskResource.objects.filter(template__isnull=False, content='').update(
+        content=models.Subquery(
+            ResourceTemplate.objects.filter(
+                pk=models.OuterRef('template_id'),
+            ).values('content')[:1],
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0004_taskplan_previous_plan'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='taskresource',
+            name='content',
+            field=models.TextField(blank=True, help_text='Per-task copy; blank means the template content is used'),
+        ),
+        migrations.RunPython(dedupe_resource_content, restore_resource_content),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 6.0.2 on 2026-10-19 10:05
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def backfill_progress_counters(apps, schema_editor):
+    TaskPlan = apps.get_model('tasks', 'TaskPlan')
+    plans = TaskPlan.objects.annotate(
+        total=Count('tasks'),
+        done=Count('tasks', filter=Q(tasks__status='DONE')),
+        skipped=Count('tasks', filter=Q(tasks__status='SKIPPED')),
+        pending=Count('tasks', filter=Q(tasks__status__in=['PENDING', 'SENT'])),
+        rescheduled=Count('tasks', filter=Q(tasks__status='RESCHEDULED')),
+        minutes=Sum('tasks__estimated_minutes', filter=Q(tasks__status='DONE'), default=0),
+    )
+    for plan in plans.iterator():
+        TaskPlan.objects.filter(pk=plan.pk).update(
+            tasks_total=plan.total,
+            tasks_done=plan.done,
+            tasks_skipped=plan.skipped,
+            tasks_pending=plan.pending,
+            tasks_rescheduled=plan.rescheduled,
+            minutes_done=plan.minutes,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0005_taskresource_content_copy_on_write'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='taskplan',
+            name='minutes_done',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='taskplan',
+            name='tasks_done',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='taskplan',
+            name='tasks_pending',
+            field=models.IntegerField(default=0, help_text='Tasks still PENDING or SENT'),
+        ),
+        migrations.AddField(
+            model_name='taskplan',
+            name='tasks_rescheduled',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='taskplan',
+            name='tasks_skipped',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='taskplan',
+            name='tasks_total',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_progress_counters, migrations.RunPython.noop),
+    ]
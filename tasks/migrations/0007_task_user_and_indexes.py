@@ -0,0 +1,49 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_task_user(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    TaskPlan = apps.get_model('tasks', 'TaskPlan')
+    Task.objects.update(
+        user=models.Subquery(
+            TaskPlan.objects.filter(pk=models.OuterRef('plan_id')).values('user_id')[:1],
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0006_taskplan_progress_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='user',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='tasks', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(backfill_task_user, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='task',
+            name='user',
+            field=models.ForeignKey(db_index=False, help_text='Denormalized from plan.user for index-only owner lookups', on_delete=django.db.models.deletion.CASCADE, related_name='tasks', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['plan', 'due_date', 'status'], name='task_plan_due_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'status', 'completed_at'], name='task_user_status_done_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'due_date'], name='task_user_due_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0007_task_user_and_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='taskplan',
+            name='last_adjusted_at',
+            field=models.DateTimeField(blank=True, help_text='When adjust_plan last re-planned the remaining tasks', null=True),
+        ),
+        migrations.CreateModel(
+            name='PlanAdjustmentJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reason', models.CharField(max_length=255)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('RUNNING', 'Running'), ('DONE', 'Done'), ('FAILED', 'Failed')], default='PENDING', max_length=10)),
+                ('run_after', models.DateTimeField(db_index=True)),
+                ('skip_count', models.PositiveSmallIntegerField(default=1, help_text='Skips absorbed by this job while it was pending')),
+                ('error_message', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('plan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='adjustment_jobs', to='tasks.taskplan')),
+            ],
+            options={
+                'ordering': ['run_after'],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status', 'PENDING')), fields=('plan',), name='one_pending_adjustment_per_plan')],
+            },
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 6.0.2 on 2026-10-19 12:15
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0008_plan_adjustment_jobs'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='taskplan',
+            name='status',
+            field=models.CharField(choices=[('ACTIVE', 'Active'), ('COMPLETED', 'Completed'), ('PAUSED', 'Paused'), ('REPLACED', 'Replaced by new plan'), ('GENERATING', 'Being generated')], default='ACTIVE', max_length=10),
+        ),
+        migrations.CreateModel(
+            name='PlanGenerationJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('ONBOARDING', 'Onboarding plan'), ('REGENERATE', 'Regenerated plan'), ('CONTINUATION', 'Next phase')], max_length=12)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('RUNNING', 'Running'), ('DONE', 'Done'), ('FAILED', 'Failed')], default='PENDING', max_length=10)),
+                ('tasks_expected', models.PositiveSmallIntegerField(default=0)),
+                ('tasks_created', models.PositiveSmallIntegerField(default=0)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('run_after', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('error_message', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('plan', models.ForeignKey(blank=True, help_text='Plan being built by the current attempt', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='tasks.taskplan')),
+                ('previous_plan', models.ForeignKey(blank=True, help_text='Plan being continued (CONTINUATION only)', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='tasks.taskplan')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='plan_generation_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['run_after'],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status__in', ['PENDING', 'RUNNING'])), fields=('user',), name='one_unfinished_generation_per_user')],
+            },
+        ),
+    ]
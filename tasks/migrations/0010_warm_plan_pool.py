@@ -0,0 +1,38 @@
+# Generated by Django 6.0.2 on 2026-10-19 13:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0009_plan_generation_jobs'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='plangenerationjob',
+            name='kind',
+            field=models.CharField(choices=[('ONBOARDING', 'Onboarding plan'), ('REGENERATE', 'Regenerated plan'), ('CONTINUATION', 'Next phase'), ('PERSONALIZE', 'Personalize warm-pool plan')], max_length=12),
+        ),
+        migrations.CreateModel(
+            name='WarmPlan',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('business_type', models.CharField(max_length=100)),
+                ('stage', models.CharField(choices=[('IDEA', 'Just an Idea'), ('PLANNING', 'Planning Stage'), ('EARLY', 'Early Stage (0-6 months)'), ('GROWING', 'Growing (6-24 months)'), ('ESTABLISHED', 'Established (2+ years)')], max_length=20)),
+                ('tasks_data', models.JSONField(blank=True, default=list, help_text='Task list as returned by plan generation, with placeholders')),
+                ('generated_at', models.DateTimeField(blank=True, null=True)),
+                ('refresh_count', models.PositiveIntegerField(default=0)),
+                ('last_refresh_seconds', models.FloatField(default=0)),
+                ('total_refresh_seconds', models.FloatField(default=0)),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('misses', models.PositiveIntegerField(default=0, help_text='Signups that found this entry empty or stale')),
+                ('last_hit_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['business_type', 'stage'],
+                'unique_together': {('business_type', 'stage')},
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 6.0.2 on 2026-10-19 14:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0010_warm_plan_pool'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='plangenerationjob',
+            name='kind',
+            field=models.CharField(choices=[('ONBOARDING', 'Onboarding plan'), ('REGENERATE', 'Regenerated plan'), ('CONTINUATION', 'Next phase'), ('PERSONALIZE', 'Personalize reused plan')], max_length=12),
+        ),
+        migrations.CreateModel(
+            name='PlanCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint', models.CharField(max_length=64, unique=True)),
+                ('features', models.JSONField(default=dict, help_text='Normalized profile values the fingerprint is built from')),
+                ('business_type', models.CharField(max_length=100)),
+                ('stage', models.CharField(choices=[('IDEA', 'Just an Idea'), ('PLANNING', 'Planning Stage'), ('EARLY', 'Early Stage (0-6 months)'), ('GROWING', 'Growing (6-24 months)'), ('ESTABLISHED', 'Established (2+ years)')], max_length=20)),
+                ('duration_days', models.PositiveSmallIntegerField(default=30)),
+                ('tasks_data', models.JSONField(default=list, help_text='Task list as returned by plan generation, with placeholders')),
+                ('reuse_count', models.PositiveIntegerField(default=0)),
+                ('last_used_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name_plural': 'plan cache entries',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['business_type', 'stage', 'duration_days'], name='tasks_planc_busines_2a578b_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 6.0.2 on 2026-10-19 14:30
+
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+
+def backfill_user_stats(apps, schema_editor):
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    StreakRecord = apps.get_model('tasks', 'StreakRecord')
+    UserStats = apps.get_model('tasks', 'UserStats')
+    today = timezone.now().date()
+    one_day = timedelta(days=1)
+
+    users = User.objects.annotate(
+        done=Count('tasks', filter=Q(tasks__status='DONE')),
+        minutes=Sum('tasks__estimated_minutes', filter=Q(tasks__status='DONE'), default=0),
+    )
+    for user in users.iterator():
+        dates = list(
+            StreakRecord.objects.filter(user=user, tasks_completed__gt=0)
+            .order_by('date').values_list('date', flat=True)
+        )
+        longest = run = 0
+        for i, day in enumerate(dates):
+            run = run + 1 if i and day - dates[i - 1] == one_day else 1
+            longest = max(longest, run)
+        current = run if dates and dates[-1] >= today - one_day else 0
+        UserStats.objects.create(
+            user=user,
+            current_streak=current,
+            longest_streak=longest,
+            last_active_date=dates[-1] if dates else None,
+            tasks_done=user.done,
+            minutes_done=user.minutes,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0011_plan_cache'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('current_streak', models.PositiveIntegerField(default=0)),
+                ('longest_streak', models.PositiveIntegerField(default=0)),
+                ('last_active_date', models.DateField(blank=True, null=True)),
+                ('tasks_done', models.PositiveIntegerField(default=0)),
+                ('minutes_done', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'user stats',
+            },
+        ),
+        migrations.RunPython(backfill_user_stats, migrations.RunPython.noop),
+    ]
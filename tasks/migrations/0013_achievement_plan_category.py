@@ -0,0 +1,69 @@
+# Generated by Django 6.0.2 on 2026-10-19 14:55
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+PER_PLAN_BADGES = ('HALF_PLAN', 'PLAN_COMPLETE', 'CATEGORY_MASTER')
+
+
+def promote_metadata(apps, schema_editor):
+    """Copy plan_id/category out of metadata and drop duplicate awards."""
+    Achievement = apps.get_model('tasks', 'Achievement')
+    TaskPlan = apps.get_model('tasks', 'TaskPlan')
+    plan_ids = set(TaskPlan.objects.values_list('pk', flat=True))
+
+    seen = set()
+    duplicates = set()
+    updated = []
+    for achievement in Achievement.objects.order_by('earned_at', 'pk').iterator():
+        metadata = achievement.metadata or {}
+        if achievement.badge in PER_PLAN_BADGES:
+            plan_id = metadata.get('plan_id')
+            achievement.plan_id = plan_id if plan_id in plan_ids else None
+            if achievement.badge == 'CATEGORY_MASTER':
+                achievement.category = metadata.get('category') or ''
+            updated.append(achievement)
+            if achievement.plan_id is None:
+                continue
+            key = (achievement.user_id, achievement.badge, achievement.plan_id, achievement.category)
+        else:
+            key = (achievement.user_id, achievement.badge)
+        if key in seen:
+            duplicates.add(achievement.pk)
+        seen.add(key)
+
+    Achievement.objects.bulk_update(
+        [a for a in updated if a.pk not in duplicates], ['plan', 'category'], batch_size=500,
+    )
+    Achievement.objects.filter(pk__in=duplicates).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0012_user_stats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='achievement',
+            name='category',
+            field=models.CharField(blank=True, choices=[('LEGAL', 'Legal & Registration'), ('FINANCE', 'Finance & Accounting'), ('MARKETING', 'Marketing & Branding'), ('PRODUCT', 'Product & Service'), ('SALES', 'Sales & Customers'), ('OPERATIONS', 'Operations & Setup'), ('DIGITAL', 'Digital Presence'), ('PLANNING', 'Strategy & Planning')], default='', help_text='Category for CATEGORY_MASTER', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='achievement',
+            name='plan',
+            field=models.ForeignKey(blank=True, help_text='Plan a per-plan badge was earned in', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='achievements', to='tasks.taskplan'),
+        ),
+        migrations.RunPython(promote_metadata, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='achievement',
+            constraint=models.UniqueConstraint(condition=models.Q(('badge__in', ('HALF_PLAN', 'PLAN_COMPLETE', 'CATEGORY_MASTER')), _negated=True), fields=('user', 'badge'), name='one_achievement_per_user_badge'),
+        ),
+        migrations.AddConstraint(
+            model_name='achievement',
+            constraint=models.UniqueConstraint(condition=models.Q(('badge__in', ('HALF_PLAN', 'PLAN_COMPLETE', 'CATEGORY_MASTER'))), fields=('user', 'badge', 'plan', 'category'), name='one_achievement_per_plan_badge'),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 6.0.2 on 2026-10-19 15:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def backfill_daily_rollups(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    UserDailyRollup = apps.get_model('tasks', 'UserDailyRollup')
+    rows = Task.objects.values('user_id', 'plan_id', 'due_date', 'category').annotate(
+        scheduled=Count('id'),
+        done=Count('id', filter=Q(status='DONE')),
+        skipped=Count('id', filter=Q(status='SKIPPED')),
+        minutes_done=Sum('estimated_minutes', filter=Q(status='DONE'), default=0),
+    ).order_by()
+    UserDailyRollup.objects.bulk_create(
+        (
+            UserDailyRollup(
+                user_id=row['user_id'], plan_id=row['plan_id'], date=row['due_date'],
+                category=row['category'], scheduled=row['scheduled'], done=row['done'],
+                skipped=row['skipped'], minutes_done=row['minutes_done'],
+            )
+            for row in rows.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0013_achievement_plan_category'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(help_text='Due date of the counted tasks')),
+                ('category', models.CharField(choices=[('LEGAL', 'Legal & Registration'), ('FINANCE', 'Finance & Accounting'), ('MARKETING', 'Marketing & Branding'), ('PRODUCT', 'Product & Service'), ('SALES', 'Sales & Customers'), ('OPERATIONS', 'Operations & Setup'), ('DIGITAL', 'Digital Presence'), ('PLANNING', 'Strategy & Planning')], max_length=20)),
+                ('scheduled', models.IntegerField(default=0, help_text='Tasks due, in any status')),
+                ('done', models.IntegerField(default=0)),
+                ('skipped', models.IntegerField(default=0)),
+                ('minutes_done', models.IntegerField(default=0)),
+                ('plan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='tasks.taskplan')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'date'], name='rollup_user_date_idx')],
+                'constraints': [models.UniqueConstraint(fields=('plan', 'date', 'category'), name='one_rollup_per_plan_day_category')],
+            },
+        ),
+        migrations.RunPython(backfill_daily_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 6.0.2 on 2026-10-19 16:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0015_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PulseTrend',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weeks', models.JSONField(default=list, help_text='Monday of each week in the series, oldest first')),
+                ('series', models.JSONField(default=dict, help_text='revenue, customers, energy and hours per week; null where no pulse')),
+                ('rolling', models.JSONField(default=dict, help_text='Trailing 4-week averages of revenue and customers')),
+                ('revenue_growth', models.FloatField(blank=True, help_text='Latest pulse vs the one before, in percent', null=True)),
+                ('customers_growth', models.FloatField(blank=True, null=True)),
+                ('forecast', models.JSONField(default=dict, help_text='Per metric: linear trend for the coming weeks and smoothed next-week level')),
+                ('computed_at', models.DateTimeField()),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='pulse_trend', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0.2 on 2026-10-19 14:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0016_pulse_trend'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='plangenerationjob',
+            name='one_unfinished_generation_per_user',
+        ),
+        migrations.AddConstraint(
+            model_name='plangenerationjob',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['PENDING', 'RUNNING']), models.Q(('kind', 'PERSONALIZE'), _negated=True)), fields=('user',), name='one_unfinished_generation_per_user'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 6.0.2 on 2026-10-19 14:40
+
+from django.db import migrations
+
+
+def clear_plan_cache(apps, schema_editor):
+    # Earlier entries were cached from full profiles, free text included
+    apps.get_model('tasks', 'PlanCacheEntry').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0017_personalize_outside_generation_limit'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_plan_cache, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 6.0.2 on 2026-10-19 15:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0018_clear_plan_cache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CohortReport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('report', models.JSONField(default=dict, help_text='Totals and tables from build_report')),
+                ('computed_at', models.DateTimeField()),
+            ],
+        ),
+    ]
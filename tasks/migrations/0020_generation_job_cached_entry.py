@@ -0,0 +1,19 @@
+# Generated by Django 6.0.2 on 2026-10-19 16:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0019_cohort_report'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='plangenerationjob',
+            name='cached_entry',
+            field=models.ForeignKey(blank=True, help_text='Offered cached plan the user accepted (ONBOARDING only)', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='tasks.plancacheentry'),
+        ),
+    ]
@@ -1,8 +1,19 @@
-from django.contrib.auth.models import User
-from django.db import models
+from collections import Counter
+from datetime import timedelta
 
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models import F
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from accounts.models import UserProfile
 from onboarding.models import BusinessProfile
 
+from . import analytics_cache, fragment_cache
+
 
 class TaskPlan(models.Model):
     STATUS_CHOICES = [
@@ -10,6 +21,19 @@ class TaskPlan(models.Model):
         ('COMPLETED', 'Completed'),
         ('PAUSED', 'Paused'),
         ('REPLACED', 'Replaced by new plan'),
+        ('GENERATING', 'Being generated'),
+    ]
+    # Task status -> progress counter it is tallied under
+    STATUS_COUNTERS = {
+        'PENDING': 'tasks_pending',
+        'SENT': 'tasks_pending',
+        'DONE': 'tasks_done',
+        'SKIPPED': 'tasks_skipped',
+        'RESCHEDULED': 'tasks_rescheduled',
+    }
+    PROGRESS_FIELDS = [
+        'tasks_total', 'tasks_done', 'tasks_skipped',
+        'tasks_pending', 'tasks_rescheduled', 'minutes_done',
     ]
 
     user = models.ForeignKey(
@@ -30,22 +54,105 @@ class TaskPlan(models.Model):
     duration_days = models.PositiveSmallIntegerField(default=30)
     starts_on = models.DateField()
     ends_on = models.DateField()
+    last_adjusted_at = models.DateTimeField(
+        null=True, blank=True,
+        help_text='When adjust_plan last re-planned the remaining tasks',
+    )
     ai_generation_metadata = models.JSONField(
         default=dict, blank=True,
         help_text='Model, prompt tokens, generation params',
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    # Progress counters — maintained by TaskProgressService.transition_tasks
+    # and repaired by the reconcile_plan_counters command.
+    tasks_total = models.IntegerField(default=0)
+    tasks_done = models.IntegerField(default=0)
+    tasks_skipped = models.IntegerField(default=0)
+    tasks_pending = models.IntegerField(
+        default=0, help_text='Tasks still PENDING or SENT',
+    )
+    tasks_rescheduled = models.IntegerField(default=0)
+    minutes_done = models.IntegerField(default=0)
 
     def __str__(self):
         return f'{self.title} for {self.user.username}'
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'updated_at'}
+        super().save(*args, **kwargs)
+        if update_fields is None or 'status' in update_fields:
+            self._sync_active_plan_pointer()
+
+    def _sync_active_plan_pointer(self):
+        """Point the owner's UserProfile.active_plan at this plan, or away from it."""
+        if self.status == 'ACTIVE':
+            UserProfile.objects.filter(user_id=self.user_id).update(active_plan=self)
+        else:
+            UserProfile.objects.filter(
+                user_id=self.user_id, active_plan=self,
+            ).update(active_plan=None)
+
+        # Keep a memoized profile on the same user instance in step
+        if TaskPlan.user.is_cached(self) and User.profile.is_cached(self.user):
+            profile = self.user.profile
+            if self.status == 'ACTIVE':
+                profile.active_plan = self
+            elif profile.active_plan_id == self.pk:
+                profile.active_plan = None
+
     @property
     def completion_pct(self):
-        total = self.tasks.count()
-        if total == 0:
+        if self.tasks_total <= 0:
             return 0
-        done = self.tasks.filter(status='DONE').count()
-        return round((done / total) * 100)
+        return round((self.tasks_done / self.tasks_total) * 100)
+
+    @staticmethod
+    def progress_deltas(status, estimated_minutes, sign=1) -> Counter:
+        """Counter changes for adding (sign=1) or removing (sign=-1) a task in a status."""
+        deltas = Counter({TaskPlan.STATUS_COUNTERS[status]: sign})
+        if status == 'DONE':
+            deltas['minutes_done'] += sign * estimated_minutes
+        return deltas
+
+    @staticmethod
+    def apply_progress_deltas(plan, deltas):
+        """Apply counter deltas in a single UPDATE.
+
+        ``plan`` may be a TaskPlan instance (kept in sync in memory) or a pk.
+        """
+        deltas = {field: value for field, value in deltas.items() if value}
+        if not deltas:
+            return
+        plan_id = plan.pk if isinstance(plan, TaskPlan) else plan
+        TaskPlan.objects.filter(pk=plan_id).update(
+            **{field: F(field) + value for field, value in deltas.items()},
+            updated_at=timezone.now(),
+        )
+        if isinstance(plan, TaskPlan):
+            for field, value in deltas.items():
+                setattr(plan, field, getattr(plan, field) + value)
+
+    @staticmethod
+    def record_tasks_added(tasks, sign=1):
+        """Count newly created (sign=1) or deleted (sign=-1) tasks against their plans."""
+        by_plan = {}
+        rollup_deltas = {}
+        for task in tasks:
+            plan = task.plan if Task.plan.is_cached(task) else task.plan_id
+            key = task.plan_id
+            if key not in by_plan:
+                by_plan[key] = [plan, Counter()]
+            deltas = by_plan[key][1]
+            deltas['tasks_total'] += sign
+            deltas.update(TaskPlan.progress_deltas(task.status, task.estimated_minutes, sign))
+            UserDailyRollup.task_deltas(rollup_deltas, task, sign)
+        for plan, deltas in by_plan.values():
+            TaskPlan.apply_progress_deltas(plan, deltas)
+        UserDailyRollup.apply_deltas(rollup_deltas)
 
 
 class Task(models.Model):
@@ -75,6 +182,11 @@ class Task(models.Model):
     plan = models.ForeignKey(
         TaskPlan, on_delete=models.CASCADE, related_name='tasks',
     )
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='tasks',
+        db_index=False,
+        help_text='Denormalized from plan.user for index-only owner lookups',
+    )
     title = models.CharField(max_length=255)
     description = models.TextField()
     category = models.CharField(max_length=20, choices=CATEGORY_CHOICES)
@@ -102,13 +214,28 @@ class Task(models.Model):
         help_text='AI-generated motivational message sent with this task',
     )
     ai_notes = models.JSONField(default=dict, blank=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         ordering = ['due_date', 'sort_order']
+        indexes = [
+            models.Index(fields=['plan', 'due_date', 'status'], name='task_plan_due_status_idx'),
+            models.Index(fields=['user', 'status', 'completed_at'], name='task_user_status_done_idx'),
+            models.Index(fields=['user', 'due_date'], name='task_user_due_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        if self.user_id is None and self.plan_id is not None:
+            self.user_id = self.plan.user_id
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'updated_at'}
+        super().save(*args, **kwargs)
+        if adding:
+            TaskPlan.record_tasks_added([self])
 
     @property
     def is_overdue(self):
-        from django.utils import timezone
         return (
             self.status in ('PENDING', 'SENT')
             and self.due_date < timezone.now().date()
@@ -118,6 +245,299 @@ class Task(models.Model):
         return f'Day {self.day_number}: {self.title} [{self.status}]'
 
 
+class UserDailyRollup(models.Model):
+    """Task counts per user, plan, due date and category, read by AnalyticsService.
+
+    Maintained incrementally wherever tasks are created, deleted, moved or
+    change status (see ``task_deltas``), and rebuilt from Task by the
+    ``rebuild_daily_rollups`` command.
+    """
+    COUNTERS = ('scheduled', 'done', 'skipped', 'minutes_done')
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_rollups')
+    plan = models.ForeignKey(TaskPlan, on_delete=models.CASCADE, related_name='daily_rollups')
+    date = models.DateField(help_text='Due date of the counted tasks')
+    category = models.CharField(max_length=20, choices=Task.CATEGORY_CHOICES)
+    scheduled = models.IntegerField(default=0, help_text='Tasks due, in any status')
+    done = models.IntegerField(default=0)
+    skipped = models.IntegerField(default=0)
+    minutes_done = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['plan', 'date', 'category'], name='one_rollup_per_plan_day_category',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'date'], name='rollup_user_date_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.user_id} {self.date} {self.category}: {self.done}/{self.scheduled}'
+
+    @staticmethod
+    def task_deltas(deltas, task, sign=1, status=None, due_date=None):
+        """Add a task's counts to ``deltas`` (sign=-1 to take them away).
+
+        ``status`` and ``due_date`` default to the task's current values.
+        """
+        status = status or task.status
+        key = (task.user_id, task.plan_id, due_date or task.due_date, task.category)
+        counts = deltas.setdefault(key, Counter())
+        counts['scheduled'] += sign
+        if status == 'DONE':
+            counts['done'] += sign
+            counts['minutes_done'] += sign * task.estimated_minutes
+        elif status == 'SKIPPED':
+            counts['skipped'] += sign
+        return deltas
+
+    @staticmethod
+    @transaction.atomic(savepoint=False)
+    def apply_deltas(deltas):
+        """Add ``{(user_id, plan_id, date, category): Counter}`` deltas to the table."""
+        deltas = {
+            key: {field: value for field, value in counts.items() if value}
+            for key, counts in deltas.items()
+        }
+        deltas = {key: counts for key, counts in deltas.items() if counts}
+        if not deltas:
+            return
+        user_ids = {user_id for user_id, _, _, _ in deltas}
+        analytics_cache.bump_version(*user_ids)
+        fragment_cache.bump('tasks', *user_ids)
+
+        if len(deltas) == 1:
+            # Hot path: a single task changing status
+            [((user_id, plan_id, day, category), counts)] = deltas.items()
+            if UserDailyRollup.objects.filter(plan_id=plan_id, date=day, category=category).update(
+                **{field: F(field) + value for field, value in counts.items()},
+            ):
+                return
+
+        keys = {key[1:] for key in deltas}
+        existing = {
+            (row.plan_id, row.date, row.category): row
+            for row in UserDailyRollup.objects.select_for_update().filter(
+                plan_id__in={plan_id for plan_id, _, _ in keys},
+                date__in={day for _, day, _ in keys},
+                category__in={category for _, _, category in keys},
+            )
+        }
+        changed, created = [], []
+        for (user_id, plan_id, day, category), counts in deltas.items():
+            row = existing.get((plan_id, day, category))
+            if row is None:
+                created.append(UserDailyRollup(
+                    user_id=user_id, plan_id=plan_id, date=day, category=category, **counts,
+                ))
+                continue
+            for field, value in counts.items():
+                setattr(row, field, getattr(row, field) + value)
+            changed.append(row)
+        if changed:
+            UserDailyRollup.objects.bulk_update(changed, UserDailyRollup.COUNTERS)
+        if created:
+            UserDailyRollup.objects.bulk_create(created)
+
+
+class PlanAdjustmentJob(models.Model):
+    """Debounced request to re-plan after repeated skips.
+
+    At most one PENDING job exists per plan; further skips push its
+    ``run_after`` back. Executed by the ``process_plan_jobs`` command.
+    """
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('RUNNING', 'Running'),
+        ('DONE', 'Done'),
+        ('FAILED', 'Failed'),
+    ]
+
+    plan = models.ForeignKey(
+        TaskPlan, on_delete=models.CASCADE, related_name='adjustment_jobs',
+    )
+    reason = models.CharField(max_length=255)
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default='PENDING',
+    )
+    run_after = models.DateTimeField(db_index=True)
+    skip_count = models.PositiveSmallIntegerField(
+        default=1, help_text='Skips absorbed by this job while it was pending',
+    )
+    error_message = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['run_after']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['plan'], condition=models.Q(status='PENDING'),
+                name='one_pending_adjustment_per_plan',
+            ),
+        ]
+
+    def __str__(self):
+        return f'Adjust plan {self.plan_id} [{self.status}]'
+
+
+class PlanGenerationJob(models.Model):
+    """Plan generation run off the request path by ``process_plan_jobs``.
+
+    Views enqueue a job and send the user to a progress page that polls
+    ``tasks_created`` while the new plan's tasks are saved in chunks.
+    """
+    KIND_CHOICES = [
+        ('ONBOARDING', 'Onboarding plan'),
+        ('REGENERATE', 'Regenerated plan'),
+        ('CONTINUATION', 'Next phase'),
+        ('PERSONALIZE', 'Personalize reused plan'),
+    ]
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('RUNNING', 'Running'),
+        ('DONE', 'Done'),
+        ('FAILED', 'Failed'),
+    ]
+    UNFINISHED_STATUSES = ('PENDING', 'RUNNING')
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='plan_generation_jobs',
+    )
+    kind = models.CharField(max_length=12, choices=KIND_CHOICES)
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default='PENDING',
+    )
+    previous_plan = models.ForeignKey(
+        TaskPlan, null=True, blank=True, on_delete=models.SET_NULL,
+        related_name='+', help_text='Plan being continued (CONTINUATION only)',
+    )
+    plan = models.ForeignKey(
+        TaskPlan, null=True, blank=True, on_delete=models.SET_NULL,
+        related_name='+', help_text='Plan being built by the current attempt',
+    )
+    cached_entry = models.ForeignKey(
+        'PlanCacheEntry', null=True, blank=True, on_delete=models.SET_NULL,
+        related_name='+', help_text='Offered cached plan the user accepted (ONBOARDING only)',
+    )
+    tasks_expected = models.PositiveSmallIntegerField(default=0)
+    tasks_created = models.PositiveSmallIntegerField(default=0)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now, db_index=True)
+    error_message = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['run_after']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user'],
+                condition=models.Q(status__in=['PENDING', 'RUNNING']) & ~models.Q(kind='PERSONALIZE'),
+                name='one_unfinished_generation_per_user',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.get_kind_display()} for user {self.user_id} [{self.status}]'
+
+    def start_plan(self, plan, tasks_expected):
+        """Attach the plan this attempt is building and reset progress."""
+        self.plan = plan
+        self.tasks_expected = tasks_expected
+        self.tasks_created = 0
+        self.save(update_fields=['plan', 'tasks_expected', 'tasks_created', 'updated_at'])
+
+    def record_progress(self, count):
+        """Count ``count`` more persisted tasks; also refreshes the heartbeat."""
+        PlanGenerationJob.objects.filter(pk=self.pk).update(
+            tasks_created=F('tasks_created') + count, updated_at=timezone.now(),
+        )
+        self.tasks_created += count
+
+
+class WarmPlan(models.Model):
+    """Pre-generated base plan for one business type × stage combination.
+
+    Refreshed off-peak by ``refresh_warm_pool``. New users in a warm
+    combination get a clone instead of waiting on Claude, followed by a
+    background personalization pass.
+    """
+    business_type = models.CharField(max_length=100)
+    stage = models.CharField(max_length=20, choices=BusinessProfile.STAGE_CHOICES)
+    tasks_data = models.JSONField(
+        default=list, blank=True,
+        help_text='Task list as returned by plan generation, with placeholders',
+    )
+    generated_at = models.DateTimeField(null=True, blank=True)
+
+    # Refresh cost
+    refresh_count = models.PositiveIntegerField(default=0)
+    last_refresh_seconds = models.FloatField(default=0)
+    total_refresh_seconds = models.FloatField(default=0)
+
+    # Usage
+    hits = models.PositiveIntegerField(default=0)
+    misses = models.PositiveIntegerField(
+        default=0, help_text='Signups that found this entry empty or stale',
+    )
+    last_hit_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['business_type', 'stage']
+        unique_together = [('business_type', 'stage')]
+
+    def __str__(self):
+        return f'Warm plan: {self.business_type} / {self.stage}'
+
+    def is_fresh(self, max_age):
+        return bool(
+            self.tasks_data and self.generated_at
+            and self.generated_at >= timezone.now() - max_age
+        )
+
+
+class PlanCacheEntry(models.Model):
+    """Generated plan task data keyed by a normalized profile fingerprint.
+
+    Profiles that feed the same structured values into plan generation
+    reuse the stored plan instead of calling Claude again. The plan is
+    generated from those values alone and stays empty until then. See
+    tasks.plan_cache_service for the fingerprint and similarity scoring.
+    """
+    fingerprint = models.CharField(max_length=64, unique=True)
+    features = models.JSONField(
+        default=dict, help_text='Normalized profile values the fingerprint is built from',
+    )
+    business_type = models.CharField(max_length=100)
+    stage = models.CharField(max_length=20, choices=BusinessProfile.STAGE_CHOICES)
+    duration_days = models.PositiveSmallIntegerField(default=30)
+    tasks_data = models.JSONField(
+        default=list, help_text='Task list as returned by plan generation, with placeholders',
+    )
+    reuse_count = models.PositiveIntegerField(default=0)
+    last_used_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['business_type', 'stage', 'duration_days']),
+        ]
+        verbose_name_plural = 'plan cache entries'
+
+    def __str__(self):
+        return f'Cached plan: {self.business_type} / {self.stage} ({self.fingerprint[:8]})'
+
+
+# Earned once per plan (CATEGORY_MASTER: once per plan and category); every
+# other badge is earned once per user
+PER_PLAN_BADGES = ('HALF_PLAN', 'PLAN_COMPLETE', 'CATEGORY_MASTER')
+
+
 class Achievement(models.Model):
     BADGE_CHOICES = [
         ('FIRST_TASK', 'First Task Completed'),
@@ -141,10 +561,30 @@ class Achievement(models.Model):
     title = models.CharField(max_length=100)
     description = models.TextField(blank=True)
     earned_at = models.DateTimeField(auto_now_add=True)
+    plan = models.ForeignKey(
+        TaskPlan, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='achievements', help_text='Plan a per-plan badge was earned in',
+    )
+    category = models.CharField(
+        max_length=20, blank=True, default='', choices=Task.CATEGORY_CHOICES,
+        help_text='Category for CATEGORY_MASTER',
+    )
     metadata = models.JSONField(default=dict, blank=True)
 
     class Meta:
         ordering = ['-earned_at']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'badge'],
+                condition=~models.Q(badge__in=PER_PLAN_BADGES),
+                name='one_achievement_per_user_badge',
+            ),
+            models.UniqueConstraint(
+                fields=['user', 'badge', 'plan', 'category'],
+                condition=models.Q(badge__in=PER_PLAN_BADGES),
+                name='one_achievement_per_plan_badge',
+            ),
+        ]
 
     def __str__(self):
         return f'{self.title} ({self.user.username})'
@@ -165,6 +605,91 @@ class StreakRecord(models.Model):
         return f'{self.user.username} — {self.date} ({self.tasks_completed} tasks)'
 
 
+class UserStats(models.Model):
+    """Per-user running totals, kept current by TaskProgressService.
+
+    ``current_streak`` is the run of consecutive active days ending on
+    ``last_active_date``; the nightly ``rollover_streaks`` job zeroes it
+    once a day has been missed. ``rebuild_user_stats`` recomputes every
+    row from StreakRecord and Task.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='stats')
+    current_streak = models.PositiveIntegerField(default=0)
+    longest_streak = models.PositiveIntegerField(default=0)
+    last_active_date = models.DateField(null=True, blank=True)
+    tasks_done = models.PositiveIntegerField(default=0)
+    minutes_done = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'user stats'
+
+    def __str__(self):
+        return f'{self.user.username} stats'
+
+    def record_active_day(self, day):
+        """Advance the streak for activity on ``day``."""
+        if self.last_active_date == day:
+            return
+        if self.last_active_date == day - timedelta(days=1):
+            self.current_streak += 1
+        else:
+            self.current_streak = 1
+        self.last_active_date = day
+        self.longest_streak = max(self.longest_streak, self.current_streak)
+
+    def streak_on(self, day) -> int:
+        """Streak as of ``day``: zero unless the user was active that day."""
+        return self.current_streak if self.last_active_date == day else 0
+
+
+class PulseTrend(models.Model):
+    """Per-user weekly pulse analytics, precomputed by PulseTrendService.
+
+    Refreshed for every user by the weekly ``refresh_pulse_trends`` job and
+    for one user whenever they save a pulse. Read by the analytics page and
+    the chat advisor instead of raw WeeklyPulse rows.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='pulse_trend')
+    weeks = models.JSONField(
+        default=list, help_text='Monday of each week in the series, oldest first',
+    )
+    series = models.JSONField(
+        default=dict,
+        help_text='revenue, customers, energy and hours per week; null where no pulse',
+    )
+    rolling = models.JSONField(
+        default=dict, help_text='Trailing 4-week averages of revenue and customers',
+    )
+    revenue_growth = models.FloatField(
+        null=True, blank=True, help_text='Latest pulse vs the one before, in percent',
+    )
+    customers_growth = models.FloatField(null=True, blank=True)
+    forecast = models.JSONField(
+        default=dict,
+        help_text='Per metric: linear trend for the coming weeks and smoothed next-week level',
+    )
+    computed_at = models.DateTimeField()
+
+    def __str__(self):
+        return f'{self.user.username} pulse trend'
+
+
+class CohortReport(models.Model):
+    """The latest staff cohort report, built by CohortService.refresh.
+
+    Kept in the database so every web worker serves the same copy. There is
+    only ever one row.
+    """
+    report = models.JSONField(default=dict, help_text='Totals and tables from build_report')
+    computed_at = models.DateTimeField()
+
+    def __str__(self):
+        return f'Cohort report ({self.computed_at:%Y-%m-%d %H:%M})'
+
+
+RESOURCE_CONTENT_CACHE_TIMEOUT = 60 * 60 * 24
+
 RESOURCE_TYPE_CHOICES = [
     ('TEMPLATE', 'Template'),
     ('CHECKLIST', 'Checklist'),
@@ -214,9 +739,32 @@ class ResourceTemplate(models.Model):
     def __str__(self):
         return f'[{self.get_resource_type_display()}] {self.title} ({self.get_status_display()})'
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        cache.delete(self.content_cache_key(self.pk))
+
+    @staticmethod
+    def content_cache_key(pk):
+        return f'resource_template_content:{pk}'
+
+    @classmethod
+    def cached_content(cls, pk) -> str:
+        """Return a template's content, served from cache after the first read."""
+        key = cls.content_cache_key(pk)
+        content = cache.get(key)
+        if content is None:
+            content = cls.objects.filter(pk=pk).values_list('content', flat=True).first() or ''
+            cache.set(key, content, RESOURCE_CONTENT_CACHE_TIMEOUT)
+        return content
+
 
 class TaskResource(models.Model):
-    """Resource attached to a specific task for a specific user."""
+    """Resource attached to a specific task for a specific user.
+
+    Resources backed by a template leave ``content`` blank and read the
+    template's text through ``display_content``. A per-task copy is only
+    materialized when the template is deleted.
+    """
     task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='resources')
     template = models.ForeignKey(
         ResourceTemplate, null=True, blank=True,
@@ -224,14 +772,38 @@ class TaskResource(models.Model):
     )
     title = models.CharField(max_length=255)
     resource_type = models.CharField(max_length=10, choices=RESOURCE_TYPE_CHOICES)
-    content = models.TextField(blank=True)
+    content = models.TextField(
+        blank=True, help_text='Per-task copy; blank means the template content is used',
+    )
     external_url = models.URLField(blank=True)
     is_completed = models.BooleanField(default=False)
     sort_order = models.PositiveSmallIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         ordering = ['sort_order']
 
     def __str__(self):
         return f'{self.get_resource_type_display()}: {self.title}'
+
+    def save(self, *args, **kwargs):
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'updated_at'}
+        super().save(*args, **kwargs)
+
+    @property
+    def display_content(self) -> str:
+        """Content to render: the task's own copy, else the template's."""
+        if self.content or not self.template_id:
+            return self.content
+        return ResourceTemplate.cached_content(self.template_id)
+
+
+@receiver(pre_delete, sender=ResourceTemplate)
+def materialize_template_usages(sender, instance, **kwargs):
+    """Copy template content into resources that still reference it."""
+    instance.usages.filter(content='').update(
+        content=instance.content, updated_at=timezone.now(),
+    )
+    cache.delete(ResourceTemplate.content_cache_key(instance.pk))
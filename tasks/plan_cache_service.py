@@ -0,0 +1,309 @@
+"""Reuse of generated plans between profiles with matching fingerprints.
+
+Entries only ever hold plans generated from a scrubbed profile (no free
+text, placeholder name and location), so nothing one user typed reaches
+another. Exact fingerprint matches are reused automatically; the nearest
+match is only offered to the user (see ``offer``).
+"""
+
+import hashlib
+import json
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+
+from ai.claude_client import ClaudeClientError
+from onboarding.forms import GOAL_CHOICES_BY_STAGE
+from onboarding.models import BusinessProfile
+
+from .models import PlanCacheEntry
+from .warm_pool_service import LOCATION_PLACEHOLDER, NAME_PLACEHOLDER, WarmPoolService
+
+logger = logging.getLogger(__name__)
+
+# Profile text fed into plan generation (directly or via the assessment).
+# A plan generated from a profile filling any of them is never stored.
+FREE_TEXT_FIELDS = (
+    'description', 'target_audience', 'niche', 'unique_selling_point',
+    'known_competitors', 'biggest_challenges',
+)
+
+# Candidates scored per nearest-neighbor lookup, newest first
+NEAREST_CANDIDATES = 200
+
+# Relative weight of each fingerprint value in similarity(). business_type,
+# stage and duration_days are not scored: candidates must match them exactly.
+CATEGORICAL_WEIGHTS = {
+    'budget_range': 2,
+    'business_model': 2,
+    'business_experience': 1,
+    'current_revenue': 1,
+    'team_size': 1,
+}
+FLAG_WEIGHTS = {
+    'has_website': 0.5,
+    'has_domain': 0.5,
+    'has_branding': 0.5,
+    'has_email_list': 0.5,
+}
+SET_WEIGHTS = {
+    'goals': 2,
+    'owner_skills': 1.5,
+    'social_platforms': 1,
+}
+HOURS_WEIGHT = 2
+# Hours-per-day difference at which the hours term reaches zero
+HOURS_SPAN = 4
+
+
+class PlanCacheService:
+
+    @staticmethod
+    def features(profile: BusinessProfile, duration_days: int = 30) -> dict:
+        """Normalized structured values that feed PLAN_GENERATION_USER.
+
+        Free text (name, description, niche, location, competitors, ...) and
+        goals typed in by hand are left out; they are also left out of the
+        plans stored under these values (see scrubbed_profile).
+        """
+        standard_goals = PlanCacheService.standard_goals(profile.stage)
+        return {
+            'business_type': profile.business_type.strip().lower(),
+            'stage': profile.stage,
+            'duration_days': duration_days,
+            'budget_range': profile.budget_range,
+            'business_model': profile.business_model,
+            'business_experience': profile.business_experience,
+            'current_revenue': profile.current_revenue,
+            'team_size': profile.team_size,
+            'hours_per_day': profile.hours_per_day,
+            'has_website': profile.has_website,
+            'has_domain': profile.has_domain,
+            'has_branding': profile.has_branding,
+            'has_email_list': profile.has_email_list,
+            'goals': sorted(g for g in (profile.goals or []) if g in standard_goals),
+            'owner_skills': sorted(set(profile.owner_skills or [])),
+            'social_platforms': sorted(set(profile.social_platforms or [])),
+        }
+
+    @staticmethod
+    def standard_goals(stage: str) -> set[str]:
+        return {value for value, _ in GOAL_CHOICES_BY_STAGE.get(stage, [])}
+
+    @staticmethod
+    def is_scrubbed(profile: BusinessProfile) -> bool:
+        """Whether ``profile`` feeds plan generation no free text but its name and location."""
+        standard_goals = PlanCacheService.standard_goals(profile.stage)
+        return (
+            not any(getattr(profile, field) for field in FREE_TEXT_FIELDS)
+            and all(goal in standard_goals for goal in profile.goals or [])
+        )
+
+    @staticmethod
+    def scrubbed_profile(features: dict) -> BusinessProfile:
+        """Unsaved profile holding only ``features``, used to generate a shareable plan."""
+        values = {key: value for key, value in features.items() if key != 'duration_days'}
+        return BusinessProfile(
+            **values,
+            business_name=NAME_PLACEHOLDER,
+            location=LOCATION_PLACEHOLDER,
+            ai_assessment={'summary': f"Typical {features['business_type']} business at this stage"},
+        )
+
+    @staticmethod
+    def fingerprint(features: dict) -> str:
+        return hashlib.sha256(json.dumps(features, sort_keys=True).encode()).hexdigest()
+
+    @staticmethod
+    def similarity(a: dict, b: dict) -> float:
+        """Weighted agreement between two feature dicts, from 0 to 1."""
+        score = total = 0.0
+        for key, weight in CATEGORICAL_WEIGHTS.items():
+            score += weight * (a.get(key) == b.get(key))
+            total += weight
+        for key, weight in FLAG_WEIGHTS.items():
+            score += weight * (bool(a.get(key)) == bool(b.get(key)))
+            total += weight
+        for key, weight in SET_WEIGHTS.items():
+            left, right = set(a.get(key) or []), set(b.get(key) or [])
+            union = left | right
+            score += weight * (len(left & right) / len(union) if union else 1)
+            total += weight
+        hours_gap = abs((a.get('hours_per_day') or 0) - (b.get('hours_per_day') or 0))
+        score += HOURS_WEIGHT * max(0.0, 1 - hours_gap / HOURS_SPAN)
+        total += HOURS_WEIGHT
+        return score / total
+
+    @staticmethod
+    def usable():
+        """Generated entries still inside their TTL and under the reuse cap."""
+        cutoff = timezone.now() - timedelta(days=settings.PLAN_CACHE_TTL_DAYS)
+        return PlanCacheEntry.objects.filter(
+            created_at__gte=cutoff, reuse_count__lt=settings.PLAN_CACHE_MAX_REUSES,
+        ).exclude(tasks_data=[])
+
+    @staticmethod
+    def pending():
+        """Entries inside their TTL still waiting for fill_pending to generate a plan."""
+        cutoff = timezone.now() - timedelta(days=settings.PLAN_CACHE_TTL_DAYS)
+        return PlanCacheEntry.objects.filter(created_at__gte=cutoff, tasks_data=[])
+
+    @staticmethod
+    def lookup(
+        profile: BusinessProfile,
+        duration_days: int = 30,
+        min_similarity: float | None = None,
+    ) -> tuple[PlanCacheEntry, float] | None:
+        """Best usable entry for ``profile`` and its similarity score.
+
+        An exact fingerprint match scores 1.0. Otherwise the most similar
+        entry with the same business type, stage and duration is returned
+        if it scores at least ``min_similarity`` (default
+        PLAN_CACHE_MIN_SIMILARITY).
+        """
+        if min_similarity is None:
+            min_similarity = settings.PLAN_CACHE_MIN_SIMILARITY
+        features = PlanCacheService.features(profile, duration_days)
+        usable = PlanCacheService.usable()
+
+        exact = usable.filter(fingerprint=PlanCacheService.fingerprint(features)).first()
+        if exact is not None:
+            return exact, 1.0
+        if min_similarity >= 1:
+            return None
+
+        candidates = usable.filter(
+            business_type=features['business_type'],
+            stage=features['stage'],
+            duration_days=duration_days,
+        ).only('pk', 'features')[:NEAREST_CANDIDATES]
+        best, best_score = None, min_similarity
+        for entry in candidates:
+            score = PlanCacheService.similarity(features, entry.features)
+            if score >= best_score:
+                best, best_score = entry, score
+        if best is None:
+            return None
+        return PlanCacheEntry.objects.get(pk=best.pk), best_score
+
+    @staticmethod
+    def checkout(
+        profile: BusinessProfile,
+        duration_days: int = 30,
+        min_similarity: float | None = None,
+    ) -> list[dict] | None:
+        """Task data reused from the cache for ``profile``, or None on a miss."""
+        if not settings.PLAN_CACHE_ENABLED:
+            return None
+        found = PlanCacheService.lookup(profile, duration_days, min_similarity)
+        if found is None:
+            return None
+        entry, score = found
+        return PlanCacheService.claim(entry, profile, score)
+
+    @staticmethod
+    def offer(profile: BusinessProfile, duration_days: int = 30) -> tuple[PlanCacheEntry, float] | None:
+        """Nearest usable entry to suggest to ``profile``'s owner while their plan is generated."""
+        if not settings.PLAN_CACHE_ENABLED:
+            return None
+        return PlanCacheService.lookup(profile, duration_days)
+
+    @staticmethod
+    def claim(entry: PlanCacheEntry, profile: BusinessProfile, score: float = 1.0) -> list[dict] | None:
+        """Take one reuse of ``entry`` for ``profile``; None if the cap was reached first."""
+        claimed = PlanCacheEntry.objects.filter(
+            pk=entry.pk, reuse_count__lt=settings.PLAN_CACHE_MAX_REUSES,
+        ).update(reuse_count=F('reuse_count') + 1, last_used_at=timezone.now())
+        if not claimed:
+            return None
+        logger.info(
+            'Plan cache hit for profile %d (entry %d, similarity %.2f)',
+            profile.pk, entry.pk, score,
+        )
+        return WarmPoolService.materialize(entry.tasks_data, profile)
+
+    @staticmethod
+    def store(profile: BusinessProfile, tasks_data: list[dict], duration_days: int = 30):
+        """Record demand for ``profile``'s fingerprint, keeping its plan if shareable.
+
+        A plan generated from a scrubbed profile (see is_scrubbed) is stored
+        as is. Otherwise the entry is left empty for fill_pending to generate
+        from the scrubbed profile. An existing entry keeps its plan, reuse
+        count and age.
+        """
+        if not settings.PLAN_CACHE_ENABLED or not tasks_data:
+            return None
+        features = PlanCacheService.features(profile, duration_days)
+        shareable = []
+        if PlanCacheService.is_scrubbed(profile):
+            shareable = PlanCacheService.generalize(tasks_data, profile)
+        entry, created = PlanCacheEntry.objects.get_or_create(
+            fingerprint=PlanCacheService.fingerprint(features),
+            defaults={
+                'features': features,
+                'business_type': features['business_type'],
+                'stage': profile.stage,
+                'duration_days': duration_days,
+                'tasks_data': shareable,
+            },
+        )
+        if not created and shareable and not entry.tasks_data:
+            PlanCacheService._fill(entry, shareable)
+        return entry
+
+    @staticmethod
+    def _fill(entry: PlanCacheEntry, tasks_data: list[dict]) -> bool:
+        """Give an empty entry its plan; its TTL starts now. False if already filled."""
+        now = timezone.now()
+        filled = PlanCacheEntry.objects.filter(pk=entry.pk, tasks_data=[]).update(
+            tasks_data=tasks_data, created_at=now,
+        )
+        if filled:
+            entry.tasks_data, entry.created_at = tasks_data, now
+        return bool(filled)
+
+    @staticmethod
+    def fill_pending(limit: int | None = None) -> int:
+        """Generate plans for empty entries from their scrubbed profiles. Returns entries filled."""
+        from .services import TaskGenerationService
+
+        if not settings.PLAN_CACHE_ENABLED:
+            return 0
+        limit = settings.PLAN_CACHE_FILL_PER_RUN if limit is None else limit
+        filled = 0
+        for entry in PlanCacheService.pending()[:limit]:
+            try:
+                tasks_data = TaskGenerationService.request_plan_tasks(
+                    PlanCacheService.scrubbed_profile(entry.features), entry.duration_days,
+                )
+            except ClaudeClientError:
+                logger.exception('Plan cache fill failed for entry %d', entry.pk)
+                continue
+            if tasks_data and PlanCacheService._fill(entry, tasks_data):
+                filled += 1
+        return filled
+
+    @staticmethod
+    def generalize(tasks_data: list[dict], profile: BusinessProfile) -> list[dict]:
+        """Swap the profile's name and location for warm-pool placeholders."""
+        raw = json.dumps(tasks_data)
+        for value, placeholder in (
+            (profile.business_name, NAME_PLACEHOLDER),
+            (profile.location, LOCATION_PLACEHOLDER),
+        ):
+            escaped = json.dumps(value or '')[1:-1]
+            if len(escaped) >= 3:
+                raw = raw.replace(escaped, placeholder)
+        return json.loads(raw)
+
+    @staticmethod
+    def purge_expired() -> int:
+        """Delete entries past their TTL or reuse cap. Returns rows deleted."""
+        cutoff = timezone.now() - timedelta(days=settings.PLAN_CACHE_TTL_DAYS)
+        deleted, _ = PlanCacheEntry.objects.filter(
+            Q(created_at__lt=cutoff) | Q(reuse_count__gte=settings.PLAN_CACHE_MAX_REUSES),
+        ).delete()
+        return deleted
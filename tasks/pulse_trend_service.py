@@ -0,0 +1,201 @@
+"""Weekly pulse trends, rolling averages and forecasts (PulseTrend).
+
+Users are computed together: their pulses become a users × weeks matrix
+(NaN where no pulse was filed) and every statistic is a NumPy operation
+along the week axis, so the weekly batch costs the same handful of array
+passes for one user or all of them.
+"""
+
+from datetime import timedelta
+
+import numpy as np
+from django.utils import timezone
+
+from onboarding.models import WeeklyPulse
+
+from . import analytics_cache
+from .cohort_service import stream_columns
+from .models import PulseTrend
+
+PULSE_TREND_WEEKS = 12
+ROLLING_WEEKS = 4
+FORECAST_WEEKS = 4
+SMOOTHING_ALPHA = 0.5
+
+# Metric -> WeeklyPulse column
+METRICS = {
+    'revenue': 'revenue_this_week',
+    'customers': 'new_customers',
+    'energy': 'energy_level',
+    'hours': 'hours_worked',
+}
+FORECAST_METRICS = ('revenue', 'customers')
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Mean of the observed values in each trailing ``window`` of weeks."""
+    observed = ~np.isnan(values)
+    sums = np.cumsum(np.where(observed, values, 0.0), axis=1)
+    counts = np.cumsum(observed, axis=1)
+    sums[:, window:] = sums[:, window:] - sums[:, :-window].copy()
+    counts[:, window:] = counts[:, window:] - counts[:, :-window].copy()
+    return np.divide(sums, counts, out=np.full(values.shape, np.nan), where=counts > 0)
+
+
+def latest_growth(values: np.ndarray) -> np.ndarray:
+    """Percent change from each row's second-latest observed value to its latest."""
+    rows = np.arange(len(values))
+    weeks = values.shape[1]
+    observed = ~np.isnan(values)
+    last = weeks - 1 - np.argmax(observed[:, ::-1], axis=1)
+    earlier = observed.copy()
+    earlier[rows, last] = False
+    previous_index = weeks - 1 - np.argmax(earlier[:, ::-1], axis=1)
+
+    latest = values[rows, last]
+    previous = values[rows, previous_index]
+    valid = observed.any(axis=1) & earlier.any(axis=1) & (previous > 0)
+    return np.divide(
+        (latest - previous) * 100, previous, out=np.full(len(values), np.nan), where=valid,
+    )
+
+
+def linear_forecast(values: np.ndarray, horizon: int) -> np.ndarray:
+    """Least-squares line through each row's observed weeks, extended ``horizon`` weeks."""
+    weeks = values.shape[1]
+    x = np.arange(weeks, dtype=float)
+    observed = ~np.isnan(values)
+    y = np.where(observed, values, 0.0)
+    n = observed.sum(axis=1)
+    sum_x = (x * observed).sum(axis=1)
+    sum_y = y.sum(axis=1)
+    sum_xx = (x * x * observed).sum(axis=1)
+    sum_xy = (x * y).sum(axis=1)
+
+    denominator = n * sum_xx - sum_x ** 2
+    slope = np.divide(
+        n * sum_xy - sum_x * sum_y, denominator,
+        out=np.zeros(len(values)), where=denominator > 0,
+    )
+    safe_n = np.maximum(n, 1)
+    intercept = sum_y / safe_n - slope * sum_x / safe_n
+    future = np.arange(weeks, weeks + horizon, dtype=float)
+    forecast = intercept[:, None] + slope[:, None] * future[None, :]
+    forecast[n == 0] = np.nan
+    return np.maximum(forecast, 0)
+
+
+def smoothed_level(values: np.ndarray, alpha: float) -> np.ndarray:
+    """Simple exponential smoothing over each row's observed weeks."""
+    level = np.full(len(values), np.nan)
+    for column in values.T:
+        observed = ~np.isnan(column)
+        blended = np.where(np.isnan(level), column, alpha * column + (1 - alpha) * level)
+        level = np.where(observed, blended, level)
+    return level
+
+
+def _json_list(values) -> list:
+    return [None if np.isnan(value) else round(float(value), 2) for value in values]
+
+
+def _json_number(value):
+    return None if np.isnan(value) else round(float(value), 1)
+
+
+class PulseTrendService:
+
+    @staticmethod
+    def compute(user_ids=None, today=None, weeks: int = PULSE_TREND_WEEKS) -> list[PulseTrend]:
+        """Unsaved PulseTrend rows for users with a pulse in the last ``weeks`` weeks."""
+        today = today or timezone.now().date()
+        current_monday = today - timedelta(days=today.weekday())
+        start = current_monday - timedelta(weeks=weeks - 1)
+
+        pulses = WeeklyPulse.objects.filter(week_of__gte=start, week_of__lte=current_monday)
+        if user_ids is not None:
+            pulses = pulses.filter(user_id__in=user_ids)
+        columns = stream_columns(pulses, {
+            'user_id': np.int64, 'week_of': 'datetime64[D]',
+            **{column: np.float64 for column in METRICS.values()},
+        })
+        if not len(columns['user_id']):
+            return []
+
+        users, row = np.unique(columns['user_id'], return_inverse=True)
+        week = (columns['week_of'] - np.datetime64(start, 'D')).astype(np.int64) // 7
+        matrices = {}
+        for metric, column in METRICS.items():
+            matrix = np.full((len(users), weeks), np.nan)
+            # A blank revenue field counts as no revenue that week
+            matrix[row, week] = np.nan_to_num(columns[column]) if metric == 'revenue' else columns[column]
+            matrices[metric] = matrix
+
+        observed = ~np.isnan(matrices['energy'])
+        first_week = np.argmax(observed, axis=1)
+        rolling = {metric: rolling_mean(matrices[metric], ROLLING_WEEKS) for metric in FORECAST_METRICS}
+        growth = {metric: latest_growth(matrices[metric]) for metric in FORECAST_METRICS}
+        linear = {
+            metric: linear_forecast(matrices[metric], FORECAST_WEEKS) for metric in FORECAST_METRICS
+        }
+        smoothed = {
+            metric: smoothed_level(matrices[metric], SMOOTHING_ALPHA) for metric in FORECAST_METRICS
+        }
+
+        now = timezone.now()
+        mondays = [(start + timedelta(weeks=n)).isoformat() for n in range(weeks)]
+        trends = []
+        for i, user_id in enumerate(users.tolist()):
+            # Series start at the user's first pulse in the window
+            first = int(first_week[i])
+            trends.append(PulseTrend(
+                user_id=user_id,
+                weeks=mondays[first:],
+                series={
+                    metric: _json_list(matrix[i, first:]) for metric, matrix in matrices.items()
+                },
+                rolling={metric: _json_list(values[i, first:]) for metric, values in rolling.items()},
+                revenue_growth=_json_number(growth['revenue'][i]),
+                customers_growth=_json_number(growth['customers'][i]),
+                forecast={
+                    metric: {
+                        'linear': _json_list(linear[metric][i]),
+                        'smoothed': _json_number(smoothed[metric][i]),
+                    }
+                    for metric in FORECAST_METRICS
+                },
+                computed_at=now,
+            ))
+        return trends
+
+    @staticmethod
+    def refresh(user_ids=None, today=None) -> int:
+        """Recompute and store trends for ``user_ids`` (default: everyone).
+
+        Users with no pulse in the window lose their stored trend. Returns
+        the number of trends written.
+        """
+        trends = PulseTrendService.compute(user_ids, today)
+        PulseTrend.objects.bulk_create(
+            trends, batch_size=500, update_conflicts=True, unique_fields=['user'],
+            update_fields=[
+                'weeks', 'series', 'rolling', 'revenue_growth', 'customers_growth',
+                'forecast', 'computed_at',
+            ],
+        )
+        stale = PulseTrend.objects.exclude(user_id__in=[trend.user_id for trend in trends])
+        if user_ids is not None:
+            stale = stale.filter(user_id__in=user_ids)
+        stale_ids = list(stale.values_list('user_id', flat=True))
+        stale.delete()
+        analytics_cache.bump_version(*[trend.user_id for trend in trends], *stale_ids)
+        return len(trends)
+
+    @staticmethod
+    def for_user(user) -> PulseTrend:
+        """The user's stored trend, else one computed now (unsaved, possibly empty)."""
+        trend = PulseTrend.objects.filter(user=user).first()
+        if trend is None:
+            computed = PulseTrendService.compute([user.pk])
+            trend = computed[0] if computed else PulseTrend(user=user)
+        return trend
@@ -1,12 +1,15 @@
 """Task services — all task mutations go through here."""
 
 import logging
+from collections import Counter
 from datetime import timedelta
 
 from django.conf import settings
 from django.db import transaction
+from django.db.models import F
 from django.utils import timezone
 
+from accounts.identity import get_active_plan
 from ai.claude_client import ClaudeClientError, call_claude_json
 from ai.openai_client import OpenAIClientError, call_openai
 from ai.prompts import (
@@ -21,23 +24,55 @@ from ai.prompts import (
 )
 from onboarding.models import BusinessProfile, WeeklyPulse
 
+from . import analytics_cache, fragment_cache
 from .achievement_service import AchievementService
-from .models import ResourceTemplate, Task, TaskPlan, TaskResource
+from .job_service import PlanJobService
+from .models import ResourceTemplate, Task, TaskPlan, TaskResource, UserDailyRollup
+from .plan_cache_service import PlanCacheService
+from .stats_service import UserStatsService
 
 logger = logging.getLogger(__name__)
 
 
 class TaskGenerationService:
 
+    # Tasks saved per transaction while a plan is being generated
+    PLAN_TASK_CHUNK_SIZE = 10
+
     @staticmethod
-    @transaction.atomic
     def generate_plan(
         profile: BusinessProfile,
         duration_days: int = 30,
+        job=None,
+        replaces: TaskPlan | None = None,
     ) -> TaskPlan:
-        """Generate a full task plan using Claude. Creates TaskPlan + Tasks + Resources."""
+        """Generate a full task plan using Claude. Creates TaskPlan + Tasks + Resources.
+
+        ``replaces`` is marked REPLACED once the new plan is active. Progress
+        is reported to ``job`` (a PlanGenerationJob) if one is given.
+        """
+        source = 'claude'
+        try:
+            tasks_data = TaskGenerationService.request_plan_tasks(profile, duration_days)
+        except ClaudeClientError:
+            logger.exception('Plan generation failed, using fallback')
+            # A close enough cached plan beats the generic template
+            tasks_data = PlanCacheService.checkout(profile, duration_days)
+            if tasks_data is not None:
+                source = 'plan_cache'
+            else:
+                tasks_data = TaskGenerationService._fallback_tasks(profile, duration_days)
+        else:
+            PlanCacheService.store(profile, tasks_data, duration_days)
+
+        return TaskGenerationService.create_plan(
+            profile, tasks_data, duration_days, job=job, replaces=replaces, source=source,
+        )
+
+    @staticmethod
+    def plan_prompt_fields(profile: BusinessProfile, duration_days: int = 30) -> dict:
+        """Values substituted into PLAN_GENERATION_USER for ``profile``."""
         assessment = profile.ai_assessment or {}
-        today = timezone.now().date()
 
         # Build display values for skills and platforms
         skill_map = dict(BusinessProfile.SKILL_CHOICES)
@@ -45,8 +80,7 @@ class TaskGenerationService:
         platform_map = dict(BusinessProfile.PLATFORM_CHOICES)
         platforms_display = [platform_map.get(p, p) for p in (profile.social_platforms or [])]
 
-        system_prompt = PLAN_GENERATION_SYSTEM.format(duration_days=duration_days)
-        user_prompt = PLAN_GENERATION_USER.format(
+        return dict(
             business_name=profile.business_name,
             business_type=profile.business_type,
             stage=profile.get_stage_display(),
@@ -75,12 +109,30 @@ class TaskGenerationService:
             duration_days=duration_days,
         )
 
-        try:
-            result = call_claude_json(system_prompt, user_prompt, max_tokens=12000)
-            tasks_data = result.get('tasks', [])
-        except ClaudeClientError:
-            logger.exception('Plan generation failed, using fallback')
-            tasks_data = TaskGenerationService._fallback_tasks(profile, duration_days)
+    @staticmethod
+    def request_plan_tasks(profile: BusinessProfile, duration_days: int = 30) -> list[dict]:
+        """Ask Claude for a plan's task data. Raises ClaudeClientError on failure."""
+        system_prompt = PLAN_GENERATION_SYSTEM.format(duration_days=duration_days)
+        user_prompt = PLAN_GENERATION_USER.format(
+            **TaskGenerationService.plan_prompt_fields(profile, duration_days),
+        )
+        result = call_claude_json(system_prompt, user_prompt, max_tokens=12000)
+        return result.get('tasks', [])
+
+    @staticmethod
+    def create_plan(
+        profile: BusinessProfile,
+        tasks_data: list[dict],
+        duration_days: int = 30,
+        job=None,
+        replaces: TaskPlan | None = None,
+        source: str = 'claude',
+    ) -> TaskPlan:
+        """Create and activate a plan from already generated task data.
+
+        ``source`` records where the task data came from in the plan metadata.
+        """
+        today = timezone.now().date()
 
         # Stage-appropriate plan title
         stage_titles = {
@@ -92,7 +144,7 @@ class TaskGenerationService:
         }
         plan_title = stage_titles.get(profile.stage, f'{duration_days}-Day Action Plan')
 
-        plan = TaskPlan.objects.create(
+        plan = TaskPlan(
             user=profile.user,
             business_profile=profile,
             title=plan_title,
@@ -102,34 +154,76 @@ class TaskGenerationService:
                 'model': settings.ANTHROPIC_MODEL,
                 'task_count': len(tasks_data),
                 'generated_at': timezone.now().isoformat(),
+                'source': source,
             },
         )
+        TaskGenerationService._persist_plan(
+            plan, tasks_data, profile, job=job,
+            retire=replaces, retire_status='REPLACED',
+        )
 
-        for task_data in tasks_data:
-            day_num = task_data.get('day_number', 1)
-            task = Task.objects.create(
+        logger.info(
+            'Generated plan %d with %d tasks for user %s',
+            plan.pk, len(tasks_data), profile.user.username,
+        )
+        return plan
+
+    @staticmethod
+    def _persist_plan(plan, tasks_data, profile, job=None, retire=None, retire_status='REPLACED'):
+        """Save a GENERATING plan, add its tasks in chunks, then activate it.
+
+        Each chunk commits on its own so ``job`` progress is visible to the
+        status endpoint. ``retire`` is only retired once the plan goes ACTIVE.
+        """
+        plan.status = 'GENERATING'
+        plan.save()
+        if job is not None:
+            job.start_plan(plan, len(tasks_data))
+
+        chunk_size = TaskGenerationService.PLAN_TASK_CHUNK_SIZE
+        for start in range(0, len(tasks_data), chunk_size):
+            chunk = tasks_data[start:start + chunk_size]
+            with transaction.atomic():
+                TaskGenerationService._create_plan_tasks(plan, chunk, profile)
+                if job is not None:
+                    job.record_progress(len(chunk))
+
+        with transaction.atomic():
+            if retire is not None:
+                retire.status = retire_status
+                retire.save(update_fields=['status'])
+            plan.status = 'ACTIVE'
+            plan.save(update_fields=['status'])
+            analytics_cache.bump_version(plan.user_id)
+            fragment_cache.bump('tasks', plan.user_id)
+        return plan
+
+    @staticmethod
+    def _create_plan_tasks(plan, tasks_data, profile):
+        """Bulk-create a plan's tasks and their resources from AI task data."""
+        tasks = [
+            Task(
                 plan=plan,
+                user_id=plan.user_id,
                 title=task_data.get('title', 'Untitled task'),
                 description=task_data.get('description', ''),
                 category=task_data.get('category', 'PLANNING'),
                 difficulty=task_data.get('difficulty', 'MEDIUM'),
                 estimated_minutes=task_data.get('estimated_minutes', 30),
-                day_number=day_num,
-                due_date=today + timedelta(days=day_num - 1),
+                day_number=task_data.get('day_number', 1),
+                due_date=plan.starts_on + timedelta(days=task_data.get('day_number', 1) - 1),
                 sort_order=task_data.get('sort_order', 0),
             )
+            for task_data in tasks_data
+        ]
+        Task.objects.bulk_create(tasks)
+        TaskPlan.record_tasks_added(tasks)
 
-            # Create resources for this task
-            resources_data = task_data.get('resources', [])
+        for task, task_data in zip(tasks, tasks_data):
             TaskGenerationService._create_task_resources(
-                task, resources_data, profile,
+                task, task_data.get('resources', []), profile,
             )
-
-        logger.info(
-            'Generated plan %d with %d tasks for user %s',
-            plan.pk, len(tasks_data), profile.user.username,
-        )
-        return plan
+        return tasks
 
     @staticmethod
     def _find_library_match(resource_type, title, category, business_type):
@@ -158,8 +252,11 @@ class TaskGenerationService:
 
         For each resource:
         1. Check library for an existing reviewed template
-        2. If found, clone it (increment times_used)
+        2. If found, reference it (increment times_used)
         3. If not found, save AI output as new DRAFT ResourceTemplate + TaskResource
+
+        Resources reference their template's content instead of copying it;
+        see ``TaskResource.display_content``.
         """
         for idx, res in enumerate(resources_data):
             res_type = res.get('type', 'GUIDE')
@@ -174,14 +271,14 @@ class TaskGenerationService:
 
             if library_match:
                 # Reuse reviewed template
-                library_match.times_used += 1
-                library_match.save(update_fields=['times_used'])
+                ResourceTemplate.objects.filter(pk=library_match.pk).update(
+                    times_used=F('times_used') + 1,
+                )
                 TaskResource.objects.create(
                     task=task,
                     template=library_match,
                     title=library_match.title,
                     resource_type=library_match.resource_type,
-                    content=library_match.content,
                     external_url=library_match.external_url,
                     sort_order=idx,
                 )
@@ -204,7 +301,6 @@ class TaskGenerationService:
                     template=template,
                     title=title,
                     resource_type=res_type,
-                    content=content,
                     external_url=url,
                     sort_order=idx,
                 )
@@ -215,9 +311,7 @@ class TaskGenerationService:
         if date is None:
             date = timezone.now().date()
 
-        active_plan = TaskPlan.objects.filter(
-            user=user, status='ACTIVE',
-        ).first()
+        active_plan = get_active_plan(user)
         if not active_plan:
             return Task.objects.none()
 
@@ -234,9 +328,7 @@ class TaskGenerationService:
         if not profile:
             return TaskGenerationService._simple_task_message(tasks)
 
-        active_plan = TaskPlan.objects.filter(
-            user=user, status='ACTIVE',
-        ).first()
+        active_plan = get_active_plan(user)
 
         task_list = '\n'.join(
             f'- {t.title} (~{t.estimated_minutes} min)'
@@ -273,16 +365,26 @@ class TaskGenerationService:
             return TaskGenerationService._simple_task_message(tasks)
 
     @staticmethod
-    def adjust_plan(task_plan: TaskPlan, reason: str = 'Multiple skips'):
-        """Use Claude to adjust remaining tasks based on progress."""
+    def adjust_plan(task_plan: TaskPlan, reason: str = 'Multiple skips') -> dict | None:
+        """Use Claude to adjust remaining tasks based on progress.
+
+        Returns the change summary from ``_apply_plan_adjustment``, or None
+        if Claude could not be reached.
+        """
         profile = task_plan.business_profile
 
-        completed = list(task_plan.tasks.filter(status='DONE').values_list('title', flat=True))
-        skipped = list(task_plan.tasks.filter(status='SKIPPED').values_list('title', flat=True))
-        remaining = list(
-            task_plan.tasks.filter(status='PENDING')
-            .values('id', 'title', 'day_number', 'category')
-        )
+        completed, skipped, pending = [], [], {}
+        for task in task_plan.tasks.exclude(status__in=['SENT', 'RESCHEDULED']):
+            if task.status == 'DONE':
+                completed.append(task.title)
+            elif task.status == 'SKIPPED':
+                skipped.append(task.title)
+            else:
+                pending[task.pk] = task
+        remaining = [
+            {'id': t.pk, 'title': t.title, 'day_number': t.day_number, 'category': t.category}
+            for t in pending.values()
+        ]
 
         user_prompt = PLAN_ADJUSTMENT_USER.format(
             business_name=profile.business_name,
@@ -297,41 +399,126 @@ class TaskGenerationService:
             result = call_claude_json(PLAN_ADJUSTMENT_SYSTEM, user_prompt)
         except ClaudeClientError:
             logger.exception('Plan adjustment failed')
-            return
+            return None
 
-        # Process removals
-        remove_ids = result.get('remove_task_ids', [])
-        if remove_ids:
-            task_plan.tasks.filter(id__in=remove_ids, status='PENDING').delete()
+        summary = TaskGenerationService._apply_plan_adjustment(task_plan, pending, result)
+        logger.info(
+            'Adjusted plan %d: removed=%d rescheduled=%d added=%d rejected=%d — %s',
+            task_plan.pk, summary['removed'], summary['rescheduled'],
+            summary['added'], summary['rejected'], summary['reasoning'],
+        )
+        return summary
 
-        # Process reschedules
-        today = timezone.now().date()
-        for item in result.get('reschedule', []):
-            task = task_plan.tasks.filter(id=item.get('task_id'), status='PENDING').first()
-            if task:
-                new_day = item.get('new_day_number', task.day_number)
-                task.day_number = new_day
-                task.due_date = task_plan.starts_on + timedelta(days=new_day - 1)
-                task.status = 'RESCHEDULED'
-                task.rescheduled_to = task.due_date
-                task.save()
-
-        # Add new tasks
-        for new_task in result.get('new_tasks', []):
-            day_num = new_task.get('day_number', 1)
-            Task.objects.create(
+    @staticmethod
+    def _as_int(value):
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    @transaction.atomic
+    def _apply_plan_adjustment(task_plan: TaskPlan, pending: dict, result: dict) -> dict:
+        """Apply Claude's adjustment as one diff against the plan's PENDING tasks.
+
+        ``pending`` holds the ids of the tasks Claude was shown. They are
+        re-read under a row lock, and only those still PENDING can be removed
+        or moved — the user may have completed or skipped some while Claude
+        was thinking. Entries referring to other tasks or carrying unusable
+        values are counted as rejected and ignored.
+        """
+        pending = (
+            Task.objects.select_for_update()
+            .filter(pk__in=list(pending), plan=task_plan, status='PENDING')
+            .in_bulk()
+        )
+        as_int = TaskGenerationService._as_int
+        last_day = task_plan.duration_days
+        rejected = 0
+
+        rollup_deltas = {}
+        removed = {}
+        for task_id in result.get('remove_task_ids') or []:
+            task = pending.get(as_int(task_id))
+            if task is None:
+                rejected += 1
+                continue
+            removed[task.pk] = task
+
+        moved = {}
+        for item in result.get('reschedule') or []:
+            if not isinstance(item, dict):
+                rejected += 1
+                continue
+            task = pending.get(as_int(item.get('task_id')))
+            new_day = as_int(item.get('new_day_number'))
+            if task is None or task.pk in removed or new_day is None or not 1 <= new_day <= last_day:
+                rejected += 1
+                continue
+            if new_day == task.day_number:
+                continue
+            UserDailyRollup.task_deltas(rollup_deltas, task, -1)
+            task.day_number = new_day
+            task.due_date = task_plan.starts_on + timedelta(days=new_day - 1)
+            UserDailyRollup.task_deltas(rollup_deltas, task)
+            moved[task.pk] = task
+
+        categories = {c for c, _ in Task.CATEGORY_CHOICES}
+        difficulties = {d for d, _ in Task.DIFFICULTY_CHOICES}
+        added = []
+        for item in result.get('new_tasks') or []:
+            if not isinstance(item, dict):
+                rejected += 1
+                continue
+            day_num = as_int(item.get('day_number')) or 1
+            day_num = min(max(day_num, 1), last_day)
+            category = item.get('category')
+            difficulty = item.get('difficulty')
+            added.append(Task(
                 plan=task_plan,
-                title=new_task.get('title', 'New task'),
-                description=new_task.get('description', ''),
-                category=new_task.get('category', 'PLANNING'),
-                difficulty=new_task.get('difficulty', 'MEDIUM'),
-                estimated_minutes=new_task.get('estimated_minutes', 30),
+                user_id=task_plan.user_id,
+                title=(item.get('title') or 'New task')[:255],
+                description=item.get('description', ''),
+                category=category if category in categories else 'PLANNING',
+                difficulty=difficulty if difficulty in difficulties else 'MEDIUM',
+                estimated_minutes=as_int(item.get('estimated_minutes')) or 30,
                 day_number=day_num,
                 due_date=task_plan.starts_on + timedelta(days=day_num - 1),
-                sort_order=new_task.get('sort_order', 0),
-            )
-
-        logger.info('Adjusted plan %d: %s', task_plan.pk, result.get('reasoning', ''))
+                sort_order=max(as_int(item.get('sort_order')) or 0, 0),
+            ))
+
+        deltas = Counter()
+        if removed:
+            Task.objects.filter(pk__in=removed, status='PENDING').delete()
+            deltas['tasks_total'] -= len(removed)
+            for task in removed.values():
+                deltas.update(TaskPlan.progress_deltas('PENDING', task.estimated_minutes, -1))
+                UserDailyRollup.task_deltas(rollup_deltas, task, -1)
+        if moved:
+            now = timezone.now()
+            for task in moved.values():
+                task.updated_at = now
+            Task.objects.bulk_update(moved.values(), ['day_number', 'due_date', 'updated_at'])
+        if added:
+            Task.objects.bulk_create(added)
+            deltas['tasks_total'] += len(added)
+            for task in added:
+                deltas.update(TaskPlan.progress_deltas('PENDING', task.estimated_minutes))
+                UserDailyRollup.task_deltas(rollup_deltas, task)
+        if deltas:
+            TaskPlan.apply_progress_deltas(task_plan, deltas)
+        UserDailyRollup.apply_deltas(rollup_deltas)
+
+        task_plan.last_adjusted_at = timezone.now()
+        task_plan.save(update_fields=['last_adjusted_at'])
+
+        return {
+            'removed': len(removed),
+            'rescheduled': len(moved),
+            'added': len(added),
+            'rejected': rejected,
+            'reasoning': result.get('reasoning', ''),
+        }
 
     @staticmethod
     def _fallback_tasks(profile, duration_days):
@@ -367,11 +554,11 @@ class TaskGenerationService:
         return '\n'.join(lines)
 
     @staticmethod
-    @transaction.atomic
     def generate_continuation_plan(
         profile: BusinessProfile,
         previous_plan: TaskPlan,
         duration_days: int = 30,
+        job=None,
     ) -> TaskPlan:
         """Generate a continuation plan based on previous plan results."""
         today = timezone.now().date()
@@ -379,15 +566,14 @@ class TaskGenerationService:
 
         # Compute previous plan stats
         tasks = previous_plan.tasks.all()
-        total = tasks.count()
+        total = previous_plan.tasks_total
         done = tasks.filter(status='DONE')
         skipped = tasks.filter(status='SKIPPED')
-        done_count = done.count()
-        skipped_count = skipped.count()
-        completion_pct = round((done_count / total) * 100) if total > 0 else 0
+        done_count = previous_plan.tasks_done
+        skipped_count = previous_plan.tasks_skipped
+        completion_pct = previous_plan.completion_pct
 
         # Category analysis
-        from collections import Counter
         done_cats = Counter(done.values_list('category', flat=True))
         skipped_cats = Counter(skipped.values_list('category', flat=True))
         cat_labels = dict(Task.CATEGORY_CHOICES)
@@ -443,15 +629,10 @@ class TaskGenerationService:
             logger.exception('Continuation plan generation failed, using fallback')
             tasks_data = TaskGenerationService._fallback_tasks(profile, duration_days)
 
-        # Mark previous plan as completed
-        previous_plan.status = 'COMPLETED'
-        previous_plan.save(update_fields=['status'])
-
-        plan = TaskPlan.objects.create(
+        plan = TaskPlan(
             user=profile.user,
             business_profile=profile,
             title=f'Phase {new_phase} — {duration_days}-Day Plan',
-            status='ACTIVE',
             phase=new_phase,
             previous_plan=previous_plan,
             starts_on=today,
@@ -463,22 +644,11 @@ class TaskGenerationService:
                 'continuation_of': previous_plan.pk,
             },
         )
-
-        for task_data in tasks_data:
-            day_num = task_data.get('day_number', 1)
-            task = Task.objects.create(
-                plan=plan,
-                title=task_data.get('title', 'Untitled task'),
-                description=task_data.get('description', ''),
-                category=task_data.get('category', 'PLANNING'),
-                difficulty=task_data.get('difficulty', 'MEDIUM'),
-                estimated_minutes=task_data.get('estimated_minutes', 30),
-                day_number=day_num,
-                due_date=today + timedelta(days=day_num - 1),
-                sort_order=task_data.get('sort_order', 0),
-            )
-            resources_data = task_data.get('resources', [])
-            TaskGenerationService._create_task_resources(task, resources_data, profile)
+        # The previous plan is marked COMPLETED when this one goes live
+        TaskGenerationService._persist_plan(
+            plan, tasks_data, profile, job=job,
+            retire=previous_plan, retire_status='COMPLETED',
+        )
 
         logger.info(
             'Generated continuation plan %d (phase %d) with %d tasks for user %s',
@@ -492,7 +662,7 @@ class TaskGenerationService:
 
         Returns dict with reason and plan, or None.
         """
-        active_plan = TaskPlan.objects.filter(user=user, status='ACTIVE').first()
+        active_plan = get_active_plan(user)
         if not active_plan:
             return None
 
@@ -503,8 +673,8 @@ class TaskGenerationService:
             return {'reason': 'expired', 'plan': active_plan}
 
         # Plan completed (all tasks done or skipped — excludes RESCHEDULED)
-        pending = active_plan.tasks.exclude(status__in=['DONE', 'SKIPPED']).count()
-        if pending == 0 and active_plan.tasks.count() > 0:
+        pending = active_plan.tasks_pending + active_plan.tasks_rescheduled
+        if pending == 0 and active_plan.tasks_total > 0:
             return {'reason': 'completed', 'plan': active_plan}
 
         return None
@@ -512,6 +682,90 @@ class TaskGenerationService:
 
 class TaskProgressService:
 
+    @staticmethod
+    @transaction.atomic
+    def transition_tasks(tasks, new_status: str, from_statuses=None, **fields) -> list[Task]:
+        """Move tasks to ``new_status`` and update their plans' progress counters.
+
+        All task status changes go through here. Extra keyword arguments are
+        written to every task alongside the status. Tasks are saved with one
+        UPDATE (or one bulk_update) and each plan's counters with one UPDATE.
+        Completions are also recorded in the owners' UserStats rows, and
+        every change in UserDailyRollup.
+
+        Statuses are re-read under a row lock, and deltas are computed from
+        the stored status, never the caller's copy. Tasks already in
+        ``new_status`` (or, if given, not in ``from_statuses``) are left
+        alone. Returns the tasks actually transitioned.
+        """
+        tasks = list(tasks)
+        if not tasks:
+            return tasks
+
+        stored = dict(
+            Task.objects.select_for_update().filter(pk__in=[task.pk for task in tasks])
+            .values_list('pk', 'status')
+        )
+        claimed = []
+        for task in tasks:
+            status = stored.get(task.pk)
+            if status is None:
+                continue
+            task.status = status
+            if status != new_status and (from_statuses is None or status in from_statuses):
+                claimed.append(task)
+        if len(claimed) == 1:
+            # Claim the row conditionally too, for databases without row locks:
+            # of two racing requests only one sees the old status
+            task = claimed[0]
+            if not Task.objects.filter(pk=task.pk, status=task.status).update(
+                status=new_status, updated_at=timezone.now(), **fields,
+            ):
+                task.refresh_from_db(fields=['status'])
+                return []
+        tasks = claimed
+        if not tasks:
+            return tasks
+
+        by_plan = {}
+        by_user = {}
+        rollup_deltas = {}
+        for task in tasks:
+            if task.plan_id not in by_plan:
+                plan = task.plan if Task.plan.is_cached(task) else task.plan_id
+                by_plan[task.plan_id] = [plan, Counter()]
+            task_deltas = TaskPlan.progress_deltas(task.status, task.estimated_minutes, -1)
+            task_deltas.update(TaskPlan.progress_deltas(new_status, task.estimated_minutes))
+            by_plan[task.plan_id][1].update(task_deltas)
+            by_user.setdefault(task.user_id, Counter()).update(task_deltas)
+            UserDailyRollup.task_deltas(rollup_deltas, task, -1)
+            UserDailyRollup.task_deltas(rollup_deltas, task, 1, status=new_status)
+            task.status = new_status
+            for field, value in fields.items():
+                setattr(task, field, value)
+
+        if len(tasks) > 1:
+            now = timezone.now()
+            for task in tasks:
+                task.updated_at = now
+            Task.objects.bulk_update(tasks, ['status', *fields, 'updated_at'])
+
+        for plan, deltas in by_plan.values():
+            TaskPlan.apply_progress_deltas(plan, deltas)
+        UserDailyRollup.apply_deltas(rollup_deltas)
+        for user_id, deltas in by_user.items():
+            if deltas['tasks_done'] or deltas['minutes_done']:
+                UserStatsService.apply_done_deltas(
+                    user_id, deltas['tasks_done'], deltas['minutes_done'],
+                )
+        return tasks
+
+    @staticmethod
+    def transition_task(task: Task, new_status: str, from_statuses=None, **fields) -> Task | None:
+        """Single-task form of ``transition_tasks``; None if the task was not moved."""
+        moved = TaskProgressService.transition_tasks([task], new_status, from_statuses, **fields)
+        return moved[0] if moved else None
+
     @staticmethod
     def mark_done(task: Task, user_response: str = '') -> Task:
         """Mark task as completed and check for achievements."""
@@ -519,10 +773,12 @@ class TaskProgressService:
             raise ValueError(
                 f'Cannot mark task as done from status {task.status}'
             )
-        task.status = 'DONE'
-        task.completed_at = timezone.now()
-        task.user_response = user_response
-        task.save()
+        if not TaskProgressService.transition_task(
+            task, 'DONE', ('PENDING', 'SENT'),
+            completed_at=timezone.now(),
+            user_response=user_response,
+        ):
+            raise ValueError(f'Cannot mark task as done from status {task.status}')
 
         # Record achievement progress
         try:
@@ -534,24 +790,29 @@ class TaskProgressService:
 
     @staticmethod
     def mark_skipped(task: Task, user_response: str = '') -> Task:
-        """Mark task as skipped. Triggers plan adjustment if 3+ skips."""
+        """Mark task as skipped. Queues a plan adjustment after 3+ skips."""
         if task.status not in ('PENDING', 'SENT'):
             raise ValueError(
                 f'Cannot skip task from status {task.status}'
             )
-        task.status = 'SKIPPED'
-        task.skipped_at = timezone.now()
-        task.user_response = user_response
-        task.save()
-
-        # Check for consecutive skips
-        recent_skips = task.plan.tasks.filter(
-            status='SKIPPED',
-        ).order_by('-skipped_at')[:3]
-        if recent_skips.count() >= 3:
-            TaskGenerationService.adjust_plan(
-                task.plan, reason='3+ consecutive skipped tasks',
-            )
+        if not TaskProgressService.transition_task(
+            task, 'SKIPPED', ('PENDING', 'SENT'),
+            skipped_at=timezone.now(),
+            user_response=user_response,
+        ):
+            raise ValueError(f'Cannot skip task from status {task.status}')
+
+        # Re-planning runs in the background; a pending adjustment absorbs
+        # this skip and waits out the debounce window again
+        plan = task.plan
+        if not PlanJobService.extend_adjustment(plan):
+            skips = plan.tasks.filter(status='SKIPPED')
+            if plan.last_adjusted_at:
+                skips = skips.filter(skipped_at__gt=plan.last_adjusted_at)
+            if skips.count() >= 3:
+                PlanJobService.enqueue_adjustment(
+                    plan, reason='3+ skipped tasks since last adjustment',
+                )
 
         return task
 
@@ -562,13 +823,15 @@ class TaskProgressService:
             raise ValueError(
                 f'Cannot reschedule task from status {task.status}'
             )
-        task.status = 'RESCHEDULED'
-        task.rescheduled_to = new_date
-        task.save()
+        if not TaskProgressService.transition_task(
+            task, 'RESCHEDULED', ('PENDING', 'SENT'), rescheduled_to=new_date,
+        ):
+            raise ValueError(f'Cannot reschedule task from status {task.status}')
 
         # Create a copy for the new date
         Task.objects.create(
             plan=task.plan,
+            user_id=task.user_id,
             title=task.title,
             description=task.description,
             category=task.category,
@@ -591,9 +854,7 @@ class TaskProgressService:
         today = timezone.now().date()
 
         # Get today's sent/pending tasks
-        active_plan = TaskPlan.objects.filter(
-            user=user, status='ACTIVE',
-        ).first()
+        active_plan = get_active_plan(user)
         if not active_plan:
             return "You don't have an active plan. Visit our website to get started!"
 
@@ -0,0 +1,96 @@
+"""Per-user streak and completion totals (UserStats)."""
+
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from . import analytics_cache, fragment_cache
+from .models import StreakRecord, Task, UserStats
+
+
+def longest_run(dates) -> int:
+    """Longest run of consecutive days in dates sorted oldest first."""
+    longest = run = 0
+    previous = None
+    for day in dates:
+        run = run + 1 if previous is not None and day == previous + timedelta(days=1) else 1
+        longest = max(longest, run)
+        previous = day
+    return longest
+
+
+class UserStatsService:
+
+    @staticmethod
+    def for_user(user) -> UserStats:
+        """The user's stats row, or an unsaved empty one if none exists yet."""
+        return UserStats.objects.filter(user=user).first() or UserStats(user=user)
+
+    @staticmethod
+    def current_streak(user) -> int:
+        return UserStatsService.for_user(user).streak_on(timezone.now().date())
+
+    @staticmethod
+    def apply_done_deltas(user_id: int, tasks_done: int, minutes_done: int):
+        """Record tasks entering (positive) or leaving (negative) DONE.
+
+        Must run inside the transaction that changes the tasks. Completions
+        also count today as an active day for the streak.
+        """
+        stats, _ = UserStats.objects.select_for_update().get_or_create(user_id=user_id)
+        stats.tasks_done = max(0, stats.tasks_done + tasks_done)
+        stats.minutes_done = max(0, stats.minutes_done + minutes_done)
+        if tasks_done > 0:
+            stats.record_active_day(timezone.now().date())
+        stats.save()
+
+    @staticmethod
+    def rollover(today=None) -> int:
+        """Zero streaks that missed yesterday. Returns rows changed."""
+        today = today or timezone.now().date()
+        return UserStats.objects.filter(
+            current_streak__gt=0, last_active_date__lt=today - timedelta(days=1),
+        ).update(current_streak=0)
+
+    @staticmethod
+    def rebuild(user) -> UserStats:
+        """Recompute a user's stats from StreakRecord and Task, then invalidate their caches."""
+        today = timezone.now().date()
+        dates = list(
+            StreakRecord.objects.filter(user=user, tasks_completed__gt=0)
+            .order_by('date').values_list('date', flat=True)
+        )
+        totals = Task.objects.filter(user=user, status='DONE').aggregate(
+            done=Count('id'), minutes=Sum('estimated_minutes', default=0),
+        )
+
+        current = 0
+        if dates and dates[-1] >= today - timedelta(days=1):
+            current = 1
+            for previous, day in zip(reversed(dates[:-1]), reversed(dates)):
+                if day - previous != timedelta(days=1):
+                    break
+                current += 1
+
+        stats, _ = UserStats.objects.update_or_create(user=user, defaults={
+            'current_streak': current,
+            'longest_streak': longest_run(dates),
+            'last_active_date': dates[-1] if dates else None,
+            'tasks_done': totals['done'],
+            'minutes_done': totals['minutes'],
+        })
+        # Summary totals and the dashboard streak were cached from the old row
+        analytics_cache.bump_version(user.pk)
+        fragment_cache.bump('achievements', user.pk)
+        return stats
+
+    @staticmethod
+    def rebuild_all() -> int:
+        """Rebuild stats for every user. Returns users processed."""
+        count = 0
+        for user in User.objects.only('pk').iterator():
+            UserStatsService.rebuild(user)
+            count += 1
+        return count
@@ -1,13 +1,19 @@
 from datetime import timedelta
+from io import StringIO
 
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
 from django.test import TestCase
 from django.utils import timezone
 
 from onboarding.models import BusinessProfile
 from tasks.achievement_service import AchievementService
-from tasks.models import Achievement, StreakRecord, Task, TaskPlan
+from tasks.analytics_service import AnalyticsService
+from tasks.models import Achievement, StreakRecord, Task, TaskPlan, UserStats
 from tasks.services import TaskProgressService
+from tasks.stats_service import UserStatsService
 
 
 def _create_test_user():
@@ -80,6 +86,7 @@ class StreakRecordTest(TestCase):
     def test_get_current_streak_with_today(self):
         today = timezone.now().date()
         StreakRecord.objects.create(user=self.user, date=today, tasks_completed=1)
+        UserStatsService.rebuild(self.user)
         self.assertEqual(AchievementService.get_current_streak(self.user), 1)
 
     def test_get_current_streak_consecutive(self):
@@ -88,6 +95,7 @@ class StreakRecordTest(TestCase):
             StreakRecord.objects.create(
                 user=self.user, date=today - timedelta(days=i), tasks_completed=1,
             )
+        UserStatsService.rebuild(self.user)
         self.assertEqual(AchievementService.get_current_streak(self.user), 3)
 
     def test_streak_breaks_on_gap(self):
@@ -95,8 +103,86 @@ class StreakRecordTest(TestCase):
         StreakRecord.objects.create(user=self.user, date=today, tasks_completed=1)
         # Skip yesterday
         StreakRecord.objects.create(user=self.user, date=today - timedelta(days=2), tasks_completed=1)
+        UserStatsService.rebuild(self.user)
         self.assertEqual(AchievementService.get_current_streak(self.user), 1)
 
+    def test_get_current_streak_is_one_query(self):
+        today = timezone.now().date()
+        for i in range(30):
+            StreakRecord.objects.create(
+                user=self.user, date=today - timedelta(days=i), tasks_completed=1,
+            )
+        UserStatsService.rebuild(self.user)
+        with self.assertNumQueries(1):
+            self.assertEqual(AchievementService.get_current_streak(self.user), 30)
+
+
+class UserStatsTest(TestCase):
+
+    def setUp(self):
+        self.user = _create_test_user()
+        self.profile = _create_test_profile(self.user)
+        self.plan = _create_test_plan(self.user, self.profile)
+        self.today = timezone.now().date()
+
+    def test_completion_updates_stats(self):
+        for task in self.plan.tasks.all()[:2]:
+            TaskProgressService.mark_done(task)
+
+        stats = UserStats.objects.get(user=self.user)
+        self.assertEqual(stats.tasks_done, 2)
+        self.assertEqual(stats.minutes_done, 60)
+        self.assertEqual((stats.current_streak, stats.last_active_date), (1, self.today))
+        self.assertEqual(AchievementService.get_current_streak(self.user), 1)
+
+    def test_streak_update_rule(self):
+        stats = UserStats(user=self.user, current_streak=4, longest_streak=4,
+                          last_active_date=self.today - timedelta(days=1))
+        stats.record_active_day(self.today)
+        self.assertEqual((stats.current_streak, stats.longest_streak), (5, 5))
+        stats.record_active_day(self.today)
+        self.assertEqual(stats.current_streak, 5)
+        stats.record_active_day(self.today + timedelta(days=3))
+        self.assertEqual((stats.current_streak, stats.longest_streak), (1, 5))
+
+    def test_rollover_and_rebuild(self):
+        for i in (1, 2, 5, 6, 7):
+            StreakRecord.objects.create(
+                user=self.user, date=self.today - timedelta(days=i), tasks_completed=1,
+            )
+        stats = UserStatsService.rebuild(self.user)
+        self.assertEqual((stats.current_streak, stats.longest_streak), (2, 3))
+        # Active yesterday but not yet today
+        self.assertEqual(AchievementService.get_current_streak(self.user), 0)
+
+        self.assertEqual(UserStatsService.rollover(), 0)
+        out = StringIO()
+        call_command('rollover_streaks', stdout=out)
+        self.assertIn('Streaks reset: 0', out.getvalue())
+        self.assertEqual(UserStatsService.rollover(self.today + timedelta(days=1)), 1)
+        stats.refresh_from_db()
+        self.assertEqual((stats.current_streak, stats.longest_streak), (0, 3))
+
+        call_command('rebuild_user_stats', stdout=StringIO())
+        stats.refresh_from_db()
+        self.assertEqual(stats.current_streak, 2)
+
+
+class RebuildUserStatsCacheTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = _create_test_user()
+        _create_test_profile(self.user)
+
+    def test_rebuild_invalidates_cached_summary(self):
+        UserStats.objects.create(user=self.user, tasks_done=7, minutes_done=420)
+        self.assertEqual(AnalyticsService.get_page_data(self.user)['summary']['tasks_completed'], 7)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('rebuild_user_stats', stdout=StringIO())
+        self.assertEqual(AnalyticsService.get_page_data(self.user)['summary']['tasks_completed'], 0)
+
 
 class AchievementBadgeTest(TestCase):
 
@@ -185,6 +271,45 @@ class AchievementBadgeTest(TestCase):
             Achievement.objects.filter(user=self.user, badge='COMEBACK').exists()
         )
 
+    def test_badges_checked_against_one_snapshot(self):
+        today = timezone.now().date()
+        for i in range(1, 8):
+            StreakRecord.objects.create(
+                user=self.user, date=today - timedelta(days=i), tasks_completed=1,
+            )
+        Achievement.objects.create(user=self.user, badge='STREAK_3', title='3-Day Streak')
+        plan = _create_test_plan(self.user, self.profile, num_tasks=2)
+        task = plan.tasks.first()
+        TaskProgressService.transition_task(task, 'DONE')
+
+        # Savepoint, streak upsert, 5 snapshot queries, active plan, bulk insert, release
+        with self.assertNumQueries(10):
+            badges = AchievementService.record_task_completion(task)
+
+        self.assertEqual(
+            sorted(b.badge for b in badges), ['FIRST_TASK', 'HALF_PLAN', 'STREAK_7'],
+        )
+        self.assertEqual(Achievement.objects.filter(user=self.user).count(), 4)
+
+        # A second pass over the same state awards nothing new
+        self.assertEqual(AchievementService.record_task_completion(task), [])
+
+    def test_duplicate_awards_are_rejected(self):
+        plan = _create_test_plan(self.user, self.profile)
+        other_plan = _create_test_plan(self.user, self.profile)
+        Achievement.objects.create(user=self.user, badge='HALF_PLAN', title='Half', plan=plan)
+        Achievement.objects.bulk_create([
+            Achievement(user=self.user, badge='HALF_PLAN', title='Half', plan=plan),
+            Achievement(user=self.user, badge='HALF_PLAN', title='Half', plan=other_plan),
+        ], ignore_conflicts=True)
+        self.assertEqual(
+            Achievement.objects.filter(user=self.user, badge='HALF_PLAN').count(), 2,
+        )
+
+        Achievement.objects.create(user=self.user, badge='COMEBACK', title='Back')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Achievement.objects.create(user=self.user, badge='COMEBACK', title='Back')
+
     def test_get_user_achievements(self):
         Achievement.objects.create(
             user=self.user, badge='FIRST_TASK', title='First Task',
@@ -213,3 +338,41 @@ class MarkDoneAchievementIntegrationTest(TestCase):
         # Even if something goes wrong in achievements, mark_done succeeds
         result = TaskProgressService.mark_done(task)
         self.assertEqual(result.status, 'DONE')
+
+
+class RecomputeAchievementsTest(TestCase):
+
+    def setUp(self):
+        self.user = _create_test_user()
+        self.profile = _create_test_profile(self.user)
+        self.plan = _create_test_plan(self.user, self.profile, num_tasks=4)
+        self.plan.tasks.filter(day_number__lte=3).update(status='DONE', category='SALES')
+        today = timezone.now().date()
+        for i in (0, 1, 2, 6):
+            StreakRecord.objects.create(
+                user=self.user, date=today - timedelta(days=i), tasks_completed=1,
+            )
+        Achievement.objects.create(user=self.user, badge='SPEED_DEMON', title='Speed Demon')
+
+    def test_dry_run_reports_diff_without_writing(self):
+        out = StringIO()
+        call_command('recompute_achievements', '--dry-run', stdout=out)
+        self.assertIn('+ user', out.getvalue())
+        self.assertIn('added: 5, no longer earned: 1', out.getvalue())
+        self.assertEqual(Achievement.objects.filter(user=self.user).count(), 1)
+
+    def test_awards_missing_badges(self):
+        call_command('recompute_achievements', '--chunk-size', '1', stdout=StringIO())
+        self.assertEqual(
+            sorted(Achievement.objects.filter(user=self.user).values_list('badge', flat=True)),
+            ['CATEGORY_MASTER', 'COMEBACK', 'FIRST_TASK', 'HALF_PLAN', 'SPEED_DEMON', 'STREAK_3'],
+        )
+        self.assertEqual(
+            Achievement.objects.get(badge='CATEGORY_MASTER').plan_id, self.plan.pk,
+        )
+
+        # Idempotent; --revoke drops the badge the rules no longer award
+        out = StringIO()
+        call_command('recompute_achievements', '--revoke', '--workers', '2', stdout=out)
+        self.assertIn('added: 0, no longer earned: 1', out.getvalue())
+        self.assertFalse(Achievement.objects.filter(badge='SPEED_DEMON').exists())
@@ -0,0 +1,260 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from onboarding.chat_service import ChatService
+from onboarding.models import BusinessProfile, WeeklyPulse
+from tasks.analytics_service import AnalyticsService
+from tasks.models import PulseTrend, Task, TaskPlan, UserDailyRollup
+from tasks.pulse_trend_service import PulseTrendService
+from tasks.services import TaskProgressService
+
+
+class AnalyticsTestCase(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('testuser', 'test@example.com', 'pass123')
+        profile = BusinessProfile.objects.create(
+            user=self.user, business_name='Test Bakery', business_type='Bakery', stage='IDEA',
+        )
+        today = timezone.now().date()
+        self.monday = today - timedelta(days=today.weekday())
+        self.plan = TaskPlan.objects.create(
+            user=self.user, business_profile=profile,
+            starts_on=self.monday - timedelta(weeks=3), ends_on=self.monday + timedelta(days=6),
+        )
+        self.other_plan = TaskPlan.objects.create(
+            user=self.user, business_profile=profile, status='COMPLETED',
+            starts_on=self.monday - timedelta(weeks=3), ends_on=self.monday + timedelta(days=6),
+        )
+        # This week: 2 of 3 done; two weeks ago: 1 of 1 done (on the other plan)
+        for offset, status, plan in [
+            (0, 'DONE', self.plan), (1, 'DONE', self.plan), (2, 'PENDING', self.plan),
+            (-13, 'DONE', self.other_plan),
+        ]:
+            Task.objects.create(
+                plan=plan, title='Task', description='', category='PLANNING',
+                day_number=1, due_date=self.monday + timedelta(days=offset), status=status,
+            )
+
+
+class CompletionTrendTest(AnalyticsTestCase):
+
+    def test_weekly_trend_is_one_query(self):
+        with self.assertNumQueries(1):
+            trend = AnalyticsService.get_weekly_completion_trend(self.user, weeks=4)
+
+        self.assertEqual([w['week_of'] for w in trend], [
+            (self.monday - timedelta(weeks=i)).isoformat() for i in (3, 2, 1, 0)
+        ])
+        self.assertEqual([(w['completed'], w['total']) for w in trend], [
+            (0, 0), (1, 1), (0, 0), (2, 3),
+        ])
+        self.assertEqual(trend[-1]['rate'], 67)
+
+    def test_plan_filter_and_daily_granularity(self):
+        trend = AnalyticsService.get_completion_trend(
+            self.user, self.monday, self.monday + timedelta(days=6),
+            plan=self.plan, granularity='day',
+        )
+        self.assertEqual(len(trend), 7)
+        self.assertEqual([d['completed'] for d in trend[:3]], [1, 1, 0])
+        self.assertEqual(trend[2]['total'], 1)
+
+        weekly = AnalyticsService.get_weekly_completion_trend(
+            self.user, weeks=4, plan=self.other_plan,
+        )
+        self.assertEqual(sum(w['total'] for w in weekly), 1)
+
+
+class DailyRollupTest(AnalyticsTestCase):
+
+    def _rollups(self):
+        return sorted(
+            UserDailyRollup.objects.filter(scheduled__gt=0).values_list(
+                'plan_id', 'date', 'category', 'scheduled', 'done', 'skipped', 'minutes_done',
+            )
+        )
+
+    def test_incremental_updates_match_rebuild(self):
+        pending = self.plan.tasks.get(status='PENDING')
+        TaskProgressService.mark_skipped(pending)
+        done = self.plan.tasks.filter(status='DONE').first()
+        TaskProgressService.transition_task(done, 'PENDING')
+        TaskProgressService.reschedule_task(done, self.monday + timedelta(days=5))
+        TaskProgressService.mark_done(self.plan.tasks.get(status='PENDING'))
+
+        incremental = self._rollups()
+        call_command('rebuild_daily_rollups', stdout=StringIO())
+        self.assertEqual(incremental, self._rollups())
+
+    def test_analytics_reads_rollups(self):
+        with self.assertNumQueries(1):
+            breakdown = AnalyticsService.get_category_breakdown(self.user)
+        self.assertEqual(breakdown[0]['category'], 'PLANNING')
+        self.assertEqual((breakdown[0]['done'], breakdown[0]['total']), (3, 4))
+
+        with self.assertNumQueries(1):
+            time_invested = AnalyticsService.get_time_invested(self.user, plan=self.plan)
+        self.assertEqual(time_invested['total_minutes'], 60)
+
+
+class PlanComparisonTest(AnalyticsTestCase):
+
+    def test_one_query_with_phase_metrics(self):
+        task = self.plan.tasks.get(status='PENDING')
+        TaskProgressService.mark_skipped(task)
+        now = timezone.now()
+        self.plan.tasks.filter(status='DONE').update(
+            sent_at=now - timedelta(days=2), completed_at=now,
+        )
+
+        with self.assertNumQueries(1):
+            comparison = AnalyticsService.get_plan_comparison(self.user)
+
+        current = next(row for row in comparison if row['status'] == 'ACTIVE')
+        self.assertEqual(current['completion_pct'], 67)
+        self.assertEqual(current['skip_rate'], 33)
+        self.assertEqual(current['hours_invested'], 1.0)
+        self.assertEqual(current['avg_days_to_complete'], 2.0)
+        previous = next(row for row in comparison if row['status'] == 'COMPLETED')
+        self.assertIsNone(previous['avg_days_to_complete'])
+
+    def test_phase_chain(self):
+        self.plan.previous_plan = self.other_plan
+        self.plan.save()
+        TaskPlan.objects.create(
+            user=self.user, business_profile=self.plan.business_profile, status='REPLACED',
+            starts_on=self.monday, ends_on=self.monday + timedelta(days=6),
+        )
+        next_phase = TaskPlan.objects.create(
+            user=self.user, business_profile=self.plan.business_profile, phase=3,
+            previous_plan=self.plan,
+            starts_on=self.monday, ends_on=self.monday + timedelta(days=6),
+        )
+
+        with self.assertNumQueries(1):
+            chain = AnalyticsService.get_plan_comparison(self.user, plan=next_phase)
+        self.assertEqual(len(chain), 3)
+        self.assertEqual(
+            set(TaskPlan.objects.filter(pk__in=AnalyticsService.phase_chain(self.plan))),
+            {self.plan, self.other_plan},
+        )
+        self.assertEqual([row['phase'] for row in chain], [1, 1, 3])
+        self.assertEqual(len(AnalyticsService.get_plan_comparison(self.user)), 4)
+
+
+class AnalyticsCacheTest(AnalyticsTestCase):
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def test_warm_hit_makes_no_queries(self):
+        cold = AnalyticsService.get_page_data(self.user)
+        self.assertEqual(cold['summary']['total_tasks'], 4)
+
+        with self.assertNumQueries(0):
+            warm = AnalyticsService.get_page_data(self.user)
+        self.assertEqual(warm, cold)
+
+    def test_task_status_change_invalidates(self):
+        before = AnalyticsService.get_page_data(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            TaskProgressService.mark_done(self.plan.tasks.get(status='PENDING'))
+
+        after = AnalyticsService.get_page_data(self.user)
+        self.assertEqual(
+            after['summary']['tasks_completed'], before['summary']['tasks_completed'] + 1,
+        )
+
+    def test_rollup_rebuild_invalidates(self):
+        fresh = AnalyticsService.get_chart_json(self.user, 'categories')
+        cache.clear()
+        UserDailyRollup.objects.filter(user=self.user).update(done=0, minutes_done=0)
+        self.assertNotEqual(AnalyticsService.get_chart_json(self.user, 'categories'), fresh)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('rebuild_daily_rollups', stdout=StringIO())
+        self.assertEqual(AnalyticsService.get_chart_json(self.user, 'categories'), fresh)
+
+    def test_pulse_save_invalidates(self):
+        self.user.profile.is_onboarded = True
+        self.user.profile.save()
+        self.client.force_login(self.user)
+        AnalyticsService.get_chart_json(self.user, 'pulse')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('accounts:pulse'), {
+                'revenue_this_week': '250', 'new_customers': 3,
+                'energy_level': 4, 'hours_worked': 10,
+            })
+
+        self.assertEqual(WeeklyPulse.objects.filter(user=self.user).count(), 1)
+        self.assertIn('250', AnalyticsService.get_chart_json(self.user, 'pulse'))
+
+
+class PulseTrendTest(AnalyticsTestCase):
+
+    def setUp(self):
+        super().setUp()
+        profile = self.user.business_profile
+        # 14 weekly pulses, revenue rising by 100 a week; week 3 was skipped
+        for weeks_ago in range(14):
+            if weeks_ago == 3:
+                continue
+            WeeklyPulse.objects.create(
+                user=self.user, business_profile=profile,
+                week_of=self.monday - timedelta(weeks=weeks_ago),
+                revenue_this_week=1500 - weeks_ago * 100, new_customers=2, energy_level=3,
+            )
+
+    def test_refresh_stores_latest_weeks(self):
+        self.assertEqual(PulseTrendService.refresh(), 1)
+        trend = PulseTrend.objects.get(user=self.user)
+
+        self.assertEqual(len(trend.weeks), 12)
+        self.assertEqual(trend.weeks[-1], self.monday.isoformat())
+        self.assertEqual(trend.series['revenue'][-1], 1500)
+        self.assertIsNone(trend.series['revenue'][-4])
+        self.assertEqual(trend.rolling['revenue'][-1], (1500 + 1400 + 1300) / 3)
+        self.assertAlmostEqual(trend.revenue_growth, 7.1)
+        self.assertEqual(trend.customers_growth, 0)
+        self.assertEqual(trend.forecast['revenue']['linear'], [1600, 1700, 1800, 1900])
+        self.assertEqual(trend.forecast['customers']['smoothed'], 2)
+
+    def test_chart_reads_stored_trend(self):
+        PulseTrendService.refresh()
+        with self.assertNumQueries(1):
+            pulse = AnalyticsService.get_pulse_trends(self.user)
+
+        self.assertEqual(pulse['revenue'][-1]['value'], 1500)
+        self.assertEqual(len(pulse['revenue']), 11)
+        self.assertEqual(len(pulse['revenue_avg']), 11)
+        self.assertEqual(pulse['growth']['revenue'], 7.1)
+        self.assertEqual(len(pulse['forecast']['revenue']['linear']), 4)
+
+    def test_stale_trends_are_removed(self):
+        PulseTrendService.refresh()
+        WeeklyPulse.objects.filter(user=self.user).delete()
+        self.assertEqual(PulseTrendService.refresh(), 0)
+        self.assertFalse(PulseTrend.objects.exists())
+        self.assertEqual(AnalyticsService.get_pulse_trends(self.user)['revenue'], [])
+
+    def test_chat_context_includes_trend(self):
+        PulseTrendService.refresh()
+        prompt = ChatService._build_system_prompt(self.user)
+        self.assertIn(
+            'Trend: revenue +7% week over week, 4-week avg $1400, next week ~$', prompt,
+        )
+
+    def test_command(self):
+        out = StringIO()
+        call_command('refresh_pulse_trends', stdout=out)
+        self.assertIn('Pulse trends: 1 users', out.getvalue())
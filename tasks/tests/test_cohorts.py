@@ -0,0 +1,144 @@
+import io
+from datetime import timedelta
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+
+from onboarding.models import BusinessProfile, WeeklyPulse
+from tasks.cohort_service import CohortData, CohortService, stream_columns
+from tasks.models import CohortReport, StreakRecord, Task, TaskPlan
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+
+class CohortServiceTest(TestCase):
+
+    def setUp(self):
+        self.today = timezone.now().date()
+        self.bakers = [self._user(f'baker{i}', 'Bakery ') for i in range(2)]
+        self.coach = self._user('coach', 'coaching', stage='EARLY')
+
+        # baker0: 2 done, 1 skipped; baker1: 1 pending; coach: 1 skipped
+        for user, status, category in [
+            (self.bakers[0], 'DONE', 'LEGAL'), (self.bakers[0], 'DONE', 'MARKETING'),
+            (self.bakers[0], 'SKIPPED', 'MARKETING'), (self.bakers[1], 'PENDING', 'LEGAL'),
+            (self.coach, 'SKIPPED', 'MARKETING'),
+        ]:
+            Task.objects.create(
+                plan=user.task_plans.get(), title='Task', description='', category=category,
+                day_number=1, due_date=self.today, status=status,
+            )
+
+        # baker0 active in signup week and the week after; baker1 only in the signup week
+        joined = self.bakers[0].date_joined.date()
+        for user, day in [
+            (self.bakers[0], joined), (self.bakers[0], joined + timedelta(days=1)),
+            (self.bakers[0], joined + timedelta(days=7)), (self.bakers[1], joined),
+        ]:
+            StreakRecord.objects.create(user=user, date=day, tasks_completed=1)
+
+        WeeklyPulse.objects.create(
+            user=self.coach, business_profile=self.coach.business_profile,
+            week_of=self.today, energy_level=5, hours_worked=20,
+        )
+
+    def _user(self, username, business_type, stage='IDEA'):
+        user = User.objects.create_user(username)
+        profile = BusinessProfile.objects.create(
+            user=user, business_name=username, business_type=business_type, stage=stage,
+        )
+        TaskPlan.objects.create(
+            user=user, business_profile=profile,
+            starts_on=self.today, ends_on=self.today + timedelta(days=29),
+        )
+        return user
+
+    def test_stream_columns_reads_in_chunks(self):
+        columns = stream_columns(Task.objects.all(), {'user_id': 'int64'}, chunk_size=2)
+        self.assertEqual(
+            sorted(columns['user_id'].tolist()),
+            sorted(Task.objects.values_list('user_id', flat=True)),
+        )
+
+    def test_segment_table(self):
+        table = CohortService.segment_table(CohortData(chunk_size=2))
+        rows = {(row[0], row[1]): dict(zip(table['columns'], row)) for row in table['rows']}
+
+        bakery = rows[('bakery', 'IDEA')]
+        self.assertEqual((bakery['users'], bakery['tasks'], bakery['done']), (2, 4, 2))
+        self.assertEqual((bakery['completion_rate'], bakery['skip_rate']), (50.0, 25.0))
+        coaching = rows[('coaching', 'EARLY')]
+        self.assertEqual((coaching['avg_energy'], coaching['avg_hours']), (5.0, 20.0))
+
+    def test_retention_table(self):
+        later = self.bakers[0].date_joined.date() + timedelta(weeks=3)
+        table = CohortService.retention_table(CohortData(), weeks=4, today=later)
+
+        [row] = table['rows']
+        row = dict(zip(table['columns'], row))
+        self.assertEqual(row['users'], 3)
+        self.assertEqual(row['week_0'], 66.7)
+        self.assertEqual(row['week_1'], 33.3)
+        self.assertEqual(row['week_2'], 0.0)
+
+    def test_category_table_most_skipped_first(self):
+        table = CohortService.category_table(CohortData())
+        self.assertEqual(table['rows'][0], ['MARKETING', 3, 1, 2, 66.7])
+        self.assertEqual(table['rows'][1], ['LEGAL', 2, 1, 0, 0.0])
+
+    def test_report_is_stored(self):
+        CohortService.get_report()
+        with self.assertNumQueries(1):
+            report = CohortService.get_report()
+        self.assertEqual((report['users'], report['tasks']), (3, 5))
+
+        CohortService.refresh()
+        self.assertEqual(CohortReport.objects.get().report['users'], 3)
+
+    def test_csv_export(self):
+        table = CohortService.get_report()['tables']['categories']
+        lines = CohortService.export_csv(table).splitlines()
+        self.assertEqual(lines[0], 'category,tasks,done,skipped,skip_rate')
+        self.assertEqual(lines[1], 'MARKETING,3,1,2,66.7')
+
+    @skipUnless(pq, 'pyarrow not installed')
+    def test_parquet_export(self):
+        table = CohortService.get_report()['tables']['categories']
+        parquet = pq.read_table(io.BytesIO(CohortService.export_parquet(table)))
+        self.assertEqual(parquet.column('category').to_pylist(), ['MARKETING', 'LEGAL'])
+
+
+class CohortViewTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('staff', password='pass123', is_staff=True)
+
+    def test_staff_only(self):
+        self.client.force_login(User.objects.create_user('member'))
+        response = self.client.get('/tasks/cohorts/')
+        self.assertEqual(response.status_code, 302)
+
+    def test_report_and_csv_export(self):
+        self.client.force_login(self.user)
+        response = self.client.get('/tasks/cohorts/')
+        self.assertContains(response, 'Cohort Analytics')
+
+        response = self.client.get('/tasks/cohorts/segments.csv')
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertTrue(response.content.startswith(b'business_type,stage,users'))
+
+        response = self.client.get('/tasks/cohorts/unknown.csv')
+        self.assertEqual(response.status_code, 404)
+
+    def test_parquet_link_needs_pyarrow(self):
+        self.client.force_login(self.user)
+        with patch.object(CohortService, 'parquet_available', return_value=False):
+            self.assertNotContains(self.client.get('/tasks/cohorts/'), 'segments.parquet')
+        with patch.object(CohortService, 'parquet_available', return_value=True):
+            self.assertContains(self.client.get('/tasks/cohorts/'), 'segments.parquet')
@@ -0,0 +1,147 @@
+import csv
+import io
+import json
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from onboarding.document_service import DocumentService
+from onboarding.models import BusinessProfile, Conversation, GeneratedDocument
+from tasks.export_service import ExportService
+from tasks.models import ResourceTemplate, Task, TaskPlan, TaskResource
+from tasks.services import TaskProgressService
+
+
+class ExportTestCase(TestCase):
+
+    def setUp(self):
+        self.today = timezone.now().date()
+        self.user = self._user('alice')
+        self.other = self._user('bob')
+
+    def _user(self, username):
+        user = User.objects.create_user(username)
+        profile = BusinessProfile.objects.create(
+            user=user, business_name='Shop', business_type='Bakery', stage='IDEA',
+        )
+        plan = TaskPlan.objects.create(
+            user=user, business_profile=profile,
+            starts_on=self.today, ends_on=self.today + timedelta(days=29),
+        )
+        for day in (1, 2):
+            Task.objects.create(
+                plan=plan, title=f'{username} task {day}', description='', category='PLANNING',
+                day_number=day, due_date=self.today + timedelta(days=day - 1),
+            )
+        Conversation.objects.create(user=user, role='user', content='Hi, "coach"', metadata={'a': 1})
+        return user
+
+
+class ExportServiceTest(ExportTestCase):
+
+    def test_user_scope(self):
+        rows = list(ExportService.rows('tasks', user=self.user))
+        self.assertEqual([row['title'] for row in rows], ['alice task 1', 'alice task 2'])
+        self.assertEqual(len(list(ExportService.rows('tasks'))), 4)
+
+    def test_since_watermark_picks_up_changes(self):
+        watermark = timezone.now()
+        self.assertEqual(list(ExportService.rows('tasks', since=watermark)), [])
+
+        task = Task.objects.filter(user=self.user).first()
+        TaskProgressService.mark_done(task)
+
+        [row] = ExportService.rows('tasks', since=watermark)
+        self.assertEqual((row['id'], row['status']), (task.pk, 'DONE'))
+        [plan] = ExportService.rows('plans', since=watermark)
+        self.assertEqual(plan['tasks_done'], 1)
+
+    def test_since_picks_up_favorite_toggles(self):
+        document = GeneratedDocument.objects.create(
+            user=self.user, business_profile=self.user.business_profile,
+            doc_type='ELEVATOR_PITCH', title='Pitch', content='We bake.',
+        )
+        watermark = timezone.now()
+        self.assertEqual(list(ExportService.rows('documents', since=watermark)), [])
+
+        DocumentService.toggle_favorite(document)
+        [row] = ExportService.rows('documents', since=watermark)
+        self.assertEqual((row['id'], row['is_favorite']), (document.pk, True))
+
+    def test_resources_export_template_content(self):
+        template = ResourceTemplate.objects.create(
+            title='Checklist', resource_type='CHECKLIST', content='- Step one',
+        )
+        task = Task.objects.filter(user=self.user).first()
+        TaskResource.objects.create(
+            task=task, template=template, title='Checklist', resource_type='CHECKLIST',
+        )
+        TaskResource.objects.create(
+            task=task, title='Own copy', resource_type='GUIDE', content='My notes',
+        )
+        rows = list(ExportService.rows('resources', user=self.user))
+        self.assertEqual({row['title']: row['content'] for row in rows}, {
+            'Checklist': '- Step one', 'Own copy': 'My notes',
+        })
+
+        watermark = timezone.now()
+        template.content = '- Step one\n- Step two'
+        template.save()
+        [row] = ExportService.rows('resources', since=watermark)
+        self.assertEqual(row['content'], '- Step one\n- Step two')
+
+    def test_ndjson_and_csv_encoding(self):
+        [line] = ExportService.lines('conversations', 'ndjson', user=self.user)
+        self.assertEqual(json.loads(line)['metadata'], {'a': 1})
+
+        reader = csv.DictReader(io.StringIO(''.join(
+            ExportService.lines('conversations', 'csv', user=self.user),
+        )))
+        [row] = list(reader)
+        self.assertEqual(row['content'], 'Hi, "coach"')
+        self.assertEqual(json.loads(row['metadata']), {'a': 1})
+
+
+class ExportDataCommandTest(ExportTestCase):
+
+    def test_stdout_single_dataset(self):
+        out, err = io.StringIO(), io.StringIO()
+        call_command('export_data', 'tasks', user='bob', stdout=out, stderr=err)
+        lines = out.getvalue().splitlines()
+        self.assertEqual([json.loads(line)['title'] for line in lines], ['bob task 1', 'bob task 2'])
+        self.assertIn('Next --since:', err.getvalue())
+
+    def test_output_dir_all_datasets(self):
+        with tempfile.TemporaryDirectory() as directory:
+            call_command(
+                'export_data', format='csv', output_dir=directory,
+                stdout=io.StringIO(), stderr=io.StringIO(),
+            )
+            files = {path.name for path in Path(directory).iterdir()}
+            self.assertIn('tasks.csv', files)
+            self.assertIn('message_logs.csv', files)
+            with open(Path(directory) / 'tasks.csv', newline='') as handle:
+                self.assertEqual(len(list(csv.DictReader(handle))), 4)
+
+    def test_several_datasets_need_output_dir(self):
+        with self.assertRaises(CommandError):
+            call_command('export_data', 'tasks', 'plans', stdout=io.StringIO())
+
+
+class DataExportViewTest(ExportTestCase):
+
+    def test_streams_only_own_rows(self):
+        self.client.force_login(self.user)
+        response = self.client.get('/profile/export/tasks.ndjson')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual({json.loads(line)['user_id'] for line in lines}, {self.user.pk})
+
+    def test_unknown_dataset_404(self):
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get('/profile/export/users.csv').status_code, 404)
@@ -154,3 +154,89 @@ class TaskResourceTest(TestCase):
         resources = list(self.task.resources.all())
         self.assertEqual(resources[0], r1)
         self.assertEqual(resources[1], r2)
+
+    def test_display_content_reads_template(self):
+        tmpl = ResourceTemplate.objects.create(
+            title='Standard Checklist', resource_type='CHECKLIST',
+            content='- [ ] Step 1', status='REVIEWED',
+        )
+        resource = TaskResource.objects.create(
+            task=self.task, template=tmpl,
+            title=tmpl.title, resource_type=tmpl.resource_type,
+        )
+        self.assertEqual(resource.content, '')
+        self.assertEqual(resource.display_content, '- [ ] Step 1')
+
+        tmpl.content = '- [ ] Step 1\n- [ ] Step 2'
+        tmpl.save()
+        self.assertEqual(resource.display_content, tmpl.content)
+
+    def test_deleting_template_materializes_usages(self):
+        tmpl = ResourceTemplate.objects.create(
+            title='Standard Checklist', resource_type='CHECKLIST',
+            content='- [ ] Step 1', status='REVIEWED',
+        )
+        resource = TaskResource.objects.create(
+            task=self.task, template=tmpl,
+            title=tmpl.title, resource_type=tmpl.resource_type,
+        )
+        tmpl.delete()
+        resource.refresh_from_db()
+        self.assertIsNone(resource.template)
+        self.assertEqual(resource.display_content, '- [ ] Step 1')
+
+
+class TaskQueryIndexTest(TestCase):
+    """EXPLAIN the hot Task queries and check they use the composite indexes."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('testuser', 'test@example.com', 'pass123')
+        profile = BusinessProfile.objects.create(
+            user=self.user, business_name='Test', business_type='Test', stage='IDEA',
+        )
+        self.today = timezone.now().date()
+        self.plan = TaskPlan.objects.create(
+            user=self.user, business_profile=profile,
+            starts_on=self.today, ends_on=self.today + timedelta(days=30),
+        )
+        for i in range(5):
+            Task.objects.create(
+                plan=self.plan, title=f'T{i}', description='D', category='PLANNING',
+                day_number=i + 1, due_date=self.today + timedelta(days=i),
+            )
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan, plan)
+
+    def test_user_is_denormalized_from_plan(self):
+        self.assertFalse(Task.objects.exclude(user=self.user).exists())
+
+    def test_daily_tasks_use_plan_due_status_index(self):
+        self.assertUsesIndex(
+            self.plan.tasks.filter(due_date=self.today, status__in=['SENT', 'PENDING']),
+            'task_plan_due_status_idx',
+        )
+
+    def test_user_done_count_uses_user_status_index(self):
+        # COUNT() drops the default ordering
+        self.assertUsesIndex(
+            Task.objects.filter(user=self.user, status='DONE').order_by(),
+            'task_user_status_done_idx',
+        )
+
+    def test_recent_completions_use_user_status_index(self):
+        self.assertUsesIndex(
+            Task.objects.filter(user=self.user, status='DONE').order_by('-completed_at'),
+            'task_user_status_done_idx',
+        )
+
+    def test_user_date_range_uses_user_due_index(self):
+        self.assertUsesIndex(
+            Task.objects.filter(
+                user=self.user,
+                due_date__gte=self.today,
+                due_date__lte=self.today + timedelta(days=6),
+            ),
+            'task_user_due_idx',
+        )
@@ -0,0 +1,183 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from ai.claude_client import ClaudeClientError
+from onboarding.models import BusinessProfile
+from tasks.job_service import PlanJobService
+from tasks.models import PlanCacheEntry, PlanGenerationJob, TaskPlan
+from tasks.plan_cache_service import PlanCacheService
+from tasks.services import TaskGenerationService
+
+PLAN_TASKS = [
+    {'day_number': 1, 'sort_order': 0, 'title': 'Register Sunrise Cafe',
+     'description': 'File the paperwork in Austin.', 'category': 'LEGAL'},
+    {'day_number': 2, 'sort_order': 0, 'title': 'Open a bank account',
+     'description': 'Separate business money.', 'category': 'FINANCE'},
+]
+
+PROFILE_FIELDS = {
+    'business_type': 'Cafe', 'stage': 'IDEA', 'budget_range': 'LOW',
+    'business_model': 'SERVICE', 'hours_per_day': 3,
+    'goals': ['Validate my business idea', 'Get my first customers'],
+    'owner_skills': ['design', 'sales'],
+}
+
+
+class PlanCacheTest(TestCase):
+
+    def _profile(self, username, **fields):
+        user = User.objects.create_user(username, f'{username}@example.com', 'pass123')
+        return BusinessProfile.objects.create(user=user, **{**PROFILE_FIELDS, **fields})
+
+    def setUp(self):
+        self.first = self._profile('first', business_name='Sunrise Cafe', location='Austin')
+
+    def test_fingerprint_ignores_free_text(self):
+        twin = self._profile(
+            'twin', business_name='Moon Cafe', location='Denver', description='Tea bar',
+            business_type=' cafe ', goals=['Get my first customers', 'Validate my business idea',
+                                          'Win a local award'],
+        )
+        fingerprint = PlanCacheService.fingerprint(PlanCacheService.features(self.first))
+        self.assertEqual(fingerprint, PlanCacheService.fingerprint(PlanCacheService.features(twin)))
+
+        other = self._profile('other', business_name='Sunrise Cafe', hours_per_day=8)
+        self.assertNotEqual(fingerprint, PlanCacheService.fingerprint(PlanCacheService.features(other)))
+
+    @patch('tasks.services.call_claude_json')
+    def test_exact_hit_skips_claude(self, mock_claude):
+        mock_claude.return_value = {'tasks': PLAN_TASKS}
+        TaskGenerationService.generate_plan(self.first)
+        entry = PlanCacheEntry.objects.get()
+        self.assertEqual(entry.tasks_data[0]['title'], 'Register [Business Name]')
+
+        twin = self._profile('twin', business_name='Moon Cafe', location='Denver')
+        job = PlanJobService.enqueue_generation(twin.user, 'ONBOARDING')
+        with patch('onboarding.services.call_claude_json', return_value={'summary': 'Good'}):
+            PlanJobService.run_due_generations()
+
+        self.assertEqual(mock_claude.call_count, 1)
+        plan = TaskPlan.objects.get(user=twin.user)
+        self.assertEqual(plan.ai_generation_metadata['source'], 'plan_cache')
+        self.assertEqual(plan.tasks.get(day_number=1).title, 'Register Moon Cafe')
+        self.assertEqual(plan.tasks.get(day_number=1).description, 'File the paperwork in Denver.')
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'DONE')
+        self.assertTrue(PlanGenerationJob.objects.filter(kind='PERSONALIZE', plan=plan).exists())
+        entry.refresh_from_db()
+        self.assertEqual(entry.reuse_count, 1)
+
+    def test_nearest_neighbor_respects_threshold(self):
+        PlanCacheService.store(self.first, PLAN_TASKS)
+        close = self._profile('close', business_name='Other', hours_per_day=4)
+        far = self._profile(
+            'far', business_name='Far', budget_range='HIGH', business_model='PRODUCT',
+            owner_skills=['finance'], goals=[],
+        )
+
+        entry, score = PlanCacheService.lookup(close)
+        self.assertLess(score, 1)
+        self.assertGreater(score, 0.9)
+        self.assertIsNone(PlanCacheService.lookup(far))
+        self.assertIsNotNone(PlanCacheService.lookup(far, min_similarity=0))
+        self.assertIsNone(PlanCacheService.lookup(close, min_similarity=1))
+
+    def test_nearest_match_is_offered_not_installed(self):
+        entry = PlanCacheService.store(self.first, PLAN_TASKS)
+        close = self._profile('close', business_name='Night Owl', location='Denver', hours_per_day=4)
+        job = PlanJobService.enqueue_generation(close.user, 'ONBOARDING')
+        self.assertIsNone(PlanCacheService.checkout(close, min_similarity=1))
+
+        self.client.force_login(close.user)
+        response = self.client.get(reverse('tasks:generation_progress', args=[job.pk]))
+        self.assertContains(response, 'Use this plan')
+
+        with patch('onboarding.services.call_claude_json') as assess, \
+                patch('tasks.services.call_claude_json') as generate:
+            self.client.post(reverse('tasks:generation_use_cached', args=[job.pk]))
+        # The request only records the choice; the worker builds the plan
+        assess.assert_not_called()
+        generate.assert_not_called()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.cached_entry), ('PENDING', entry))
+        self.assertFalse(TaskPlan.objects.filter(user=close.user).exists())
+        response = self.client.get(reverse('tasks:generation_progress', args=[job.pk]))
+        self.assertNotContains(response, 'Use this plan')
+
+        with patch('onboarding.services.call_claude_json', return_value={'summary': 'Good'}), \
+                self.captureOnCommitCallbacks(execute=True):
+            PlanJobService.run_due_generations()
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'DONE')
+        plan = TaskPlan.objects.get(user=close.user)
+        self.assertEqual(plan.ai_generation_metadata['source'], 'plan_cache')
+        self.assertEqual(plan.tasks.get(day_number=1).title, 'Register Night Owl')
+
+        # A running job is no longer offered the plan
+        other = self._profile('other', business_name='Dawn', hours_per_day=4)
+        running = PlanJobService.enqueue_generation(other.user, 'ONBOARDING')
+        PlanGenerationJob.objects.filter(pk=running.pk).update(status='RUNNING')
+        self.client.force_login(other.user)
+        response = self.client.get(reverse('tasks:generation_progress', args=[running.pk]))
+        self.assertNotContains(response, 'Use this plan')
+
+    @patch('tasks.services.call_claude_json')
+    def test_free_text_plan_is_not_shared(self, mock_claude):
+        mock_claude.return_value = {'tasks': PLAN_TASKS}
+        chatty = self._profile(
+            'chatty', business_name='Secret Cafe', location='Austin',
+            description='My landlord is evicting me', niche='Cat cafe',
+        )
+        entry = PlanCacheService.store(chatty, PLAN_TASKS)
+        self.assertEqual(entry.tasks_data, [])
+        self.assertIsNone(PlanCacheService.lookup(chatty))
+
+        self.assertEqual(PlanCacheService.fill_pending(), 1)
+        user_prompt = mock_claude.call_args.args[1]
+        for private in ('Secret Cafe', 'Austin', 'landlord', 'Cat cafe'):
+            self.assertNotIn(private, user_prompt)
+        entry.refresh_from_db()
+        self.assertEqual(entry.tasks_data, PLAN_TASKS)
+        self.assertEqual(PlanCacheService.lookup(chatty)[0], entry)
+        self.assertEqual(PlanCacheService.fill_pending(), 0)
+
+    def test_store_keeps_existing_entry(self):
+        entry = PlanCacheService.store(self.first, PLAN_TASKS)
+        created_at = timezone.now() - timedelta(days=3)
+        PlanCacheEntry.objects.filter(pk=entry.pk).update(reuse_count=4, created_at=created_at)
+
+        again = PlanCacheService.store(self.first, [{**PLAN_TASKS[0], 'title': 'Other'}])
+        self.assertEqual(again.pk, entry.pk)
+        self.assertEqual(again.reuse_count, 4)
+        self.assertEqual(again.created_at, created_at)
+        self.assertEqual(again.tasks_data[0]['title'], 'Register [Business Name]')
+
+    @override_settings(PLAN_CACHE_MAX_REUSES=1, PLAN_CACHE_TTL_DAYS=30)
+    def test_ttl_and_reuse_cap(self):
+        entry = PlanCacheService.store(self.first, PLAN_TASKS)
+        self.assertIsNotNone(PlanCacheService.checkout(self.first))
+        self.assertIsNone(PlanCacheService.checkout(self.first))
+
+        entry.reuse_count = 0
+        entry.created_at = timezone.now() - timedelta(days=31)
+        entry.save()
+        self.assertIsNone(PlanCacheService.checkout(self.first))
+        self.assertEqual(PlanCacheService.purge_expired(), 1)
+
+    @patch('tasks.services.call_claude_json', side_effect=ClaudeClientError('down'))
+    def test_claude_failure_uses_nearest_cached_plan(self, mock_claude):
+        PlanCacheService.store(self.first, PLAN_TASKS)
+        close = self._profile('close', business_name='Night Owl', hours_per_day=4)
+        plan = TaskGenerationService.generate_plan(close)
+        self.assertEqual(plan.ai_generation_metadata['source'], 'plan_cache')
+        self.assertEqual(plan.tasks.get(day_number=1).title, 'Register Night Owl')
+
+        # Below the similarity threshold the generic template is used
+        far = self._profile('far', business_name='Far', budget_range='HIGH')
+        plan = TaskGenerationService.generate_plan(far)
+        self.assertEqual(plan.ai_generation_metadata['source'], 'claude')
@@ -1,12 +1,19 @@
 from datetime import timedelta
+from io import StringIO
 from unittest.mock import patch
 
 from django.contrib.auth.models import User
-from django.test import TestCase
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
 from django.utils import timezone
 
 from onboarding.models import BusinessProfile
-from tasks.models import ResourceTemplate, Task, TaskPlan, TaskResource
+from tasks.job_service import PlanJobService
+from tasks.models import (
+    PlanAdjustmentJob, PlanGenerationJob, ResourceTemplate, Task, TaskPlan, TaskResource,
+    UserDailyRollup, UserStats,
+)
 from tasks.services import TaskGenerationService, TaskProgressService
 
 
@@ -119,7 +126,8 @@ class TaskGenerationServiceTest(TestCase):
         resource = task.resources.first()
         # Should have used the reviewed template instead of creating new
         self.assertEqual(resource.template, reviewed)
-        self.assertEqual(resource.content, reviewed.content)
+        self.assertEqual(resource.content, '')
+        self.assertEqual(resource.display_content, reviewed.content)
         reviewed.refresh_from_db()
         self.assertEqual(reviewed.times_used, 4)
         # Should NOT have created a new ResourceTemplate
@@ -223,3 +231,292 @@ class TaskProgressServiceTest(TestCase):
         self.assertEqual(result.status, 'RESCHEDULED')
         # Should have created a copy
         self.assertEqual(self.plan.tasks.count(), 4)
+
+    def test_transitions_maintain_plan_counters(self):
+        tasks = list(self.plan.tasks.all())
+        TaskProgressService.mark_done(tasks[0])
+        TaskProgressService.mark_skipped(tasks[1])
+        TaskProgressService.reschedule_task(
+            tasks[2], timezone.now().date() + timedelta(days=5),
+        )
+
+        self.plan.refresh_from_db()
+        self.assertEqual(self.plan.tasks_total, 4)
+        self.assertEqual(self.plan.tasks_done, 1)
+        self.assertEqual(self.plan.tasks_skipped, 1)
+        self.assertEqual(self.plan.tasks_rescheduled, 1)
+        self.assertEqual(self.plan.tasks_pending, 1)
+        self.assertEqual(self.plan.minutes_done, tasks[0].estimated_minutes)
+        self.assertEqual(self.plan.completion_pct, 25)
+
+    def test_stale_double_done_counts_once(self):
+        task = self.plan.tasks.first()
+        stale_copy = Task.objects.get(pk=task.pk)
+        TaskProgressService.mark_done(task)
+        with self.assertRaises(ValueError):
+            TaskProgressService.mark_done(stale_copy)
+
+        self.plan.refresh_from_db()
+        self.assertEqual(self.plan.tasks_done, 1)
+        self.assertEqual(self.plan.minutes_done, task.estimated_minutes)
+        self.assertEqual(UserStats.objects.get(user=self.user).tasks_done, 1)
+
+    def test_transition_tasks_bulk(self):
+        tasks = list(self.plan.tasks.all())
+        TaskProgressService.transition_tasks(tasks, 'SKIPPED')
+        self.assertEqual(self.plan.tasks.filter(status='SKIPPED').count(), 3)
+        self.plan.refresh_from_db()
+        self.assertEqual(self.plan.tasks_skipped, 3)
+        self.assertEqual(self.plan.tasks_pending, 0)
+
+    @patch('tasks.services.call_claude_json')
+    def test_adjust_plan_applies_validated_diff(self, mock_claude):
+        t1, t2, t3 = self.plan.tasks.order_by('day_number')
+        TaskProgressService.mark_done(t3)
+        mock_claude.return_value = {
+            'remove_task_ids': [t1.pk, t3.pk, 99999],
+            'reschedule': [
+                {'task_id': t2.pk, 'new_day_number': 10},
+                {'task_id': t1.pk, 'new_day_number': 12},
+            ],
+            'new_tasks': [
+                {'day_number': 5, 'title': 'Easier step', 'category': 'BOGUS'},
+            ],
+            'reasoning': 'Simplify',
+        }
+
+        # Load, locked re-read, delete (with cascades), bulk update, bulk
+        # insert, timestamp, rollup read/update/insert; one removal and one
+        # addition leave the counters unchanged
+        with self.assertNumQueries(14):
+            summary = TaskGenerationService.adjust_plan(self.plan)
+
+        self.assertEqual(summary, {
+            'removed': 1, 'rescheduled': 1, 'added': 1, 'rejected': 3,
+            'reasoning': 'Simplify',
+        })
+        self.assertFalse(Task.objects.filter(pk=t1.pk).exists())
+        t2.refresh_from_db()
+        self.assertEqual((t2.status, t2.day_number), ('PENDING', 10))
+        self.assertEqual(t2.due_date, self.plan.starts_on + timedelta(days=9))
+        new_task = self.plan.tasks.get(title='Easier step')
+        self.assertEqual(new_task.category, 'PLANNING')
+
+        self.plan.refresh_from_db()
+        self.assertEqual(self.plan.tasks_total, 3)
+        self.assertEqual(self.plan.tasks_pending, 2)
+        self.assertEqual(self.plan.tasks_done, 1)
+        self.assertIsNotNone(self.plan.last_adjusted_at)
+
+    @patch('tasks.services.call_claude_json')
+    def test_adjust_plan_leaves_tasks_finished_meanwhile(self, mock_claude):
+        t1, t2, t3 = self.plan.tasks.order_by('day_number')
+
+        def user_acts_during_call(*args, **kwargs):
+            TaskProgressService.mark_done(t1)
+            TaskProgressService.mark_skipped(t2)
+            return {
+                'remove_task_ids': [t1.pk],
+                'reschedule': [{'task_id': t2.pk, 'new_day_number': 10}],
+                'reasoning': 'Simplify',
+            }
+        mock_claude.side_effect = user_acts_during_call
+
+        summary = TaskGenerationService.adjust_plan(self.plan)
+
+        self.assertEqual((summary['removed'], summary['rescheduled'], summary['rejected']), (0, 0, 2))
+        t1.refresh_from_db()
+        t2.refresh_from_db()
+        self.assertEqual(t1.status, 'DONE')
+        self.assertEqual((t2.status, t2.day_number), ('SKIPPED', 2))
+        self.plan.refresh_from_db()
+        self.assertEqual(
+            (self.plan.tasks_total, self.plan.tasks_done, self.plan.tasks_skipped), (3, 1, 1),
+        )
+        self.assertEqual(self.plan.minutes_done, t1.estimated_minutes)
+        self.assertEqual(UserStats.objects.get(user=self.user).tasks_done, 1)
+
+
+class ReconcilePlanCountersCommandTest(TestCase):
+
+    def test_repairs_drifted_counters(self):
+
+        user = _create_test_user()
+        plan = _create_test_plan(user, _create_test_profile(user))
+        plan.tasks.update(status='DONE')
+        TaskPlan.objects.filter(pk=plan.pk).update(tasks_total=99)
+
+        call_command('reconcile_plan_counters', stdout=StringIO())
+
+        plan.refresh_from_db()
+        self.assertEqual(plan.tasks_total, 3)
+        self.assertEqual(plan.tasks_done, 3)
+        self.assertEqual(plan.tasks_pending, 0)
+        self.assertEqual(plan.completion_pct, 100)
+
+
+class TaskAdminTest(TestCase):
+
+    def test_status_is_read_only(self):
+        user = _create_test_user()
+        plan = _create_test_plan(user, _create_test_profile(user))
+        task = plan.tasks.first()
+        admin_user = User.objects.create_superuser('admin', 'admin@example.com', 'pass123')
+        self.client.force_login(admin_user)
+
+        response = self.client.get(reverse('admin:tasks_task_change', args=[task.pk]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, 'name="status"')
+        self.assertNotContains(response, 'name="completed_at_0"')
+
+
+class PlanAdjustmentJobTest(TestCase):
+
+    def setUp(self):
+        self.user = _create_test_user()
+        self.profile = _create_test_profile(self.user)
+        self.plan = _create_test_plan(self.user, self.profile)
+
+    @patch('tasks.services.call_claude_json')
+    def test_skips_enqueue_single_debounced_job(self, mock_claude):
+        tasks = list(self.plan.tasks.all())
+        for task in tasks:
+            TaskProgressService.mark_skipped(task)
+        mock_claude.assert_not_called()
+
+        job = PlanAdjustmentJob.objects.get(plan=self.plan)
+        self.assertEqual(job.status, 'PENDING')
+        first_run_after = job.run_after
+
+        extra = Task.objects.create(
+            plan=self.plan, title='Task 4', category='PLANNING',
+            day_number=4, due_date=self.plan.starts_on + timedelta(days=3),
+        )
+        TaskProgressService.mark_skipped(extra)
+        job.refresh_from_db()
+        self.assertEqual(PlanAdjustmentJob.objects.count(), 1)
+        self.assertEqual(job.skip_count, 2)
+        self.assertGreaterEqual(job.run_after, first_run_after)
+
+    @patch('tasks.services.call_claude_json')
+    def test_worker_runs_due_jobs(self, mock_claude):
+        mock_claude.return_value = {'reasoning': 'Lighter week'}
+        job = PlanJobService.enqueue_adjustment(self.plan, reason='test')
+
+        self.assertEqual(PlanJobService.run_due_adjustments(), 0)
+
+        PlanAdjustmentJob.objects.filter(pk=job.pk).update(
+            run_after=timezone.now() - timedelta(seconds=1),
+        )
+        call_command('process_plan_jobs', stdout=StringIO())
+
+        job.refresh_from_db()
+        self.plan.refresh_from_db()
+        self.assertEqual(job.status, 'DONE')
+        self.assertIsNotNone(self.plan.last_adjusted_at)
+        mock_claude.assert_called_once()
+
+    @patch('tasks.services.call_claude_json')
+    @patch('onboarding.services.OnboardingService.run_due_speculations')
+    def test_failing_stage_does_not_block_others(self, mock_speculations, mock_claude):
+        mock_speculations.side_effect = RuntimeError('speculation crashed')
+        mock_claude.return_value = {'reasoning': 'Lighter week'}
+        job = PlanJobService.enqueue_adjustment(self.plan, reason='test')
+        PlanAdjustmentJob.objects.filter(pk=job.pk).update(
+            run_after=timezone.now() - timedelta(seconds=1),
+        )
+
+        out = StringIO()
+        with self.assertLogs('tasks.management.commands.process_plan_jobs', 'ERROR'):
+            call_command('process_plan_jobs', stdout=out)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'DONE')
+        self.assertIn('Plan adjustments run: 1', out.getvalue())
+
+        # Skips from before the adjustment no longer count
+        TaskProgressService.mark_skipped(self.plan.tasks.first())
+        self.assertFalse(
+            PlanAdjustmentJob.objects.filter(status='PENDING').exists()
+        )
+
+
+class PlanGenerationJobTest(TestCase):
+
+    def setUp(self):
+        self.user = _create_test_user()
+        self.profile = _create_test_profile(self.user)
+        self.plan = _create_test_plan(self.user, self.profile)
+
+    def test_enqueue_returns_unfinished_job(self):
+        job = PlanJobService.enqueue_generation(self.user, 'REGENERATE')
+        again = PlanJobService.enqueue_generation(self.user, 'REGENERATE')
+        self.assertEqual(job.pk, again.pk)
+        self.assertEqual(PlanGenerationJob.objects.count(), 1)
+
+    def test_pending_personalization_does_not_block_generation(self):
+        personalize = PlanJobService.enqueue_generation(self.user, 'PERSONALIZE', plan=self.plan)
+        self.assertEqual(
+            PlanJobService.enqueue_generation(self.user, 'PERSONALIZE', plan=self.plan).pk,
+            personalize.pk,
+        )
+
+        job = PlanJobService.enqueue_generation(self.user, 'REGENERATE')
+        self.assertNotEqual(job.pk, personalize.pk)
+        self.assertEqual(job.kind, 'REGENERATE')
+        self.assertEqual(PlanJobService.enqueue_generation(self.user, 'REGENERATE').pk, job.pk)
+
+    @patch('tasks.services.call_claude_json')
+    def test_retry_discards_partial_plan(self, mock_claude):
+        mock_claude.return_value = {'tasks': [
+            {'day_number': i, 'title': f'Generated {i}', 'category': 'PLANNING'}
+            for i in range(1, 26)
+        ]}
+        job = PlanJobService.enqueue_generation(self.user, 'REGENERATE')
+
+        # First attempt dies after the first chunk is saved
+        with patch.object(
+            TaskGenerationService, '_create_plan_tasks',
+            side_effect=[None, RuntimeError('worker killed')],
+        ):
+            PlanJobService.run_due_generations()
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'PENDING')
+        self.assertEqual(job.plan.status, 'GENERATING')
+        partial_pk = job.plan_id
+        self.plan.refresh_from_db()
+        self.assertEqual(self.plan.status, 'ACTIVE')
+
+        PlanGenerationJob.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        PlanJobService.run_due_generations()
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'DONE')
+        self.assertEqual(job.attempts, 2)
+        self.assertEqual(job.tasks_created, 25)
+        self.assertFalse(TaskPlan.objects.filter(pk=partial_pk).exists())
+        self.assertEqual(job.plan.status, 'ACTIVE')
+        self.assertEqual(job.plan.tasks_total, 25)
+        self.plan.refresh_from_db()
+        self.assertEqual(self.plan.status, 'REPLACED')
+
+    @override_settings(PLAN_GENERATION_MAX_ATTEMPTS=1)
+    @patch('tasks.services.call_claude_json')
+    def test_final_failure_discards_partial_plan(self, mock_claude):
+        mock_claude.return_value = {'tasks': [
+            {'day_number': i, 'title': f'Generated {i}', 'category': 'PLANNING'}
+            for i in range(1, 26)
+        ]}
+        job = PlanJobService.enqueue_generation(self.user, 'REGENERATE')
+        with patch.object(
+            TaskGenerationService, '_create_plan_tasks',
+            side_effect=[None, RuntimeError('worker killed')],
+        ):
+            PlanJobService.run_due_generations()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'FAILED')
+        self.assertIsNone(job.plan)
+        self.assertEqual(job.tasks_created, 0)
+        self.assertFalse(TaskPlan.objects.filter(status='GENERATING').exists())
+        self.assertFalse(UserDailyRollup.objects.exclude(plan=self.plan).exists())
@@ -0,0 +1,105 @@
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from onboarding.models import BusinessProfile
+from tasks.job_service import PlanJobService
+from tasks.models import PlanGenerationJob, TaskPlan, WarmPlan
+from tasks.warm_pool_service import NAME_PLACEHOLDER, WarmPoolService
+
+BASE_TASKS = [
+    {'day_number': 1, 'sort_order': 0, 'title': f'Name {NAME_PLACEHOLDER}',
+     'description': f'Pick a logo for {NAME_PLACEHOLDER}.', 'category': 'MARKETING'},
+    {'day_number': 2, 'sort_order': 0, 'title': 'Open a bank account',
+     'description': 'Separate business money.', 'category': 'FINANCE'},
+]
+
+
+class WarmPoolTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('testuser', 'test@example.com', 'pass123')
+        self.profile = BusinessProfile.objects.create(
+            user=self.user, business_name='Rosa "Bakes"', business_type='Restaurant',
+            stage='IDEA', goals=['First customers'],
+        )
+
+    def _warm(self, **fields):
+        return WarmPlan.objects.create(
+            business_type='Restaurant', stage='IDEA', tasks_data=BASE_TASKS,
+            generated_at=timezone.now(), **fields,
+        )
+
+    @patch('tasks.services.call_claude_json')
+    def test_refresh_command_warms_common_combos(self, mock_claude):
+        mock_claude.return_value = {'tasks': BASE_TASKS}
+        out = StringIO()
+        call_command('refresh_warm_pool', stdout=out)
+
+        entry = WarmPlan.objects.get(business_type='Restaurant', stage='IDEA')
+        self.assertEqual(entry.tasks_data, BASE_TASKS)
+        self.assertEqual(entry.refresh_count, 1)
+        self.assertIn(NAME_PLACEHOLDER, mock_claude.call_args[0][1])
+        self.assertIn('Plans refreshed: 1', out.getvalue())
+
+        # Fresh entries are left alone
+        call_command('refresh_warm_pool', stdout=StringIO())
+        self.assertEqual(mock_claude.call_count, 1)
+
+    def test_checkout_hit_fills_placeholders(self):
+        entry = self._warm()
+        tasks_data = WarmPoolService.checkout(self.profile)
+        self.assertEqual(tasks_data[0]['title'], 'Name Rosa "Bakes"')
+        entry.refresh_from_db()
+        self.assertEqual((entry.hits, entry.misses), (1, 0))
+
+    def test_stale_entry_is_a_miss(self):
+        entry = self._warm()
+        WarmPlan.objects.filter(pk=entry.pk).update(
+            generated_at=timezone.now() - timedelta(days=60),
+        )
+        self.assertIsNone(WarmPoolService.checkout(self.profile))
+        entry.refresh_from_db()
+        self.assertEqual(entry.misses, 1)
+        self.assertEqual(WarmPoolService.pool_stats()['stale'], 1)
+
+    @patch('tasks.warm_pool_service.call_claude_json')
+    @patch('onboarding.services.call_claude_json')
+    def test_onboarding_clones_pool_then_personalizes(self, mock_assess, mock_personalize):
+        self._warm()
+        mock_assess.return_value = {'summary': 'Good'}
+        job = PlanJobService.enqueue_generation(self.user, 'ONBOARDING')
+        PlanJobService.run_due_generations()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'DONE')
+        plan = TaskPlan.objects.get(user=self.user, status='ACTIVE')
+        self.assertEqual(plan.ai_generation_metadata['source'], 'warm_pool')
+        self.assertEqual(plan.tasks_total, 2)
+
+        self.client.force_login(self.user)
+        self.assertContains(self.client.get('/tasks/'), 'Name Rosa')
+
+        first = plan.tasks.get(day_number=1)
+        mock_personalize.return_value = {'tasks': [
+            {'id': first.pk, 'title': 'Design the Rosa Bakes logo', 'description': 'Sketch it.'},
+        ]}
+        personalize = PlanGenerationJob.objects.get(kind='PERSONALIZE')
+        with self.captureOnCommitCallbacks(execute=True):
+            PlanJobService.run_due_generations()
+
+        personalize.refresh_from_db()
+        self.assertEqual(personalize.status, 'DONE')
+        first.refresh_from_db()
+        self.assertEqual(first.title, 'Design the Rosa Bakes logo')
+        self.assertEqual(plan.tasks.get(day_number=2).title, 'Open a bank account')
+        response = self.client.get('/tasks/')
+        self.assertContains(response, 'Design the Rosa Bakes logo')
+        self.assertNotContains(response, 'Name Rosa')
@@ -13,4 +13,10 @@ urlpatterns = [
     path('regenerate/', views.regenerate_plan_view, name='regenerate'),
     path('resource/<int:pk>/toggle/', views.toggle_resource_view, name='toggle_resource'),
     path('continue/', views.continue_plan_view, name='continue_plan'),
+    path('generating/<int:pk>/', views.generation_progress_view, name='generation_progress'),
+    path('generating/<int:pk>/status/', views.generation_status_view, name='generation_status'),
+    path('generating/<int:pk>/retry/', views.generation_retry_view, name='generation_retry'),
+    path('generating/<int:pk>/use-cached/', views.generation_use_cached_view, name='generation_use_cached'),
+    path('cohorts/', views.cohort_report_view, name='cohorts'),
+    path('cohorts/<slug:table>.<slug:fmt>', views.cohort_export_view, name='cohort_export'),
 ]
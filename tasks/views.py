@@ -1,18 +1,23 @@
 from django.contrib import messages
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
-from django.http import Http404
+from django.http import Http404, HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
 from django.utils.http import url_has_allowed_host_and_scheme
 
-from .models import Task, TaskPlan, TaskResource
+from accounts.identity import get_active_plan
+
+from .cohort_service import CohortService
+from .job_service import PlanJobService
+from .models import PlanGenerationJob, Task, TaskResource
+from .plan_cache_service import PlanCacheService
 from .services import TaskGenerationService, TaskProgressService
 
 
 @login_required
 def task_list_view(request):
-    active_plan = TaskPlan.objects.filter(
-        user=request.user, status='ACTIVE',
-    ).first()
+    active_plan = get_active_plan(request.user)
 
     tasks = Task.objects.none()
     status_filter = request.GET.get('status', '')
@@ -37,7 +42,7 @@ def task_list_view(request):
 
 @login_required
 def task_detail_view(request, pk):
-    task = get_object_or_404(Task, pk=pk, plan__user=request.user)
+    task = get_object_or_404(Task, pk=pk, user=request.user)
     resources = task.resources.all()
     return render(request, 'dashboard/task_detail.html', {
         'task': task,
@@ -50,7 +55,7 @@ def mark_done_view(request, pk):
     if request.method != 'POST':
         return redirect('tasks:list')
 
-    task = get_object_or_404(Task, pk=pk, plan__user=request.user)
+    task = get_object_or_404(Task, pk=pk, user=request.user)
     try:
         TaskProgressService.mark_done(task)
         messages.success(request, f'"{task.title}" marked as done!')
@@ -68,7 +73,7 @@ def mark_skip_view(request, pk):
     if request.method != 'POST':
         return redirect('tasks:list')
 
-    task = get_object_or_404(Task, pk=pk, plan__user=request.user)
+    task = get_object_or_404(Task, pk=pk, user=request.user)
     try:
         TaskProgressService.mark_skipped(task)
         messages.info(request, f'"{task.title}" skipped.')
@@ -87,7 +92,7 @@ def reschedule_view(request, pk):
     if request.method != 'POST':
         return redirect('tasks:detail', pk=pk)
 
-    task = get_object_or_404(Task, pk=pk, plan__user=request.user)
+    task = get_object_or_404(Task, pk=pk, user=request.user)
     new_date = request.POST.get('new_date')
     if not new_date:
         messages.error(request, 'Please select a date.')
@@ -127,17 +132,9 @@ def regenerate_plan_view(request):
         messages.error(request, 'Complete onboarding first.')
         return redirect('onboarding:step_1')
 
-    from .services import TaskGenerationService
-
-    # Pause current active plan
-    current = TaskPlan.objects.filter(user=request.user, status='ACTIVE').first()
-    if current:
-        current.status = 'REPLACED'
-        current.save(update_fields=['status'])
-
-    plan = TaskGenerationService.generate_plan(profile)
-    messages.success(request, f'New plan generated with {plan.tasks.count()} tasks!')
-    return redirect('accounts:dashboard')
+    # The current plan stays active until the new one is ready
+    job = PlanJobService.enqueue_generation(request.user, 'REGENERATE')
+    return redirect('tasks:generation_progress', pk=job.pk)
 
 
 @login_required
@@ -147,7 +144,7 @@ def toggle_resource_view(request, pk):
         return redirect('tasks:list')
 
     resource = get_object_or_404(
-        TaskResource, pk=pk, task__plan__user=request.user,
+        TaskResource, pk=pk, task__user=request.user,
     )
     resource.is_completed = not resource.is_completed
     resource.save(update_fields=['is_completed'])
@@ -172,11 +169,114 @@ def continue_plan_view(request):
         messages.info(request, 'Your current plan is still in progress.')
         return redirect('accounts:dashboard')
 
-    plan = TaskGenerationService.generate_continuation_plan(
-        profile, continuation['plan'],
+    job = PlanJobService.enqueue_generation(
+        request.user, 'CONTINUATION', previous_plan=continuation['plan'],
     )
-    messages.success(
-        request,
-        f'Phase {plan.phase} generated with {plan.tasks.count()} tasks!',
+    return redirect('tasks:generation_progress', pk=job.pk)
+
+
+def _generation_done_url(job):
+    if job.kind == 'ONBOARDING':
+        return reverse('onboarding:complete')
+    return reverse('accounts:dashboard')
+
+
+@login_required
+def generation_progress_view(request, pk):
+    """Progress page for a plan generation job; polls generation_status_view."""
+    job = get_object_or_404(PlanGenerationJob, pk=pk, user=request.user)
+    if job.status == 'DONE':
+        return redirect(_generation_done_url(job))
+    return render(request, 'dashboard/plan_generation.html', {
+        'job': job, 'offer': _cached_plan_offer(job),
+    })
+
+
+def _cached_plan_offer(job):
+    """A similar business's cached plan the user may start with instead of waiting."""
+    from onboarding.models import BusinessProfile
+    if job.kind != 'ONBOARDING' or job.status not in ('PENDING', 'FAILED'):
+        return None
+    if job.cached_entry_id:
+        return None
+    profile = BusinessProfile.objects.filter(user_id=job.user_id).first()
+    found = PlanCacheService.offer(profile) if profile else None
+    if found is None:
+        return None
+    entry, score = found
+    return {'entry': entry, 'match_pct': round(score * 100)}
+
+
+@login_required
+def generation_status_view(request, pk):
+    """Lightweight JSON status for the progress page."""
+    job = (
+        PlanGenerationJob.objects.filter(pk=pk, user=request.user)
+        .only('kind', 'status', 'tasks_expected', 'tasks_created', 'attempts')
+        .first()
     )
-    return redirect('accounts:dashboard')
+    if job is None:
+        raise Http404
+    return JsonResponse({
+        'status': job.status,
+        'tasks_expected': job.tasks_expected,
+        'tasks_created': job.tasks_created,
+        'attempts': job.attempts,
+        'redirect_url': _generation_done_url(job) if job.status == 'DONE' else None,
+    })
+
+
+@login_required
+def generation_retry_view(request, pk):
+    """Re-queue a failed generation job."""
+    if request.method != 'POST':
+        return redirect('tasks:generation_progress', pk=pk)
+
+    job = get_object_or_404(PlanGenerationJob, pk=pk, user=request.user)
+    if not PlanJobService.retry_generation(job):
+        messages.error(request, 'This plan cannot be retried right now.')
+    return redirect('tasks:generation_progress', pk=pk)
+
+
+@login_required
+def generation_use_cached_view(request, pk):
+    """Queue a waiting onboarding plan to start from the offered cached plan."""
+    if request.method != 'POST':
+        return redirect('tasks:generation_progress', pk=pk)
+
+    job = get_object_or_404(PlanGenerationJob, pk=pk, user=request.user)
+    offer = _cached_plan_offer(job)
+    if offer is None or not PlanJobService.accept_cached_plan(job, offer['entry']):
+        messages.info(request, 'Your plan is already being built.')
+    return redirect('tasks:generation_progress', pk=pk)
+
+
+@staff_member_required
+def cohort_report_view(request):
+    """Platform-wide cohort analytics for staff."""
+    if request.method == 'POST':
+        CohortService.refresh()
+        return redirect('tasks:cohorts')
+    return render(request, 'dashboard/cohorts.html', {
+        'report': CohortService.get_report(),
+        'parquet_available': CohortService.parquet_available(),
+    })
+
+
+@staff_member_required
+def cohort_export_view(request, table, fmt):
+    """Download one cohort report table as CSV or Parquet."""
+    report_table = CohortService.get_report()['tables'].get(table)
+    if report_table is None or fmt not in ('csv', 'parquet'):
+        raise Http404
+
+    if fmt == 'csv':
+        response = HttpResponse(CohortService.export_csv(report_table), content_type='text/csv')
+    else:
+        try:
+            content = CohortService.export_parquet(report_table)
+        except ImportError:
+            return HttpResponse('Parquet export requires pyarrow', status=501)
+        response = HttpResponse(content, content_type='application/vnd.apache.parquet')
+    response['Content-Disposition'] = f'attachment; filename="cohorts-{table}.{fmt}"'
+    return response
@@ -0,0 +1,191 @@
+"""Warm pool of pre-generated base plans per business type × stage."""
+
+import json
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from ai.claude_client import ClaudeClientError, call_claude_json
+from ai.prompts import PLAN_PERSONALIZATION_SYSTEM, PLAN_PERSONALIZATION_USER
+from onboarding.forms import BUSINESS_TYPE_CHOICES
+from onboarding.models import BusinessProfile
+
+from . import fragment_cache
+from .models import Task, WarmPlan
+
+logger = logging.getLogger(__name__)
+
+# Stand-ins used when generating base plans; swapped for the user's own
+# values when a plan is checked out
+NAME_PLACEHOLDER = '[Business Name]'
+LOCATION_PLACEHOLDER = '[Your City]'
+
+PERSONALIZE_BATCH_SIZE = 20
+
+
+class WarmPoolService:
+
+    @staticmethod
+    def max_age():
+        return timedelta(days=settings.WARM_POOL_MAX_AGE_DAYS)
+
+    @staticmethod
+    def standard_business_types() -> list[str]:
+        return [value for value, _ in BUSINESS_TYPE_CHOICES if value and value != 'OTHER']
+
+    @staticmethod
+    def checkout(profile: BusinessProfile) -> list[dict] | None:
+        """Return task data cloned from the pool for ``profile``, or None on a miss."""
+        if not settings.WARM_POOL_ENABLED:
+            return None
+        if profile.business_type not in WarmPoolService.standard_business_types():
+            return None
+
+        entry, _created = WarmPlan.objects.get_or_create(
+            business_type=profile.business_type, stage=profile.stage,
+        )
+        if not entry.is_fresh(WarmPoolService.max_age()):
+            WarmPlan.objects.filter(pk=entry.pk).update(misses=F('misses') + 1)
+            return None
+
+        WarmPlan.objects.filter(pk=entry.pk).update(
+            hits=F('hits') + 1, last_hit_at=timezone.now(),
+        )
+        return WarmPoolService.materialize(entry.tasks_data, profile)
+
+    @staticmethod
+    def materialize(tasks_data: list[dict], profile: BusinessProfile) -> list[dict]:
+        """Copy base task data, filling in the profile's name and location."""
+        raw = json.dumps(tasks_data)
+        for placeholder, value in (
+            (NAME_PLACEHOLDER, profile.business_name),
+            (LOCATION_PLACEHOLDER, profile.location or 'your area'),
+        ):
+            raw = raw.replace(placeholder, json.dumps(value)[1:-1])
+        return json.loads(raw)
+
+    @staticmethod
+    def base_profile(business_type: str, stage: str) -> BusinessProfile:
+        """Unsaved, generic profile used to generate a pool entry."""
+        return BusinessProfile(
+            business_name=NAME_PLACEHOLDER,
+            business_type=business_type,
+            stage=stage,
+            location=LOCATION_PLACEHOLDER,
+            ai_assessment={'summary': f'Typical {business_type} business at this stage'},
+        )
+
+    @staticmethod
+    def refresh(business_type: str, stage: str) -> WarmPlan:
+        """Regenerate one pool entry with Claude. Raises ClaudeClientError on failure."""
+        from .services import TaskGenerationService
+
+        started = time.monotonic()
+        tasks_data = TaskGenerationService.request_plan_tasks(
+            WarmPoolService.base_profile(business_type, stage),
+        )
+        elapsed = time.monotonic() - started
+
+        entry, _created = WarmPlan.objects.get_or_create(
+            business_type=business_type, stage=stage,
+        )
+        entry.tasks_data = tasks_data
+        entry.generated_at = timezone.now()
+        entry.refresh_count += 1
+        entry.last_refresh_seconds = elapsed
+        entry.total_refresh_seconds += elapsed
+        entry.save()
+        return entry
+
+    @staticmethod
+    def combos_to_refresh(size: int) -> list[tuple[str, str]]:
+        """Most common recent type × stage combinations whose entry is empty or stale."""
+        since = timezone.now() - timedelta(days=90)
+        demand = (
+            BusinessProfile.objects.filter(
+                created_at__gte=since,
+                business_type__in=WarmPoolService.standard_business_types(),
+            )
+            .values_list('business_type', 'stage')
+            .annotate(signups=Count('id'))
+            .order_by('-signups')[:size]
+        )
+        entries = {
+            (e.business_type, e.stage): e for e in WarmPlan.objects.all()
+        }
+        max_age = WarmPoolService.max_age()
+        combos = []
+        for business_type, stage, _signups in demand:
+            entry = entries.get((business_type, stage))
+            if entry is None or not entry.is_fresh(max_age):
+                combos.append((business_type, stage))
+        return combos
+
+    @staticmethod
+    def pool_stats() -> dict:
+        entries = list(WarmPlan.objects.all())
+        max_age = WarmPoolService.max_age()
+        hits = sum(e.hits for e in entries)
+        misses = sum(e.misses for e in entries)
+        refreshes = sum(e.refresh_count for e in entries)
+        refresh_seconds = sum(e.total_refresh_seconds for e in entries)
+        return {
+            'entries': sum(1 for e in entries if e.tasks_data),
+            'stale': sum(1 for e in entries if e.tasks_data and not e.is_fresh(max_age)),
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / (hits + misses) * 100) if hits + misses else 0,
+            'refreshes': refreshes,
+            'avg_refresh_seconds': round(refresh_seconds / refreshes, 1) if refreshes else 0,
+        }
+
+    @staticmethod
+    def personalize_plan(plan) -> int:
+        """Rewrite a cloned plan's pending task copy for its owner. Returns tasks rewritten."""
+        profile = plan.business_profile
+        tasks = {t.pk: t for t in plan.tasks.filter(status='PENDING')}
+        rewritten = []
+        batch_ids = list(tasks)
+        for start in range(0, len(batch_ids), PERSONALIZE_BATCH_SIZE):
+            batch = [tasks[pk] for pk in batch_ids[start:start + PERSONALIZE_BATCH_SIZE]]
+            user_prompt = PLAN_PERSONALIZATION_USER.format(
+                business_name=profile.business_name,
+                business_type=profile.business_type,
+                stage=profile.get_stage_display(),
+                niche=profile.niche or 'Not specified',
+                location=profile.location or 'Not specified',
+                target_audience=profile.target_audience or 'Not specified',
+                goals=', '.join(profile.goals) if profile.goals else 'Not specified',
+                tasks_json=json.dumps([
+                    {'id': t.pk, 'title': t.title, 'description': t.description}
+                    for t in batch
+                ]),
+            )
+            try:
+                items = call_claude_json(
+                    PLAN_PERSONALIZATION_SYSTEM, user_prompt, max_tokens=3000,
+                )['tasks']
+            except (ClaudeClientError, KeyError, TypeError):
+                logger.exception('Personalization batch failed for plan %d', plan.pk)
+                continue
+
+            for item in items:
+                task = tasks.get(item.get('id')) if isinstance(item, dict) else None
+                if task is None or not item.get('title'):
+                    continue
+                task.title = item['title'][:255]
+                task.description = item.get('description') or task.description
+                task.updated_at = timezone.now()
+                rewritten.append(task)
+
+        if rewritten:
+            with transaction.atomic():
+                Task.objects.bulk_update(rewritten, ['title', 'description', 'updated_at'])
+                # Cached task lists still show the generic titles
+                fragment_cache.bump('tasks', plan.user_id)
+        return len(rewritten)